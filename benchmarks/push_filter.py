@@ -0,0 +1,176 @@
+"""Benchmark the raw push pre-filter against decoding every frame.
+
+Run from the repository root:
+
+    python benchmarks/push_filter.py
+
+Every share of irrelevant traffic gets one fixed frame corpus, timed with
+timeit's autorange and the best of several repeats. The filter costs a few
+byte searches on every frame and saves a JSON decode on every frame for an
+untracked device, so it pays off once the share of such frames exceeds the
+filter cost divided by the decode cost. The script prints that break-even
+share; below it, for example on a gateway whose devices are all mapped, the
+filter adds its cost to every frame.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+# See scripts/protocol_path.py for how the protocol package is imported
+# without Home Assistant.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import protocol_path  # noqa: E402,F401
+from custom_components.yunmao.protocol.push_filter import (  # noqa: E402
+    FRAME_IGNORED_UPDATE,
+    YunMaoPushFilter,
+)
+
+KNOWN_MACS = [f"FFFF301B977B{index:04X}" for index in range(8)] + [
+    "00124B002471A560",
+    "00124B0024D9D179",
+]
+UNKNOWN_MACS = [f"00158D00{index:08X}" for index in range(40)]
+
+
+def _frame(mac: str, rng: random.Random) -> bytes:
+    """Return a compact update frame like the gateway sends."""
+
+    if mac.startswith("00124B"):
+        attributes = {"WIN": rng.choice(("OPEN", "CLOSE", "STOP")), "LEV": str(rng.randint(0, 100))}
+    elif mac.startswith("00158D"):
+        attributes = {"TEM": f"{rng.uniform(18, 28):.1f}", "HUM": str(rng.randint(30, 70)), "BAT": "98"}
+    else:
+        attributes = {"SWI": hex(rng.randint(0, 63)), "KY1": "ON", "KY2": "OFF"}
+
+    return json.dumps(
+        {
+            "sourceId": "192.168.88.118",
+            "serialNum": "210431",
+            "requestType": "update",
+            "id": mac,
+            "attributes": attributes,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _build_stream(count: int, irrelevant_ratio: float, seed: int) -> list[bytes]:
+    """Return a stream with the requested share of frames for untracked devices."""
+
+    rng = random.Random(seed)
+    return [
+        _frame(
+            rng.choice(UNKNOWN_MACS if rng.random() < irrelevant_ratio else KNOWN_MACS),
+            rng,
+        )
+        for _ in range(count)
+    ]
+
+
+def _decode_all(frames: list[bytes], known: frozenset[str]) -> int:
+    """Baseline: decode every frame, then check the type and MAC."""
+
+    relevant = 0
+    for line in frames:
+        payload = json.loads(line)
+        if payload.get("requestType") == "update" and payload.get("id") in known:
+            relevant += 1
+    return relevant
+
+
+def _filter_then_decode(frames: list[bytes], push_filter: YunMaoPushFilter, known: frozenset[str]) -> int:
+    """Classify raw bytes first and only decode frames that may be relevant."""
+
+    relevant = 0
+    for line in frames:
+        if push_filter.classify(line) >= FRAME_IGNORED_UPDATE:
+            continue
+        payload = json.loads(line)
+        if payload.get("requestType") == "update" and payload.get("id") in known:
+            relevant += 1
+    return relevant
+
+
+def _classify_all(frames: list[bytes], push_filter: YunMaoPushFilter) -> int:
+    """Classify every frame without decoding any."""
+
+    skipped = 0
+    for line in frames:
+        if push_filter.classify(line) >= FRAME_IGNORED_UPDATE:
+            skipped += 1
+    return skipped
+
+
+def _per_frame(funcs: list[Callable[[], object]], frames: int, repeat: int) -> list[float]:
+    """Return the best time per frame of each function.
+
+    Runs of the functions are interleaved, so load changes on the machine
+    affect all of them alike.
+    """
+
+    timers = [timeit.Timer(func) for func in funcs]
+    numbers = [timer.autorange()[0] for timer in timers]
+    best = [float("inf")] * len(timers)
+    for _ in range(repeat):
+        for index, (timer, number) in enumerate(zip(timers, numbers)):
+            best[index] = min(best[index], timer.timeit(number) / number / frames)
+    return best
+
+
+def main() -> None:
+    """Run the benchmark for several shares of irrelevant traffic."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    known = frozenset(KNOWN_MACS)
+    push_filter = YunMaoPushFilter(KNOWN_MACS)
+
+    print(
+        f"{'irrelevant':>10} {'decode all':>12} {'filter only':>12}"
+        f" {'pre-filter':>12} {'speedup':>8}"
+    )
+    filter_costs: list[float] = []
+    decode_costs: list[float] = []
+    for ratio in (0.0, 0.25, 0.5, 0.75, 0.9):
+        frames = _build_stream(args.frames, ratio, args.seed)
+        expected = _decode_all(frames, known)
+        if (result := _filter_then_decode(frames, push_filter, known)) != expected:
+            raise SystemExit(f"Pre-filter changed the result: {result} != {expected}")
+
+        baseline, filter_only, filtered = _per_frame(
+            [
+                lambda: _decode_all(frames, known),
+                lambda: _classify_all(frames, push_filter),
+                lambda: _filter_then_decode(frames, push_filter, known),
+            ],
+            args.frames,
+            args.repeat,
+        )
+        filter_costs.append(filter_only)
+        decode_costs.append(baseline)
+        print(
+            f"{ratio:>10.0%} {baseline * 1e6:>10.2f}us {filter_only * 1e6:>10.2f}us"
+            f" {filtered * 1e6:>10.2f}us {baseline / filtered:>7.2f}x"
+        )
+
+    break_even = min(filter_costs) / min(decode_costs)
+    print(
+        f"The filter pays off once more than {break_even:.0%} of the frames"
+        " are for untracked devices."
+    )
+
+
+if __name__ == "__main__":
+    main()
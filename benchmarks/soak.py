@@ -0,0 +1,426 @@
+"""Soak test the integration for memory, descriptor, task and state leaks.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/soak.py --duration 3600
+
+The integration's coordinator and push server run against a simulated
+gateway that pushes random updates. Light and cover commands, bursts of
+debounced cover positions, state waits and full queries run against it while
+push connections are opened and dropped, invalid and truncated frames are
+injected and the gateway regularly goes offline.
+
+Memory, open file descriptors, asyncio tasks, live coordinator snapshots and
+the coordinator's and push server's per-device and per-connection containers
+are sampled throughout. The run fails if any sample keeps growing after the
+warm-up, if a per-device container outgrows the device map, or if tasks are
+left behind after shutdown.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+
+from custom_components.yunmao.client import YunMaoClient  # noqa: E402
+from custom_components.yunmao.coordinator import (  # noqa: E402
+    YunMaoCoordinator,
+    YunMaoCoordinatorData,
+    YunMaoPushServer,
+)
+from custom_components.yunmao.device_map import load_device_map  # noqa: E402
+from custom_components.yunmao.protocol.frames import encode_frame  # noqa: E402
+from custom_components.yunmao.protocol.metrics import YunMaoMetrics  # noqa: E402
+from custom_components.yunmao.protocol.scheduler import YunMaoRequestScheduler  # noqa: E402
+from custom_components.yunmao.protocol.simulator import YunMaoGatewaySimulator  # noqa: E402
+
+SWITCH_MACS = [f"FFFF301B977B{index:04X}" for index in range(8)]
+COVER_MACS = ["00124B002471A560", "00124B0024D9D179"]
+UNKNOWN_MACS = [f"00158D00{index:08X}" for index in range(8)]
+
+_CHANNELS_PER_PANEL = 6
+# Growth below these limits between the first and last window is noise.
+_TOLERANCES = {
+    "memory_bytes": 512 * 1024,
+    "open_fds": 2,
+    "tasks": 2,
+    "coordinator_snapshots": 4,
+    "push_connections": 2,
+}
+_WINDOWS = 4
+# Per-device containers never need more entries than the device map has
+# devices. Only one command worker runs, so at most one caller waits for a state.
+_BOUNDS = {
+    "cover_positions": len(COVER_MACS),
+    "cover_targets": len(COVER_MACS),
+    "cover_motion_deadlines": len(COVER_MACS),
+    "pending_positions": len(COVER_MACS),
+    "state_waiters": 1,
+    "confirmed_values": len(SWITCH_MACS) + 2 * len(COVER_MACS),
+    "push_links": 1,
+}
+
+
+@dataclass(slots=True)
+class _Counters:
+    """Outcome counts for the run summary."""
+
+    commands: int = 0
+    positions: int = 0
+    waits: int = 0
+    waits_matched: int = 0
+    queries: int = 0
+    command_errors: int = 0
+    churn_connections: int = 0
+    outages: int = 0
+    fan_outs: int = 0
+
+
+def _write_device_map(path: Path) -> None:
+    """Write a device map with every simulated switch channel and cover."""
+
+    lines = ["lights:"]
+    for mac in SWITCH_MACS:
+        for pos in range(1, _CHANNELS_PER_PANEL + 1):
+            lines += [f"  - name: Light {mac[-4:]} {pos}", f"    mac: {mac}", f"    pos: {pos}"]
+    lines.append("covers:")
+    for mac in COVER_MACS:
+        lines += [f"  - name: Curtain {mac[-4:]}", f"    mac: {mac}"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+async def _async_commands(
+    coordinator: YunMaoCoordinator,
+    counters: _Counters,
+    rate: float,
+    rng: random.Random,
+    stop: asyncio.Event,
+) -> None:
+    """Send commands, position bursts, state waits and queries at a steady rate."""
+
+    while not stop.is_set():
+        roll = rng.random()
+        light = rng.choice(coordinator.light_descriptions)
+        cover = rng.choice(coordinator.cover_descriptions)
+        try:
+            if roll < 0.1:
+                await coordinator.async_refresh()
+                counters.queries += 1
+            elif roll < 0.2:
+                # A dragged slider: all but the last position are debounced.
+                await asyncio.gather(
+                    *(
+                        coordinator.async_set_cover_position(cover, rng.randint(0, 100))
+                        for _ in range(rng.randint(2, 5))
+                    )
+                )
+                counters.positions += 1
+            elif roll < 0.3:
+                counters.waits += 1
+                mask = 1 << (light.primary_pos - 1)
+                if await coordinator.async_wait_for_state(
+                    light.primary_mac,
+                    "SWI",
+                    lambda status, mask=mask: bool(status & mask),
+                    rng.uniform(0, 1),
+                    query=rng.random() < 0.5,
+                ):
+                    counters.waits_matched += 1
+            elif roll < 0.4:
+                if rng.random() < 0.5:
+                    await coordinator.async_open_cover(cover)
+                else:
+                    await coordinator.async_close_cover(cover)
+                counters.commands += 1
+            else:
+                await coordinator.async_set_light_state(light, rng.random() < 0.5)
+                counters.commands += 1
+        except HomeAssistantError:
+            counters.command_errors += 1
+
+        await asyncio.sleep(1 / rate)
+
+
+async def _async_churn(
+    port: int, counters: _Counters, interval: float, rng: random.Random, stop: asyncio.Event
+) -> None:
+    """Open short-lived push connections with valid, invalid and cut-off frames."""
+
+    while not stop.is_set():
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(interval)
+            continue
+
+        frames = [
+            encode_frame(
+                {
+                    "requestType": "update",
+                    "id": rng.choice(SWITCH_MACS + UNKNOWN_MACS),
+                    "attributes": {"SWI": str(rng.randint(0, 63))},
+                }
+            ),
+            b"{not json",
+            b"\x00\xff" * rng.randint(1, 64),
+        ]
+        rng.shuffle(frames)
+        try:
+            writer.write(b"\n".join(frames) + b"\n")
+            # A frame without its newline, left for the listener to flush.
+            writer.write(b'{"requestType":"update","id":"')
+            await writer.drain()
+        except OSError:
+            pass
+        if rng.random() < 0.5:
+            writer.transport.abort()
+        else:
+            writer.close()
+        counters.churn_connections += 1
+        await asyncio.sleep(interval)
+
+
+async def _async_outages(
+    simulator: YunMaoGatewaySimulator,
+    counters: _Counters,
+    interval: float,
+    outage: float,
+    stop: asyncio.Event,
+) -> None:
+    """Take the simulated gateway offline and bring it back regularly."""
+
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            return
+
+        await simulator.async_stop()
+        counters.outages += 1
+        await asyncio.sleep(outage)
+        await simulator.async_start()
+
+
+def _open_fds() -> int | None:
+    """Return the number of open file descriptors, if the platform exposes them."""
+
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _sample(coordinator: YunMaoCoordinator, push_server: YunMaoPushServer) -> dict[str, Any]:
+    """Return one resource and container size sample."""
+
+    gc.collect()
+    return {
+        "memory_bytes": tracemalloc.get_traced_memory()[0],
+        "open_fds": _open_fds(),
+        "tasks": len(asyncio.all_tasks()),
+        "coordinator_snapshots": sum(
+            isinstance(obj, YunMaoCoordinatorData) for obj in gc.get_objects()
+        ),
+        "cover_positions": len(coordinator._cover_positions),
+        "cover_targets": len(coordinator._cover_targets),
+        "cover_motion_deadlines": len(coordinator._cover_motion_deadlines),
+        "pending_positions": len(coordinator._pending_positions),
+        "state_waiters": sum(len(waiters) for waiters in coordinator._state_waiters.values()),
+        "confirmed_values": len(coordinator._confirmed),
+        "push_connections": sum(len(writers) for writers in push_server._connections.values()),
+        "push_links": len(push_server._links),
+    }
+
+
+def _growth(samples: list[dict[str, Any]], warmup: float) -> dict[str, dict[str, float]]:
+    """Return the samples whose window medians rose steadily beyond tolerance."""
+
+    steady = samples[int(len(samples) * warmup) :]
+    if len(steady) < _WINDOWS * 2:
+        return {}
+
+    size = len(steady) // _WINDOWS
+    growing: dict[str, dict[str, float]] = {}
+    for name, tolerance in _TOLERANCES.items():
+        values = [sample[name] for sample in steady]
+        if any(value is None for value in values):
+            continue
+        medians = [
+            statistics.median(values[index * size : (index + 1) * size])
+            for index in range(_WINDOWS)
+        ]
+        increasing = all(later > earlier for earlier, later in zip(medians, medians[1:]))
+        if increasing and medians[-1] - medians[0] > tolerance:
+            growing[name] = {"first_window": medians[0], "last_window": medians[-1]}
+    return growing
+
+
+def _unbounded(samples: list[dict[str, Any]]) -> dict[str, dict[str, int]]:
+    """Return the containers that ever held more entries than their bound."""
+
+    return {
+        name: {"bound": bound, "peak": peak}
+        for name, bound in _BOUNDS.items()
+        if (peak := max((sample[name] for sample in samples), default=0)) > bound
+    }
+
+
+async def _async_soak(args: argparse.Namespace, directory: Path) -> int:
+    """Run the soak test and print a JSON summary."""
+
+    rng = random.Random(args.seed)
+    counters = _Counters()
+    metrics = YunMaoMetrics()
+    path = directory / "yunmao_devices.yaml"
+    _write_device_map(path)
+    device_map = load_device_map(path)
+    assert device_map is not None
+
+    hass = HomeAssistant(str(directory))
+    push_server = YunMaoPushServer(hass, metrics, port=0)
+    simulator = YunMaoGatewaySimulator(
+        SWITCH_MACS, COVER_MACS, port=0, persistent=args.persistent
+    )
+    await simulator.async_start()
+    client = YunMaoClient(
+        "127.0.0.1",
+        metrics,
+        YunMaoRequestScheduler(),
+        port=simulator.port,
+        timeout=2,
+    )
+    if args.persistent:
+        client.capabilities = type(client.capabilities)(persistent_connection=True)
+
+    coordinator = YunMaoCoordinator(hass, client, {})
+    coordinator.set_device_map(*device_map)
+
+    def count_fan_out() -> None:
+        counters.fan_outs += 1
+
+    # Stands in for the entities, which also keeps the polling timer running.
+    remove_listener = coordinator.async_add_listener(count_fan_out)
+    await push_server.async_add_listener(
+        coordinator.handle_push_payload,
+        macs=coordinator.known_macs,
+        activity_listener=coordinator.handle_push_activity,
+        host="127.0.0.1",
+        connection_listener=coordinator.handle_push_connection,
+    )
+    simulator.push_port = push_server.port
+    await coordinator.async_refresh()
+
+    baseline = _sample(coordinator, push_server)
+    samples: list[dict[str, Any]] = []
+    stop = asyncio.Event()
+    workers = [
+        asyncio.create_task(_async_commands(coordinator, counters, args.command_rate, rng, stop)),
+        asyncio.create_task(
+            _async_churn(push_server.port, counters, args.churn_interval, rng, stop)
+        ),
+        asyncio.create_task(
+            _async_outages(simulator, counters, args.outage_interval, args.outage, stop)
+        ),
+    ]
+    traffic = asyncio.create_task(
+        simulator.async_run_traffic(args.push_rate, args.duration, args.seed)
+    )
+
+    started = monotonic()
+    while not traffic.done():
+        await asyncio.sleep(args.sample_interval)
+        samples.append(_sample(coordinator, push_server))
+        if args.verbose:
+            print(json.dumps({"seconds": round(monotonic() - started), **samples[-1]}), flush=True)
+
+    stop.set()
+    await asyncio.gather(*workers, return_exceptions=True)
+    pushed = traffic.result()
+    remove_listener()
+    await coordinator.async_shutdown()
+    await push_server.async_shutdown()
+    await simulator.async_stop()
+    await hass.async_block_till_done()
+    await asyncio.sleep(0.5)
+    final = _sample(coordinator, push_server)
+
+    growing = _growth(samples, args.warmup)
+    unbounded = _unbounded(samples)
+    leaked_tasks = final["tasks"] - baseline["tasks"]
+    summary = {
+        "seconds": round(monotonic() - started, 1),
+        "pushed_frames": pushed,
+        "received_frames": metrics.value("push_frames_total"),
+        "commands": counters.commands,
+        "position_bursts": counters.positions,
+        "state_waits": counters.waits,
+        "state_waits_matched": counters.waits_matched,
+        "queries": counters.queries,
+        "command_errors": counters.command_errors,
+        "churn_connections": counters.churn_connections,
+        "outages": counters.outages,
+        "fan_outs": counters.fan_outs,
+        "samples": len(samples),
+        "baseline": baseline,
+        "peak": {
+            name: max((sample[name] for sample in samples if sample[name] is not None), default=None)
+            for name in baseline
+        },
+        "final": final,
+        "growing": growing,
+        "unbounded": unbounded,
+        "tasks_left_after_shutdown": leaked_tasks,
+    }
+    print(json.dumps(summary, indent=2))
+    return 1 if growing or unbounded or leaked_tasks > 0 else 0
+
+
+async def _async_main(args: argparse.Namespace) -> int:
+    """Run the soak test in a throwaway config directory."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        return await _async_soak(args, Path(directory))
+
+
+def main() -> int:
+    """Parse arguments and run the soak test."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=300, help="seconds of traffic")
+    parser.add_argument("--push-rate", type=float, default=200, help="pushes per second")
+    parser.add_argument("--command-rate", type=float, default=50, help="requests per second")
+    parser.add_argument("--churn-interval", type=float, default=0.2)
+    parser.add_argument("--outage-interval", type=float, default=30)
+    parser.add_argument("--outage", type=float, default=3, help="seconds offline")
+    parser.add_argument("--sample-interval", type=float, default=5)
+    parser.add_argument("--warmup", type=float, default=0.2, help="share of samples to skip")
+    parser.add_argument("--persistent", action="store_true", help="reuse command connections")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="print every sample")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    return asyncio.run(_async_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
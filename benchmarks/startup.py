@@ -0,0 +1,167 @@
+"""Benchmark entity setup and state fan-out for large device maps.
+
+Run from the repository root in an environment with Home Assistant installed:
+
+    python benchmarks/startup.py --sizes 100 1000 5000
+
+For synthetic maps of switch panel channels and curtains, this times loading
+the device map file, building the coordinator state from a full query
+response, and constructing every entity with one device per entity or one
+device per switch panel. It then measures a coordinator fan-out for a single
+pushed change and how many entities would write state for it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.yunmao.client import YunMaoClient  # noqa: E402
+from custom_components.yunmao.coordinator import YunMaoCoordinator  # noqa: E402
+from custom_components.yunmao.cover import YunMaoCurtain  # noqa: E402
+from custom_components.yunmao.device_map import load_device_map  # noqa: E402
+from custom_components.yunmao.entity import YunMaoEntity  # noqa: E402
+from custom_components.yunmao.light import YunMaoLight  # noqa: E402
+from custom_components.yunmao.protocol.metrics import YunMaoMetrics  # noqa: E402
+from custom_components.yunmao.protocol.scheduler import YunMaoRequestScheduler  # noqa: E402
+
+_CHANNELS_PER_PANEL = 6
+# One device in this many is a curtain.
+_COVER_EVERY = 10
+
+
+def _write_device_map(path: Path, size: int) -> None:
+    """Write a device map with size lights and curtains."""
+
+    lines = ["lights:"]
+    covers = ["covers:"]
+    for index in range(size):
+        if index % _COVER_EVERY == 0:
+            covers += [f"  - name: Curtain {index}", f"    mac: 00124B{index:010X}"]
+            continue
+        panel, channel = divmod(index, _CHANNELS_PER_PANEL)
+        lines += [
+            f"  - name: Light {index}",
+            f"    mac: FFFF{panel:012X}",
+            f"    pos: {channel + 1}",
+        ]
+    path.write_text("\n".join(lines + covers) + "\n", encoding="utf-8")
+
+
+def _state_payload(coordinator: YunMaoCoordinator) -> dict:
+    """Return a full query response for every mapped device."""
+
+    attributes = {
+        mac: {"SWI": "0"}
+        for mac in {desc.primary_mac for desc in coordinator.light_descriptions}
+    }
+    attributes.update(
+        {desc.mac: {"WIN": "STOP", "LEV": "50"} for desc in coordinator.cover_descriptions}
+    )
+    return {"requestType": "query", "attributes": attributes}
+
+
+def _build_entities(coordinator: YunMaoCoordinator) -> list[YunMaoEntity]:
+    """Construct every light and curtain entity."""
+
+    entities: list[YunMaoEntity] = [
+        YunMaoLight(coordinator, description) for description in coordinator.light_descriptions
+    ]
+    entities += [
+        YunMaoCurtain(coordinator, description)
+        for description in coordinator.cover_descriptions
+    ]
+    return entities
+
+
+async def _async_run(size: int, group_by_panel: bool, directory: Path) -> dict[str, float]:
+    """Time one setup and fan-out for a map size."""
+
+    path = directory / f"devices_{size}.yaml"
+    _write_device_map(path, size)
+
+    started = perf_counter()
+    device_map = load_device_map(path)
+    load_seconds = perf_counter() - started
+    assert device_map is not None
+
+    hass = HomeAssistant(str(directory))
+    client = YunMaoClient("127.0.0.1", YunMaoMetrics(), YunMaoRequestScheduler())
+    coordinator = YunMaoCoordinator(hass, client, {})
+    coordinator.group_by_panel = group_by_panel
+
+    started = perf_counter()
+    coordinator.set_device_map(*device_map)
+    coordinator.async_apply_query_payload(_state_payload(coordinator))
+    state_seconds = perf_counter() - started
+
+    started = perf_counter()
+    entities = _build_entities(coordinator)
+    entity_seconds = perf_counter() - started
+    devices = {id(entity.device_info) for entity in entities}
+
+    for entity in entities:
+        entity._written_state = (entity._current_state(), True)
+
+    mac = coordinator.light_descriptions[0].primary_mac
+    started = perf_counter()
+    coordinator.handle_push_payload(
+        {"requestType": "update", "id": mac, "attributes": {"SWI": "1"}}
+    )
+    writes = sum(
+        (entity._current_state(), True) != entity._written_state for entity in entities
+    )
+    fanout_seconds = perf_counter() - started
+
+    await coordinator.async_shutdown()
+
+    return {
+        "entities": len(entities),
+        "devices": len(devices),
+        "load_ms": load_seconds * 1000,
+        "first_state_ms": state_seconds * 1000,
+        "entities_ms": entity_seconds * 1000,
+        "fanout_ms": fanout_seconds * 1000,
+        "writes": writes,
+    }
+
+
+async def _async_main(sizes: list[int]) -> None:
+    """Run the benchmark for each size and grouping."""
+
+    print(
+        f"{'size':>6} {'grouped':>7} {'entities':>8} {'devices':>7} {'load':>9}"
+        f" {'state':>9} {'entities':>9} {'fan-out':>9} {'writes':>6}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            for group_by_panel in (False, True):
+                result = await _async_run(size, group_by_panel, Path(directory))
+                print(
+                    f"{size:>6} {'yes' if group_by_panel else 'no':>7}"
+                    f" {result['entities']:>8} {result['devices']:>7}"
+                    f" {result['load_ms']:>7.1f}ms {result['first_state_ms']:>7.1f}ms"
+                    f" {result['entities_ms']:>7.1f}ms {result['fanout_ms']:>7.1f}ms"
+                    f" {result['writes']:>6}"
+                )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+    asyncio.run(_async_main(args.sizes))
+
+
+if __name__ == "__main__":
+    main()
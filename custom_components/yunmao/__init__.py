@@ -2,16 +2,40 @@
 
 from __future__ import annotations
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
 
+from .capability_store import async_setup_capabilities
 from .client import YunMaoClient
-from .const import CONF_INPUT_IP, DOMAIN, PLATFORMS
+from .const import (
+    CONF_FAST_DISPATCH,
+    CONF_FRESHNESS_SECONDS,
+    CONF_GROUP_BY_PANEL,
+    CONF_INPUT_IP,
+    CONF_OFFLINE_QUEUE,
+    CONF_OFFLINE_QUEUE_TTL,
+    CONF_SUPPRESS_REDUNDANT,
+    CONF_UPDATE_EVENT_INTERVAL,
+    CONF_UPDATE_EVENT_MACS,
+    CONF_UPDATE_EVENTS,
+    DEFAULT_FRESHNESS_SECONDS,
+    DEFAULT_OFFLINE_QUEUE_TTL,
+    DEFAULT_UPDATE_EVENT_INTERVAL,
+    DOMAIN,
+    PLATFORMS,
+)
 from .coordinator import (
     YunMaoConfigEntry,
     YunMaoCoordinator,
     YunMaoRuntimeData,
+    async_get_metrics,
     async_get_push_server,
 )
+from .device_map import async_get_device_map
+from .events import YunMaoUpdateEvents
+from .offline_queue import YunMaoOfflineQueue
+from .services import async_setup_services
+from .views import YunMaoMetricsView
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -19,27 +43,96 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     del config
     hass.data.setdefault(DOMAIN, {})
+    hass.http.register_view(YunMaoMetricsView(async_get_metrics(hass)))
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: YunMaoConfigEntry) -> bool:
     """Set up Yun Mao from a config entry."""
 
-    client = YunMaoClient(entry.data[CONF_INPUT_IP])
+    push_server = async_get_push_server(hass)
+    client = YunMaoClient(entry.data[CONF_INPUT_IP], async_get_metrics(hass))
+    client.recorder = push_server.recorder
     coordinator = YunMaoCoordinator(hass, client, dict(entry.data))
-    remove_push_listener = await async_get_push_server(hass).async_add_listener(
-        coordinator.handle_push_payload
+    coordinator.set_device_map(*await async_get_device_map(hass, entry.data))
+    if entry.options.get(CONF_OFFLINE_QUEUE, False):
+        coordinator.offline_queue = YunMaoOfflineQueue(
+            entry.options.get(CONF_OFFLINE_QUEUE_TTL, DEFAULT_OFFLINE_QUEUE_TTL)
+        )
+    if entry.options.get(CONF_SUPPRESS_REDUNDANT, False):
+        coordinator.suppress_window = entry.options.get(
+            CONF_FRESHNESS_SECONDS, DEFAULT_FRESHNESS_SECONDS
+        )
+    coordinator.fast_dispatch = entry.options.get(CONF_FAST_DISPATCH, False)
+    coordinator.group_by_panel = entry.options.get(CONF_GROUP_BY_PANEL, False)
+    if entry.options.get(CONF_UPDATE_EVENTS, False):
+        coordinator.update_events = YunMaoUpdateEvents(
+            hass,
+            client.metrics,
+            [
+                mac.strip().upper()
+                for mac in entry.options.get(CONF_UPDATE_EVENT_MACS, "").split(",")
+                if mac.strip()
+            ]
+            or None,
+            entry.options.get(CONF_UPDATE_EVENT_INTERVAL, DEFAULT_UPDATE_EVENT_INTERVAL),
+        )
+    remove_push_listener = await push_server.async_add_listener(
+        coordinator.handle_push_payload,
+        macs=coordinator.known_macs,
+        activity_listener=coordinator.handle_push_activity,
+        host=client.host,
+        connection_listener=coordinator.handle_push_connection,
     )
 
     entry.async_on_unload(remove_push_listener)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     entry.runtime_data = YunMaoRuntimeData(client=client, coordinator=coordinator)
 
     await coordinator.async_config_entry_first_refresh()
+    await async_setup_capabilities(hass, entry, coordinator.gateway_signature)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    _async_remove_stale_devices(hass, entry)
     return True
 
 
+@callback
+def _async_remove_stale_devices(hass: HomeAssistant, entry: YunMaoConfigEntry) -> None:
+    """Detach devices left over from another device grouping or device map."""
+
+    coordinator = entry.runtime_data.coordinator
+    expected = {entry.entry_id} | {
+        coordinator.device_identifier(description)
+        for description in (*coordinator.light_descriptions, *coordinator.cover_descriptions)
+    }
+    device_registry = dr.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if not any(
+            domain == DOMAIN and identifier in expected
+            for domain, identifier in device.identifiers
+        ):
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: YunMaoConfigEntry) -> None:
+    """Reload the entry when its options change."""
+
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: YunMaoConfigEntry) -> bool:
     """Unload a Yun Mao config entry."""
 
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+
+    # Stop the push server here rather than in a background task so open
+    # gateway connections are closed before the unload finishes.
+    await async_get_push_server(hass).async_remove_listener(
+        entry.runtime_data.coordinator.handle_push_payload
+    )
+    await entry.runtime_data.client.async_close()
+    return True
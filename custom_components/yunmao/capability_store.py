@@ -0,0 +1,81 @@
+"""Persisted gateway capabilities for Yun Mao."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .client import YunMaoClient, YunMaoClientError
+from .const import DOMAIN
+from .coordinator import YunMaoConfigEntry
+from .protocol.capabilities import (
+    YunMaoCapabilities,
+    async_probe_capabilities,
+    firmware_signature,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}.capabilities"
+STORAGE_VERSION = 1
+
+
+async def async_setup_capabilities(
+    hass: HomeAssistant, entry: YunMaoConfigEntry, signature: str | None
+) -> None:
+    """Apply stored capabilities, or probe the gateway once in the background.
+
+    Probe results are stored per host and firmware signature, so a restart
+    reuses them and a firmware change or new gateway address probes again.
+    """
+
+    client = entry.runtime_data.client
+    store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+    stored = await store.async_load() or {}
+    if signature is not None and (cached := stored.get(_cache_key(client, signature))):
+        client.capabilities = YunMaoCapabilities.from_dict(cached["capabilities"])
+        return
+
+    entry.async_create_background_task(
+        hass, _async_probe_and_store(client, store), f"{DOMAIN}_capability_probe"
+    )
+
+
+async def _async_probe_and_store(client: YunMaoClient, store: Store[dict[str, Any]]) -> None:
+    """Probe the gateway and persist the result."""
+
+    try:
+        state = await client.async_fetch_state()
+    except YunMaoClientError as err:
+        _LOGGER.debug("Skipping Yun Mao capability probe: %s", err)
+        return
+
+    signature = firmware_signature(state)
+    capabilities = await async_probe_capabilities(
+        client.host, state, client.scheduler, client.port
+    )
+    client.capabilities = capabilities
+
+    # Only the latest probe per host is kept.
+    stored = {
+        key: value
+        for key, value in (await store.async_load() or {}).items()
+        if value.get("host") != client.host
+    }
+    stored[_cache_key(client, signature)] = {
+        "host": client.host,
+        "signature": signature,
+        "capabilities": capabilities.as_dict(),
+        "probed_at": dt_util.utcnow().isoformat(),
+    }
+    await store.async_save(stored)
+
+
+def _cache_key(client: YunMaoClient, signature: str) -> str:
+    """Return the storage key for a gateway host and firmware signature."""
+
+    return f"{client.host}|{signature}"
@@ -6,15 +6,31 @@ import ipaddress
 from typing import Any
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 import voluptuous as vol
 
-from .client import YunMaoClient, YunMaoClientError
-from .const import CONFIG_ENTRY_UNIQUE_ID, CONF_INPUT_IP, DOMAIN
-
-STEP_USER_DATA_SCHEMA = vol.Schema(
-    {vol.Required(CONF_INPUT_IP, default="192.168.88.118"): str}
+from .const import (
+    CONFIG_ENTRY_UNIQUE_ID,
+    CONF_FAST_DISPATCH,
+    CONF_FRESHNESS_SECONDS,
+    CONF_GROUP_BY_PANEL,
+    CONF_INPUT_IP,
+    CONF_OFFLINE_QUEUE,
+    CONF_OFFLINE_QUEUE_TTL,
+    CONF_SUPPRESS_REDUNDANT,
+    CONF_UPDATE_EVENT_INTERVAL,
+    CONF_UPDATE_EVENT_MACS,
+    CONF_UPDATE_EVENTS,
+    DEFAULT_FRESHNESS_SECONDS,
+    DEFAULT_OFFLINE_QUEUE_TTL,
+    DEFAULT_UPDATE_EVENT_INTERVAL,
+    DOMAIN,
 )
+from .discovery import async_discover_gateways, async_probe_gateway
+
+MANUAL_ENTRY = "manual"
+VALIDATION_TIMEOUT = 5
 
 
 class CannotConnect(HomeAssistantError):
@@ -24,10 +40,17 @@ class CannotConnect(HomeAssistantError):
 async def _async_validate_gateway(host: str) -> None:
     """Validate that the gateway is reachable."""
 
-    try:
-        await YunMaoClient(host).async_fetch_state()
-    except YunMaoClientError as err:
-        raise CannotConnect from err
+    if not await async_probe_gateway(host, VALIDATION_TIMEOUT):
+        raise CannotConnect
+
+
+def _address_schema(default: str | None) -> vol.Schema:
+    """Return the manual address form schema."""
+
+    if default is None:
+        return vol.Schema({vol.Required(CONF_INPUT_IP): str})
+
+    return vol.Schema({vol.Required(CONF_INPUT_IP, default=default): str})
 
 
 class YunMaoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -35,11 +58,71 @@ class YunMaoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._discovered: list[str] | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> YunMaoOptionsFlow:
+        """Return the options flow."""
+
+        del config_entry
+        return YunMaoOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.ConfigFlowResult:
         """Handle the initial step."""
 
+        if user_input is None and self._discovered is None:
+            self._discovered = await async_discover_gateways(self.hass)
+            if self._discovered:
+                return await self.async_step_pick()
+
+        return await self._async_handle_address("user", user_input)
+
+    async def async_step_reconfigure(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Handle a gateway address change, for example after a DHCP change."""
+
+        if user_input is None and self._discovered is None:
+            self._discovered = await async_discover_gateways(self.hass, use_cache=False)
+            if self._discovered:
+                return await self.async_step_pick()
+
+        return await self._async_handle_address("reconfigure", user_input)
+
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Let the user pick one of the discovered gateways."""
+
+        if user_input is not None:
+            host = user_input[CONF_INPUT_IP]
+            if host != MANUAL_ENTRY:
+                # Discovered gateways already answered a protocol probe.
+                return await self._async_finish(host)
+
+            if self.source == config_entries.SOURCE_RECONFIGURE:
+                return self._async_show_address_form("reconfigure", {})
+            return self._async_show_address_form("user", {})
+
+        choices = {host: host for host in self._discovered or ()}
+        choices[MANUAL_ENTRY] = "Enter address manually"
+
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required(CONF_INPUT_IP): vol.In(choices)}),
+        )
+
+    async def _async_handle_address(
+        self, step_id: str, user_input: dict[str, Any] | None
+    ) -> config_entries.ConfigFlowResult:
+        """Validate a manually entered gateway address."""
+
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -55,12 +138,97 @@ class YunMaoConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 except CannotConnect:
                     errors["base"] = "cannot_connect"
                 else:
-                    await self.async_set_unique_id(CONFIG_ENTRY_UNIQUE_ID)
-                    self._abort_if_unique_id_configured()
-                    return self.async_create_entry(title="Yun Mao", data={CONF_INPUT_IP: host})
+                    return await self._async_finish(host)
+
+        return self._async_show_address_form(step_id, errors)
+
+    def _async_show_address_form(
+        self, step_id: str, errors: dict[str, str]
+    ) -> config_entries.ConfigFlowResult:
+        """Show the manual address form."""
+
+        if step_id == "reconfigure":
+            default: str | None = self._get_reconfigure_entry().data[CONF_INPUT_IP]
+        else:
+            default = self._discovered[0] if self._discovered else None
 
         return self.async_show_form(
-            step_id="user",
-            data_schema=STEP_USER_DATA_SCHEMA,
+            step_id=step_id,
+            data_schema=_address_schema(default),
             errors=errors,
         )
+
+    async def _async_finish(self, host: str) -> config_entries.ConfigFlowResult:
+        """Create the entry, or update it when reconfiguring."""
+
+        if self.source == config_entries.SOURCE_RECONFIGURE:
+            return self.async_update_reload_and_abort(
+                self._get_reconfigure_entry(), data_updates={CONF_INPUT_IP: host}
+            )
+
+        await self.async_set_unique_id(CONFIG_ENTRY_UNIQUE_ID)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title="Yun Mao", data={CONF_INPUT_IP: host})
+
+
+class YunMaoOptionsFlow(config_entries.OptionsFlow):
+    """Options flow for Yun Mao."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the integration options."""
+
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_OFFLINE_QUEUE,
+                        default=options.get(CONF_OFFLINE_QUEUE, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_OFFLINE_QUEUE_TTL,
+                        default=options.get(
+                            CONF_OFFLINE_QUEUE_TTL, DEFAULT_OFFLINE_QUEUE_TTL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=600)),
+                    vol.Required(
+                        CONF_SUPPRESS_REDUNDANT,
+                        default=options.get(CONF_SUPPRESS_REDUNDANT, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_FRESHNESS_SECONDS,
+                        default=options.get(
+                            CONF_FRESHNESS_SECONDS, DEFAULT_FRESHNESS_SECONDS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Required(
+                        CONF_FAST_DISPATCH,
+                        default=options.get(CONF_FAST_DISPATCH, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_UPDATE_EVENTS,
+                        default=options.get(CONF_UPDATE_EVENTS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_UPDATE_EVENT_MACS,
+                        default=options.get(CONF_UPDATE_EVENT_MACS, ""),
+                    ): str,
+                    vol.Required(
+                        CONF_UPDATE_EVENT_INTERVAL,
+                        default=options.get(
+                            CONF_UPDATE_EVENT_INTERVAL, DEFAULT_UPDATE_EVENT_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                    vol.Required(
+                        CONF_GROUP_BY_PANEL,
+                        default=options.get(CONF_GROUP_BY_PANEL, False),
+                    ): bool,
+                }
+            ),
+        )
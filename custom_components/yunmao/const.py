@@ -17,13 +17,28 @@ CONF_MAC = "mac"
 CONF_POS = "pos"
 CONF_MAC2 = "mac2"
 CONF_POS2 = "pos2"
+CONF_OFFLINE_QUEUE = "offline_queue"
+CONF_OFFLINE_QUEUE_TTL = "offline_queue_ttl"
+CONF_SUPPRESS_REDUNDANT = "suppress_redundant"
+CONF_FRESHNESS_SECONDS = "freshness_seconds"
+CONF_FAST_DISPATCH = "fast_dispatch"
+CONF_UPDATE_EVENTS = "update_events"
+CONF_UPDATE_EVENT_MACS = "update_event_macs"
+CONF_UPDATE_EVENT_INTERVAL = "update_event_interval"
+CONF_GROUP_BY_PANEL = "group_by_panel"
+
+ATTR_FORCE = "force"
+ATTR_COMMAND = "command"
 
 DEFAULT_POLL_INTERVAL = 30
 PUSH_FALLBACK_IDLE_SECONDS = 180
-GATEWAY_PORT = 8888
-PUSH_PORT = 21688
+DEFAULT_OFFLINE_QUEUE_TTL = 30
+DEFAULT_FRESHNESS_SECONDS = 120
+DEFAULT_UPDATE_EVENT_INTERVAL = 0.2
 CONFIG_ENTRY_UNIQUE_ID = DOMAIN
 
+SIGNAL_DEVICE_MAP_UPDATED = f"{DOMAIN}_device_map_updated_{{}}"
+
 
 @dataclass(frozen=True, slots=True)
 class YunMaoLightDescription:
@@ -87,7 +102,7 @@ COVER_DESCRIPTIONS: tuple[YunMaoCoverDescription, ...] = (
     YunMaoCoverDescription("纱帘", "00124B0024D9D179"),
 )
 
-PLATFORMS: tuple[Platform, ...] = (Platform.LIGHT, Platform.COVER)
+PLATFORMS: tuple[Platform, ...] = (Platform.LIGHT, Platform.COVER, Platform.SENSOR)
 
 
 def is_legacy_entry_data(entry_data: Mapping[str, Any]) -> bool:
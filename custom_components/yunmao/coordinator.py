@@ -5,34 +5,74 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from collections.abc import Callable
-from dataclasses import dataclass, field
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
 from datetime import timedelta
-from time import monotonic
+from time import monotonic, perf_counter
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .client import YunMaoClient, YunMaoClientError
+from .client import YunMaoClient, YunMaoClientError, YunMaoConnectionError
 from .const import (
     DEFAULT_POLL_INTERVAL,
     DOMAIN,
     PUSH_FALLBACK_IDLE_SECONDS,
-    PUSH_PORT,
     YunMaoCoverDescription,
     YunMaoLightDescription,
     get_cover_descriptions,
     get_light_descriptions,
 )
+from .events import YunMaoUpdateEvents
+from .offline_queue import (
+    OUTCOME_FAILED,
+    OUTCOME_SENT,
+    OUTCOME_SUPERSEDED,
+    QueuedCommand,
+    YunMaoOfflineQueue,
+)
+from .protocol.capabilities import firmware_signature
+from .protocol.capture import YunMaoTrafficRecorder
+from .protocol.frames import PUSH_PORT, PushFramer
+from .protocol.latency import YunMaoCommandTracker
+from .protocol.metrics import YunMaoMetrics
+from .protocol.push import enable_keepalive
+from .protocol.push_filter import FRAME_IGNORED_UPDATE, YunMaoPushFilter
 
 _LOGGER = logging.getLogger(__name__)
 _PUSH_SERVER = "push_server"
+_METRICS = "metrics"
 _MOTION_WINDOW_SECONDS = 4
 
+# Dead push links are detected by TCP keepalive. The idle timeout is only a
+# safety net for platforms without per-socket keepalive tuning.
+_PUSH_IDLE_TIMEOUT_SECONDS = 900
+# Clean closes of shorter connections are treated as a gateway that connects
+# per push rather than as a lost link.
+_PUSH_SESSION_MIN_SECONDS = 30
+# While commands are queued, a flush is retried this often. Only the oldest
+# command is sent until the gateway answers again.
+_OFFLINE_RETRY_SECONDS = 5
+# Push traffic triggers flushes too, but no more often than this.
+_OFFLINE_MIN_FLUSH_INTERVAL_SECONDS = 1
+
+# Cover positions are sent once no newer one arrived for the quiet period,
+# and at the latest this long after the first position of a burst.
+_POSITION_QUIET_SECONDS = 0.4
+_POSITION_MAX_WAIT_SECONDS = 1.5
+
 PushListener = Callable[[dict[str, Any]], None]
+PushActivityListener = Callable[[bool], None]
+PushConnectionListener = Callable[[bool], None]
+# Cover status, position, target and motion before an optimistic update.
+_CoverSnapshot = tuple[str | None, int | None, int | None, tuple[str, float] | None]
 
 
 @dataclass(frozen=True, slots=True)
@@ -41,6 +81,7 @@ class YunMaoCoordinatorData:
 
     switch_states: dict[str, int] = field(default_factory=dict)
     cover_states: dict[str, str] = field(default_factory=dict)
+    cover_levels: dict[str, int] = field(default_factory=dict)
 
 
 @dataclass(frozen=True, slots=True)
@@ -64,53 +105,166 @@ class YunMaoRuntimeData:
 YunMaoConfigEntry = ConfigEntry[YunMaoRuntimeData]
 
 
+@dataclass(slots=True)
+class _PendingPosition:
+    """A debounced cover position waiting to be sent."""
+
+    position: int
+    deadline: float
+    snapshot: _CoverSnapshot
+    waiter: asyncio.Future[None]
+    timer: asyncio.TimerHandle
+
+
+@dataclass(slots=True)
+class _StateWaiter:
+    """A caller waiting for a device attribute to reach a value."""
+
+    attribute: str
+    matches: Callable[[Any], bool]
+    future: asyncio.Future[None]
+
+
+@dataclass(slots=True)
+class _PushSubscription:
+    """A push listener with its optional pre-decode filter."""
+
+    listener: PushListener
+    push_filter: YunMaoPushFilter | None = None
+    activity_listener: PushActivityListener | None = None
+    host: str | None = None
+    connection_listener: PushConnectionListener | None = None
+
+
 class YunMaoPushServer:
     """Shared TCP listener used for gateway push updates."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self, hass: HomeAssistant, metrics: YunMaoMetrics, port: int = PUSH_PORT
+    ) -> None:
         self._hass = hass
-        self._listeners: set[PushListener] = set()
+        self._metrics = metrics
+        # Port 0 binds any free port, which is stored here once listening.
+        self.port = port
+        self._listeners: dict[PushListener, _PushSubscription] = {}
         self._lock = asyncio.Lock()
         self._server: asyncio.AbstractServer | None = None
+        self._connections: dict[str | None, set[asyncio.StreamWriter]] = {}
+        self._links: dict[str, bool] = {}
+        self._unsub_stop: Callable[[], None] | None = None
+        self.recorder: YunMaoTrafficRecorder | None = None
 
-    async def async_add_listener(self, listener: PushListener) -> Callable[[], None]:
-        """Register a push listener and start the server when needed."""
+    async def async_add_listener(
+        self,
+        listener: PushListener,
+        start_server: bool = True,
+        *,
+        macs: Iterable[str] | None = None,
+        activity_listener: PushActivityListener | None = None,
+        host: str | None = None,
+        connection_listener: PushConnectionListener | None = None,
+    ) -> Callable[[], None]:
+        """Register a push listener and start the server when needed.
+
+        Listeners that pass their MACs and an activity listener only get
+        decoded payloads for update frames about those MACs. Frames the raw
+        pre-filter can rule out are reported to the activity listener instead,
+        with a flag telling whether the frame was an update.
+
+        A connection listener is told when the push link from its gateway host
+        comes up (True) or is lost (False).
+        """
+
+        push_filter = (
+            YunMaoPushFilter(macs)
+            if macs is not None and activity_listener is not None
+            else None
+        )
 
         async with self._lock:
-            self._listeners.add(listener)
-            if self._server is None:
+            self._listeners[listener] = _PushSubscription(
+                listener, push_filter, activity_listener, host, connection_listener
+            )
+            if start_server and self._server is None:
                 await self._async_start_locked()
 
         @callback
         def remove_listener() -> None:
-            self._listeners.discard(listener)
-            if not self._listeners:
+            if self._listeners.pop(listener, None) is not None and not self._listeners:
                 self._hass.async_create_task(self.async_stop())
 
         return remove_listener
 
+    async def async_remove_listener(self, listener: PushListener) -> None:
+        """Remove a push listener and wait for the server to stop if it was the last."""
+
+        if self._listeners.pop(listener, None) is not None and not self._listeners:
+            await self.async_stop()
+
+    @callback
+    def update_listener_macs(self, listener: PushListener, macs: Iterable[str]) -> None:
+        """Replace the MACs a filtered listener receives payloads for."""
+
+        subscription = self._listeners.get(listener)
+        if subscription is not None and subscription.push_filter is not None:
+            subscription.push_filter = YunMaoPushFilter(macs)
+
     async def async_stop(self) -> None:
         """Stop the shared push server if it is no longer needed."""
 
         async with self._lock:
-            if self._listeners or self._server is None:
-                return
+            if not self._listeners:
+                await self._async_stop_locked()
 
-            self._server.close()
-            await self._server.wait_closed()
-            self._server = None
+    async def async_shutdown(self, event: Event | None = None) -> None:
+        """Stop the push server and drop all connections, even with listeners left."""
+
+        del event
+        self._unsub_stop = None
+        async with self._lock:
+            await self._async_stop_locked()
+
+    async def _async_stop_locked(self) -> None:
+        """Stop accepting pushes and close open connections while holding the lock.
+
+        Open connections are closed first because waiting for the server to
+        close also waits for every active connection handler.
+        """
+
+        server = self._server
+        if server is None:
+            return
+
+        self._server = None
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+        connections = [writer for writers in self._connections.values() for writer in writers]
+        self._connections.clear()
+        self._links.clear()
+
+        server.close()
+        for writer in connections:
+            writer.close()
+        await server.wait_closed()
 
     async def _async_start_locked(self) -> None:
         """Start the push server while holding the lock."""
 
         try:
             self._server = await asyncio.start_server(
-                self._async_handle_client, host="0.0.0.0", port=PUSH_PORT
+                self._async_handle_client, host="0.0.0.0", port=self.port
+            )
+            if self.port == 0:
+                self.port = self._server.sockets[0].getsockname()[1]
+            self._unsub_stop = self._hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self.async_shutdown
             )
         except OSError as err:
             _LOGGER.warning(
                 "Unable to bind Yun Mao push listener on port %s, polling fallback will be used: %s",
-                PUSH_PORT,
+                self.port,
                 err,
             )
             self._server = None
@@ -120,58 +274,157 @@ class YunMaoPushServer:
     ) -> None:
         """Handle a gateway push connection."""
 
-        buffer = ""
+        framer = PushFramer()
+        peer = writer.get_extra_info("peername")
+        source = peer[0] if peer else None
+        self._metrics.increment("push_connections_total")
+        enable_keepalive(writer.get_extra_info("socket"))
+
+        connected = monotonic()
+        lost = False
+        self._connection_opened(source, writer)
 
         try:
             while True:
-                data = await asyncio.wait_for(reader.read(8192), timeout=120)
+                data = await asyncio.wait_for(
+                    reader.read(8192), timeout=_PUSH_IDLE_TIMEOUT_SECONDS
+                )
                 if not data:
                     break
 
-                buffer += data.decode("utf-8", errors="ignore")
-                buffer = self._process_buffer(buffer)
+                self._metrics.increment("push_bytes_in_total", len(data))
+                for line in framer.feed(data):
+                    self.dispatch_line(line, source)
         except asyncio.TimeoutError:
+            lost = True
             _LOGGER.debug("Closing idle Yun Mao push connection")
         except OSError as err:
+            lost = True
             _LOGGER.debug("Yun Mao push connection closed: %s", err)
         finally:
-            if buffer.strip():
-                self._dispatch_line(buffer.strip())
+            if line := framer.flush():
+                self.dispatch_line(line, source)
+            self._connection_closed(
+                source,
+                writer,
+                lost or monotonic() - connected >= _PUSH_SESSION_MIN_SECONDS,
+            )
             writer.close()
             try:
                 await writer.wait_closed()
             except ConnectionError:
                 pass
 
-    def _process_buffer(self, buffer: str) -> str:
-        """Process any complete lines buffered from the TCP stream."""
+    def _connection_opened(self, source: str | None, writer: asyncio.StreamWriter) -> None:
+        """Track a new push connection and report a link that came up."""
 
-        while "\n" in buffer:
-            line, buffer = buffer.split("\n", 1)
-            line = line.strip()
-            if line:
-                self._dispatch_line(line)
+        self._connections.setdefault(source, set()).add(writer)
+        if source is not None and self._links.get(source) is not True:
+            self._links[source] = True
+            self._notify_connection(source, True)
 
-        return buffer
-
-    def _dispatch_line(self, line: str) -> None:
-        """Dispatch a single JSON payload to registered listeners."""
+    def _connection_closed(
+        self, source: str | None, writer: asyncio.StreamWriter, link_lost: bool
+    ) -> None:
+        """Forget a push connection and report a lost link."""
 
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            _LOGGER.debug("Ignoring invalid Yun Mao push payload: %s", line)
+        connections = self._connections.get(source)
+        if connections is None or writer not in connections:
+            # Already dropped while stopping the server.
             return
 
-        if not isinstance(payload, dict):
+        connections.discard(writer)
+        if connections:
             return
+        del self._connections[source]
+
+        if source is not None and link_lost and self._links.get(source):
+            self._links[source] = False
+            self._notify_connection(source, False)
+
+    def _notify_connection(self, source: str, connected: bool) -> None:
+        """Tell the listeners of a gateway host about a link change."""
+
+        for subscription in tuple(self._listeners.values()):
+            if subscription.host != source or subscription.connection_listener is None:
+                continue
+            try:
+                subscription.connection_listener(connected)
+            except Exception:  # noqa: BLE001
+                self._metrics.increment("push_listener_errors_total")
+                _LOGGER.exception("Unhandled Yun Mao push connection listener error")
+
+    def diagnostics_data(self) -> dict[str, Any]:
+        """Return push listener and connection state."""
+
+        return {
+            "listening": self._server is not None,
+            "listeners": len(self._listeners),
+            "connections": len(
+                [writer for writers in self._connections.values() for writer in writers]
+            ),
+            "links_up": sum(1 for is_up in self._links.values() if is_up),
+        }
+
+    def dispatch_line(self, line: bytes, source: str | None = None) -> None:
+        """Dispatch a single raw JSON frame to registered listeners."""
+
+        if self.recorder is not None:
+            self.recorder.record_push(line, source)
+
+        metrics = self._metrics
+        metrics.increment("push_frames_total")
+        metrics.mark("push_frames_per_second")
 
-        for listener in tuple(self._listeners):
+        payload: dict[str, Any] | None = None
+        undecodable = False
+
+        for subscription in tuple(self._listeners.values()):
             try:
-                listener(payload)
+                if subscription.push_filter is not None:
+                    verdict = subscription.push_filter.classify(line)
+                    if verdict >= FRAME_IGNORED_UPDATE:
+                        metrics.increment("push_filtered_frames_total")
+                        subscription.activity_listener(verdict == FRAME_IGNORED_UPDATE)
+                        continue
+
+                if payload is None and not undecodable:
+                    payload = self._decode_line(line)
+                    undecodable = payload is None
+
+                if undecodable:
+                    # Still proof that the gateway is talking to us.
+                    if subscription.activity_listener is not None:
+                        subscription.activity_listener(False)
+                    continue
+
+                subscription.listener(payload)
             except Exception:  # noqa: BLE001
+                metrics.increment("push_listener_errors_total")
                 _LOGGER.exception("Unhandled Yun Mao push listener error")
 
+    def _decode_line(self, line: bytes) -> dict[str, Any] | None:
+        """Decode a raw frame, or return None if it is not a JSON object."""
+
+        metrics = self._metrics
+        started = perf_counter()
+        try:
+            try:
+                payload = json.loads(line)
+            except UnicodeDecodeError:
+                payload = json.loads(line.decode("utf-8", errors="ignore"))
+        except json.JSONDecodeError:
+            metrics.increment("push_invalid_frames_total")
+            _LOGGER.debug("Ignoring invalid Yun Mao push payload: %s", line)
+            return None
+        metrics.observe("push_decode_seconds", perf_counter() - started)
+
+        if not isinstance(payload, dict):
+            metrics.increment("push_dropped_frames_total")
+            return None
+
+        return payload
+
 
 def async_get_push_server(hass: HomeAssistant) -> YunMaoPushServer:
     """Return the shared Yun Mao push server."""
@@ -179,11 +432,22 @@ def async_get_push_server(hass: HomeAssistant) -> YunMaoPushServer:
     domain_data = hass.data.setdefault(DOMAIN, {})
 
     if _PUSH_SERVER not in domain_data:
-        domain_data[_PUSH_SERVER] = YunMaoPushServer(hass)
+        domain_data[_PUSH_SERVER] = YunMaoPushServer(hass, async_get_metrics(hass))
 
     return domain_data[_PUSH_SERVER]
 
 
+def async_get_metrics(hass: HomeAssistant) -> YunMaoMetrics:
+    """Return the shared Yun Mao metrics registry."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if _METRICS not in domain_data:
+        domain_data[_METRICS] = YunMaoMetrics()
+
+    return domain_data[_METRICS]
+
+
 class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
     """Coordinate Yun Mao gateway state updates."""
 
@@ -194,20 +458,39 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
         entry_data: dict[str, Any],
     ) -> None:
         self.client = client
-        self.light_descriptions = get_light_descriptions(entry_data)
-        self.cover_descriptions = get_cover_descriptions(entry_data)
-        self._known_light_macs = {
-            desc.primary_mac for desc in self.light_descriptions
-        } | {
-            desc.secondary_mac
-            for desc in self.light_descriptions
-            if desc.secondary_mac is not None
-        }
-        self._known_cover_macs = {desc.mac for desc in self.cover_descriptions}
+        self.light_descriptions: tuple[YunMaoLightDescription, ...] = ()
+        self.cover_descriptions: tuple[YunMaoCoverDescription, ...] = ()
+        self._known_light_macs: set[str] = set()
+        self._known_cover_macs: set[str] = set()
         self._cover_positions: dict[str, int] = {}
+        self._cover_targets: dict[str, int] = {}
         self._cover_motion_deadlines: dict[str, tuple[str, float]] = {}
         self._last_gateway_event_monotonic: float | None = None
         self._last_push_monotonic: float | None = None
+        self._push_connected: bool | None = None
+        self._resync_pending = False
+        self._command_tracker = YunMaoCommandTracker()
+        self.offline_queue: YunMaoOfflineQueue | None = None
+        self.gateway_signature: str | None = None
+        self._offline_flushing = False
+        self._last_offline_flush_monotonic = 0.0
+        self._unsub_offline_retry: CALLBACK_TYPE | None = None
+        # Seconds a gateway-reported value stays fresh enough to suppress a
+        # command that would not change it; None disables suppression.
+        self.suppress_window: float | None = None
+        self._confirmed: dict[tuple[str, str], tuple[Any, float]] = {}
+        self._suppressed_commands = 0
+        # Return from commands once the frame is written and finish delivery
+        # in the background.
+        self.fast_dispatch = False
+        self.update_events: YunMaoUpdateEvents | None = None
+        # Put every light channel of a switch panel under one device.
+        self.group_by_panel = False
+        self._device_infos: dict[str, DeviceInfo] = {}
+        self._pending_positions: dict[str, _PendingPosition] = {}
+        self._state_waiters: dict[str, list[_StateWaiter]] = {}
+        self._delivery_issue_raised = False
+        self._fan_out_writes = 0
 
         super().__init__(
             hass,
@@ -215,6 +498,70 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
             name=f"{DOMAIN}_{client.host}",
             update_interval=timedelta(seconds=DEFAULT_POLL_INTERVAL),
         )
+        self.set_device_map(
+            get_light_descriptions(entry_data), get_cover_descriptions(entry_data)
+        )
+
+    def set_device_map(
+        self,
+        light_descriptions: tuple[YunMaoLightDescription, ...],
+        cover_descriptions: tuple[YunMaoCoverDescription, ...],
+    ) -> None:
+        """Replace the device map while keeping cached gateway state.
+
+        State of MACs that are no longer mapped is dropped; a resync is
+        scheduled when the new map has MACs without cached state.
+        """
+
+        self.light_descriptions = light_descriptions
+        self.cover_descriptions = cover_descriptions
+        self._known_light_macs = {
+            desc.primary_mac for desc in light_descriptions
+        } | {
+            desc.secondary_mac
+            for desc in light_descriptions
+            if desc.secondary_mac is not None
+        }
+        self._known_cover_macs = {desc.mac for desc in cover_descriptions}
+        self._device_infos.clear()
+
+        for cache in (
+            self._cover_positions,
+            self._cover_targets,
+            self._cover_motion_deadlines,
+        ):
+            for mac in cache.keys() - self._known_cover_macs:
+                del cache[mac]
+
+        known_macs = self.known_macs
+        for key in [key for key in self._confirmed if key[0] not in known_macs]:
+            del self._confirmed[key]
+
+        data = self.data
+        if data is None:
+            return
+
+        self.data = YunMaoCoordinatorData(
+            switch_states={
+                mac: value
+                for mac, value in data.switch_states.items()
+                if mac in self._known_light_macs
+            },
+            cover_states={
+                mac: value
+                for mac, value in data.cover_states.items()
+                if mac in self._known_cover_macs
+            },
+            cover_levels={
+                mac: value
+                for mac, value in data.cover_levels.items()
+                if mac in self._known_cover_macs
+            },
+        )
+        if not self._known_light_macs <= self.data.switch_states.keys() or not (
+            self._known_cover_macs <= self.data.cover_states.keys()
+        ):
+            self._resync_pending = True
 
     async def _async_update_data(self) -> YunMaoCoordinatorData:
         """Fetch fresh state from the gateway."""
@@ -223,17 +570,97 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
             return self.data
 
         try:
-            data = self._parse_query_payload(await self.client.async_fetch_state())
+            payload = await self.client.async_fetch_state()
         except YunMaoClientError as err:
             raise UpdateFailed(str(err)) from err
 
+        data = self._timed_parse_query_payload(payload)
         self._last_gateway_event_monotonic = monotonic()
+        self._resync_pending = False
+        self.gateway_signature = firmware_signature(payload)
+        if self.offline_queue:
+            self._async_flush_offline_queue_soon()
         return data
 
+    @callback
+    def async_apply_query_payload(self, payload: dict[str, Any]) -> None:
+        """Merge a full gateway state dump, such as a replayed response."""
+
+        self.async_set_updated_data(self._timed_parse_query_payload(payload))
+        self._last_gateway_event_monotonic = monotonic()
+
+    def device_identifier(
+        self, description: YunMaoLightDescription | YunMaoCoverDescription
+    ) -> str:
+        """Return the registry identifier of the device an entity belongs to."""
+
+        if self.group_by_panel and isinstance(description, YunMaoLightDescription):
+            return description.primary_mac
+        return description.device_identifier
+
+    def device_info(
+        self, description: YunMaoLightDescription | YunMaoCoverDescription
+    ) -> DeviceInfo:
+        """Return device info shared by every entity of the same device."""
+
+        identifier = self.device_identifier(description)
+        if (info := self._device_infos.get(identifier)) is None:
+            info = self._device_infos[identifier] = DeviceInfo(
+                identifiers={(DOMAIN, identifier)},
+                manufacturer="lierda-new",
+                model=description.model,
+                name=(
+                    description.name
+                    if identifier == description.device_identifier
+                    else f"Switch panel {identifier}"
+                ),
+            )
+        return info
+
+    @property
+    def known_macs(self) -> set[str]:
+        """Return every MAC this coordinator keeps state for."""
+
+        return self._known_light_macs | self._known_cover_macs
+
+    @callback
+    def handle_push_connection(self, connected: bool) -> None:
+        """Resync right away when the gateway's push link drops or comes back."""
+
+        was_connected = self._push_connected
+        self._push_connected = connected
+
+        if was_connected is None or was_connected == connected:
+            return
+
+        if connected:
+            _LOGGER.debug("Yun Mao push link to %s restored, resyncing", self.client.host)
+        else:
+            _LOGGER.info(
+                "Yun Mao push link to %s lost, falling back to polling", self.client.host
+            )
+
+        self._resync_pending = True
+        self.hass.async_create_task(self.async_request_refresh())
+        if connected and self.offline_queue:
+            self._async_flush_offline_queue_soon()
+
+    def handle_push_activity(self, is_update: bool) -> None:
+        """Record a push frame that was filtered out before decoding."""
+
+        now = monotonic()
+        self._last_gateway_event_monotonic = now
+        if is_update:
+            self._last_push_monotonic = now
+        if self.offline_queue:
+            self._async_flush_offline_queue_soon()
+
     def handle_push_payload(self, payload: dict[str, Any]) -> None:
         """Merge gateway push data into the cached state."""
 
         self._last_gateway_event_monotonic = monotonic()
+        if self.offline_queue:
+            self._async_flush_offline_queue_soon()
 
         if payload.get("requestType") != "update":
             return
@@ -245,9 +672,20 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
             return
 
         self._last_push_monotonic = monotonic()
+        started = perf_counter()
+
+        if mac in self._known_light_macs or mac in self._known_cover_macs:
+            if self.update_events is not None:
+                self.update_events.handle_push(
+                    mac,
+                    attributes,
+                    self.data.switch_states.get(mac) if self.data else None,
+                )
+            self._command_tracker.confirm(mac, attributes)
 
         switch_states = dict(self.data.switch_states) if self.data else {}
         cover_states = dict(self.data.cover_states) if self.data else {}
+        cover_levels = dict(self.data.cover_levels) if self.data else {}
         updated = False
 
         if mac in self._known_light_macs and (raw_switch := attributes.get("SWI")) is not None:
@@ -256,21 +694,45 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
                 updated = True
             except ValueError:
                 _LOGGER.debug("Ignoring invalid light payload for %s: %s", mac, raw_switch)
+            else:
+                self._record_confirmed(mac, "SWI", switch_states[mac])
 
-        if mac in self._known_cover_macs and isinstance(attributes.get("WIN"), str):
-            status = attributes["WIN"]
-            cover_states[mac] = status
-            self._update_cover_position_cache(mac, status)
-            updated = True
+        if mac in self._known_cover_macs:
+            updated |= self._merge_cover_attributes(
+                mac, attributes, cover_states, cover_levels, is_push=True
+            )
+
+        self.client.metrics.observe("coordinator_parse_seconds", perf_counter() - started)
 
         if updated:
             self.async_set_updated_data(
                 YunMaoCoordinatorData(
                     switch_states=switch_states,
                     cover_states=cover_states,
+                    cover_levels=cover_levels,
                 )
             )
 
+    @callback
+    def async_update_listeners(self) -> None:
+        """Fan state out to entities and record how many were written."""
+
+        super().async_update_listeners()
+        metrics = self.client.metrics
+        metrics.increment("coordinator_updates_total")
+        metrics.observe("coordinator_entity_writes_per_update", self._fan_out_writes)
+        self._fan_out_writes = 0
+
+    @callback
+    def async_record_entity_write(self) -> None:
+        """Count an entity state write for the current fan-out.
+
+        Writes deferred past their fan-out, such as merged cover writes, are
+        counted with the next one.
+        """
+
+        self._fan_out_writes += 1
+
     def is_light_on(self, description: YunMaoLightDescription) -> bool | None:
         """Return the current logical light state."""
 
@@ -299,14 +761,19 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
         """Return the derived cover state for an entity."""
 
         status = self.data.cover_states.get(description.mac) if self.data else None
-        position = self._cover_positions.get(description.mac, 50)
+        level = self.data.cover_levels.get(description.mac) if self.data else None
 
-        if status == "OPEN":
-            position = 100
-        elif status == "CLOSE":
-            position = 0
-        elif status == "STOP" and description.mac not in self._cover_positions:
-            position = 50
+        if level is not None:
+            # Reported levels overwrite the optimistic position as they arrive.
+            position = self._cover_positions.get(description.mac, level)
+        else:
+            position = self._cover_positions.get(description.mac, 50)
+            if status == "OPEN":
+                position = 100
+            elif status == "CLOSE":
+                position = 0
+            elif status == "STOP" and description.mac not in self._cover_positions:
+                position = 50
 
         is_opening, is_closing = self._get_cover_motion(description.mac)
 
@@ -318,20 +785,69 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
         )
 
     async def async_set_light_state(
-        self, description: YunMaoLightDescription, is_on: bool
+        self, description: YunMaoLightDescription, is_on: bool, *, force: bool = False
     ) -> None:
         """Send a light command and update local state optimistically."""
 
-        try:
-            await self.client.async_set_light_state(
-                description.primary_mac, description.primary_pos, is_on
+        channels = [(description.primary_mac, description.primary_pos)]
+        if description.secondary_mac is not None and description.secondary_pos is not None:
+            channels.append((description.secondary_mac, description.secondary_pos))
+
+        if not force and self.suppress_window is not None and all(
+            self._is_confirmed(
+                mac,
+                "SWI",
+                lambda status, pos=pos: self._switch_bit_is_on(status, pos) is is_on,
+                self.suppress_window,
             )
-            if description.secondary_mac is not None and description.secondary_pos is not None:
-                await self.client.async_set_light_state(
-                    description.secondary_mac, description.secondary_pos, is_on
+            for mac, pos in channels
+        ):
+            self._count_suppressed(description.name)
+            return
+
+        value = "ON" if is_on else "OFF"
+        previous = {
+            (mac, pos): self._switch_bit_is_on(self.data.switch_states.get(mac), pos)
+            for mac, pos in channels
+            if self.data is not None
+        }
+
+        @callback
+        def rollback() -> None:
+            # Only channels still showing the optimistic value are restored.
+            if self.data is None:
+                return
+            switch_states = dict(self.data.switch_states)
+            for (mac, pos), was_on in previous.items():
+                if was_on is not None and self._switch_bit_is_on(
+                    switch_states.get(mac), pos
+                ) is is_on:
+                    switch_states[mac] = self._set_switch_bit(switch_states[mac], pos, was_on)
+            self.async_set_updated_data(replace(self.data, switch_states=switch_states))
+
+        if self.fast_dispatch:
+            # Shown before dispatching, so a delivery failure reported in the
+            # background always finds the optimistic state to roll back.
+            self._apply_light_state(description, is_on)
+            try:
+                await asyncio.gather(
+                    *(
+                        self._async_send_command(mac, f"KY{pos}", value, rollback)
+                        for mac, pos in channels
+                    )
                 )
-        except YunMaoClientError as err:
-            raise HomeAssistantError(str(err)) from err
+            except HomeAssistantError:
+                rollback()
+                raise
+            return
+
+        for mac, pos in channels:
+            await self._async_send_command(mac, f"KY{pos}", value, rollback)
+        self._apply_light_state(description, is_on)
+
+    @callback
+    def _apply_light_state(self, description: YunMaoLightDescription, is_on: bool) -> None:
+        """Set a light's channels in the cached state."""
 
         if self.data is None:
             return
@@ -350,28 +866,37 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
                 is_on,
             )
 
-        self.async_set_updated_data(
-            YunMaoCoordinatorData(
-                switch_states=switch_states,
-                cover_states=dict(self.data.cover_states),
-            )
-        )
+        self.async_set_updated_data(replace(self.data, switch_states=switch_states))
 
-    async def async_open_cover(self, description: YunMaoCoverDescription) -> None:
+    async def async_open_cover(
+        self, description: YunMaoCoverDescription, *, force: bool = False
+    ) -> None:
         """Open a cover."""
 
+        if not force and self._cover_is_confirmed(description.mac, "OPEN", 100):
+            self._count_suppressed(description.name)
+            return
+
         await self._async_set_cover_status(description, "OPEN")
         self._cover_positions[description.mac] = 100
+        self._cover_targets[description.mac] = 100
         self._cover_motion_deadlines[description.mac] = (
             "opening",
             monotonic() + _MOTION_WINDOW_SECONDS,
         )
 
-    async def async_close_cover(self, description: YunMaoCoverDescription) -> None:
+    async def async_close_cover(
+        self, description: YunMaoCoverDescription, *, force: bool = False
+    ) -> None:
         """Close a cover."""
 
+        if not force and self._cover_is_confirmed(description.mac, "CLOSE", 0):
+            self._count_suppressed(description.name)
+            return
+
         await self._async_set_cover_status(description, "CLOSE")
         self._cover_positions[description.mac] = 0
+        self._cover_targets[description.mac] = 0
         self._cover_motion_deadlines[description.mac] = (
             "closing",
             monotonic() + _MOTION_WINDOW_SECONDS,
@@ -382,17 +907,26 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
 
         await self._async_set_cover_status(description, "STOP")
         self._cover_motion_deadlines.pop(description.mac, None)
+        self._cover_targets.pop(description.mac, None)
         self._cover_positions.setdefault(description.mac, 50)
 
     async def async_set_cover_position(
-        self, description: YunMaoCoverDescription, position: int
+        self, description: YunMaoCoverDescription, position: int, *, force: bool = False
     ) -> None:
-        """Set a cover target position."""
+        """Set a cover target position.
 
-        try:
-            await self.client.async_set_cover_position(description.mac, position)
-        except YunMaoClientError as err:
-            raise HomeAssistantError(str(err)) from err
+        The position shows up right away, but positions set in quick
+        succession, such as from a dragged slider, are sent as one command.
+        Callers whose position was replaced by a newer one return without
+        sending anything.
+        """
+
+        if not force and self._cover_is_confirmed(description.mac, None, position):
+            self._count_suppressed(description.name)
+            return
+
+        pending = self._pending_positions.get(description.mac)
+        snapshot = pending.snapshot if pending else self._cover_snapshot(description.mac)
 
         current_position = self.get_cover_state(description).current_position
         if position > current_position:
@@ -409,18 +943,109 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
             self._cover_motion_deadlines.pop(description.mac, None)
 
         self._cover_positions[description.mac] = position
+        self._cover_targets[description.mac] = position
 
-        if self.data is None:
-            return
+        if self.data is not None:
+            cover_states = dict(self.data.cover_states)
+            cover_states[description.mac] = "STOP"
+            self.async_set_updated_data(replace(self.data, cover_states=cover_states))
 
-        cover_states = dict(self.data.cover_states)
-        cover_states[description.mac] = "STOP"
-        self.async_set_updated_data(
-            YunMaoCoordinatorData(
-                switch_states=dict(self.data.switch_states),
-                cover_states=cover_states,
-            )
+        await self._async_debounce_position(description.mac, position, snapshot)
+
+    async def _async_debounce_position(
+        self, mac: str, position: int, snapshot: _CoverSnapshot
+    ) -> None:
+        """Wait until a position is sent or replaced by a newer one."""
+
+        loop = self.hass.loop
+        now = loop.time()
+        if (pending := self._pending_positions.pop(mac, None)) is not None:
+            pending.timer.cancel()
+            if not pending.waiter.done():
+                pending.waiter.set_result(None)
+            deadline = pending.deadline
+        else:
+            deadline = now + _POSITION_MAX_WAIT_SECONDS
+
+        delay = max(0.0, min(_POSITION_QUIET_SECONDS, deadline - now))
+        waiter: asyncio.Future[None] = loop.create_future()
+        self._pending_positions[mac] = _PendingPosition(
+            position,
+            deadline,
+            snapshot,
+            waiter,
+            loop.call_later(delay, self._async_send_pending_position, mac),
         )
+        await waiter
+
+    @callback
+    def _async_send_pending_position(self, mac: str) -> None:
+        """Send the last position of a burst and report to its caller."""
+
+        if (pending := self._pending_positions.pop(mac, None)) is None:
+            return
+
+        rollback = self._cover_rollback(mac, pending.position, pending.snapshot)
+
+        async def async_send() -> None:
+            try:
+                await self._async_send_command(
+                    mac, "LEV", str(pending.position), rollback
+                )
+            except HomeAssistantError as err:
+                # The position was shown before sending, so undo it.
+                rollback()
+                if not pending.waiter.done():
+                    pending.waiter.set_exception(err)
+            else:
+                if not pending.waiter.done():
+                    pending.waiter.set_result(None)
+
+        self.hass.async_create_background_task(async_send(), f"{DOMAIN}_cover_position")
+
+    async def async_wait_for_state(
+        self,
+        mac: str,
+        attribute: str,
+        matches: Callable[[Any], bool],
+        timeout: float,
+        query: bool = False,
+    ) -> bool:
+        """Wait until the gateway reports a matching SWI, WIN or LEV value.
+
+        Returns True at once if the last report matches and no command changed
+        the state since, or False after the timeout. Waiters are resolved from
+        pushes and query responses for their MAC only. With query, the device
+        state is fetched right away instead of waiting for the next push.
+        """
+
+        if self._is_confirmed(mac, attribute, matches):
+            return True
+
+        loop = self.hass.loop
+        deadline = loop.time() + timeout
+        waiter = _StateWaiter(attribute, matches, loop.create_future())
+        self._state_waiters.setdefault(mac, []).append(waiter)
+        try:
+            if query:
+                # A failed query leaves the waiter to the next push.
+                try:
+                    self.async_apply_query_payload(
+                        await asyncio.wait_for(
+                            self.client.async_fetch_device_state(mac), timeout
+                        )
+                    )
+                except (YunMaoClientError, UpdateFailed, asyncio.TimeoutError) as err:
+                    _LOGGER.debug("Yun Mao state query for %s failed: %s", mac, err)
+            await asyncio.wait_for(waiter.future, max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._state_waiters[mac]
+            waiters.remove(waiter)
+            if not waiters:
+                del self._state_waiters[mac]
+        return True
 
     def diagnostics_data(self) -> dict[str, Any]:
         """Return non-sensitive coordinator diagnostics."""
@@ -432,35 +1057,315 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
                 self._last_gateway_event_monotonic
             ),
             "seconds_since_last_push": self._seconds_since(self._last_push_monotonic),
+            "push_connected": self._push_connected,
             "light_count": len(self.light_descriptions),
             "cover_count": len(self.cover_descriptions),
             "known_light_macs": len(self._known_light_macs),
             "known_cover_macs": len(self._known_cover_macs),
             "switch_state_count": len(self.data.switch_states) if self.data else 0,
             "cover_state_count": len(self.data.cover_states) if self.data else 0,
+            "cover_level_count": len(self.data.cover_levels) if self.data else 0,
+            "command_latency": self._command_tracker.diagnostics_data(),
+            "suppress_window": self.suppress_window,
+            "suppressed_commands": self._suppressed_commands,
+            "fast_dispatch": self.fast_dispatch,
+            "state_waiters": sum(len(waiters) for waiters in self._state_waiters.values()),
+            "request_scheduler": self.client.scheduler.diagnostics_data(),
+            "gateway_signature": self.gateway_signature,
+            "capabilities": self.client.capabilities.as_dict(),
+            "offline_queue": (
+                self.offline_queue.diagnostics_data()
+                if self.offline_queue is not None
+                else None
+            ),
         }
 
+    async def async_shutdown(self) -> None:
+        """Cancel offline retries, drop queued commands and events and close the client."""
+
+        await super().async_shutdown()
+        await self.client.async_close()
+        for pending in self._pending_positions.values():
+            pending.timer.cancel()
+            if not pending.waiter.done():
+                pending.waiter.set_exception(
+                    HomeAssistantError("Yun Mao cover position was not sent before unload")
+                )
+        self._pending_positions.clear()
+        for waiters in self._state_waiters.values():
+            for waiter in waiters:
+                if not waiter.future.done():
+                    waiter.future.set_exception(
+                        HomeAssistantError("Yun Mao integration unloaded while waiting")
+                    )
+        if self.update_events is not None:
+            self.update_events.async_cancel()
+        if self._unsub_offline_retry is not None:
+            self._unsub_offline_retry()
+            self._unsub_offline_retry = None
+        if self.offline_queue is not None:
+            self.offline_queue.clear()
+
+    async def _async_send_command(
+        self,
+        mac: str,
+        attribute: str,
+        value: str,
+        rollback: Callable[[], None] | None = None,
+    ) -> None:
+        """Send one command attribute, queueing it while the gateway is unreachable.
+
+        With the offline queue enabled, the call waits until the command is
+        delivered, replaced by a newer command for the same attribute, or
+        expires. With fast dispatch, it returns once the frame is written; a
+        later delivery failure calls rollback and raises a repair issue. Only
+        failures while closing the connection are noticed after the write, so
+        a frame the gateway accepted but dropped is not rolled back.
+        """
+
+        self._command_tracker.track(mac, attribute, value)
+
+        # Commands queue behind already queued ones so a stale queued value
+        # never overrides a newer direct send.
+        if not self.offline_queue:
+            try:
+                if self.fast_dispatch:
+                    delivery = await self.client.async_dispatch_command(
+                        mac, {attribute: value}
+                    )
+                    self.hass.async_create_background_task(
+                        self._async_finish_delivery(
+                            delivery, mac, attribute, value, rollback
+                        ),
+                        f"{DOMAIN}_command_delivery",
+                    )
+                else:
+                    await self.client.async_send_command(mac, {attribute: value})
+            except YunMaoConnectionError as err:
+                if self.offline_queue is None:
+                    self._command_tracker.discard(mac, attribute, value)
+                    raise HomeAssistantError(str(err)) from err
+                _LOGGER.debug(
+                    "Yun Mao gateway unreachable, queueing %s %s=%s", mac, attribute, value
+                )
+            except YunMaoClientError as err:
+                self._command_tracker.discard(mac, attribute, value)
+                raise HomeAssistantError(str(err)) from err
+            else:
+                return
+
+        if self._unsub_offline_retry is None and not self._offline_flushing:
+            self._async_schedule_offline_retry()
+
+        outcome = await self.offline_queue.async_enqueue(mac, attribute, value)
+        if outcome in (OUTCOME_SENT, OUTCOME_SUPERSEDED):
+            return
+
+        self._command_tracker.discard(mac, attribute, value)
+        raise HomeAssistantError(
+            f"Yun Mao command {attribute}={value} for {mac} was not delivered: {outcome}"
+        )
+
+    async def _async_finish_delivery(
+        self,
+        delivery: asyncio.Task[None],
+        mac: str,
+        attribute: str,
+        value: str,
+        rollback: Callable[[], None] | None,
+    ) -> None:
+        """Wait for a fast-dispatched command and undo its optimistic state on failure."""
+
+        try:
+            await delivery
+        except YunMaoClientError as err:
+            _LOGGER.warning(
+                "Yun Mao command %s=%s for %s was not delivered: %s",
+                attribute,
+                value,
+                mac,
+                err,
+            )
+            self._command_tracker.discard(mac, attribute, value)
+            if rollback is not None:
+                rollback()
+            self._delivery_issue_raised = True
+            ir.async_create_issue(
+                self.hass,
+                DOMAIN,
+                f"command_delivery_failed_{self.client.host}",
+                is_fixable=False,
+                severity=ir.IssueSeverity.WARNING,
+                translation_key="command_delivery_failed",
+                translation_placeholders={
+                    "host": self.client.host,
+                    "mac": mac,
+                    "command": f"{attribute}={value}",
+                    "error": str(err),
+                },
+            )
+            return
+
+        if self._delivery_issue_raised:
+            self._delivery_issue_raised = False
+            ir.async_delete_issue(
+                self.hass, DOMAIN, f"command_delivery_failed_{self.client.host}"
+            )
+
+    def _cover_snapshot(self, mac: str) -> _CoverSnapshot:
+        """Return a cover's optimistic state for a later rollback."""
+
+        return (
+            self.data.cover_states.get(mac) if self.data else None,
+            self._cover_positions.get(mac),
+            self._cover_targets.get(mac),
+            self._cover_motion_deadlines.get(mac),
+        )
+
+    def _cover_rollback(
+        self, mac: str, target: int | None, snapshot: _CoverSnapshot | None = None
+    ) -> Callable[[], None]:
+        """Return a callback restoring a cover's state from before a command.
+
+        The state is taken now unless a snapshot is given. Nothing is restored
+        once a newer command or a reported level replaced the command's target.
+        """
+
+        status, position, previous_target, motion = snapshot or self._cover_snapshot(mac)
+
+        @callback
+        def rollback() -> None:
+            if self._cover_targets.get(mac) != target:
+                return
+            for cache, value in (
+                (self._cover_positions, position),
+                (self._cover_targets, previous_target),
+                (self._cover_motion_deadlines, motion),
+            ):
+                if value is None:
+                    cache.pop(mac, None)
+                else:
+                    cache[mac] = value
+            if self.data is None:
+                return
+            cover_states = dict(self.data.cover_states)
+            if status is None:
+                cover_states.pop(mac, None)
+            else:
+                cover_states[mac] = status
+            self.async_set_updated_data(replace(self.data, cover_states=cover_states))
+
+        return rollback
+
+    @callback
+    def _async_schedule_offline_retry(self) -> None:
+        """Retry flushing queued commands after a delay."""
+
+        @callback
+        def retry(_now: Any) -> None:
+            self._unsub_offline_retry = None
+            self._async_flush_offline_queue_soon()
+
+        self._unsub_offline_retry = async_call_later(
+            self.hass, _OFFLINE_RETRY_SECONDS, retry
+        )
+
+    @callback
+    def _async_flush_offline_queue_soon(self) -> None:
+        """Start flushing queued commands unless a flush is running."""
+
+        if self._offline_flushing:
+            return
+
+        now = monotonic()
+        if now - self._last_offline_flush_monotonic < _OFFLINE_MIN_FLUSH_INTERVAL_SECONDS:
+            if self._unsub_offline_retry is None:
+                self._async_schedule_offline_retry()
+            return
+
+        self._last_offline_flush_monotonic = now
+        if self._unsub_offline_retry is not None:
+            self._unsub_offline_retry()
+            self._unsub_offline_retry = None
+
+        self._offline_flushing = True
+        self.hass.async_create_background_task(
+            self._async_flush_offline_queue(), f"{DOMAIN}_offline_flush"
+        )
+
+    async def _async_flush_offline_queue(self) -> None:
+        """Send every queued command in one batch once the gateway answers.
+
+        The oldest command goes first as a probe, so an unreachable gateway
+        costs one connection attempt per retry rather than one per command.
+        """
+
+        queue = self.offline_queue
+        try:
+            if not queue:
+                return
+
+            entries = queue.take()
+            if not await self._async_flush_entry(queue, entries[0]):
+                for entry in entries[1:]:
+                    queue.requeue(entry)
+            else:
+                await asyncio.gather(
+                    *(self._async_flush_entry(queue, entry) for entry in entries[1:])
+                )
+        finally:
+            self._offline_flushing = False
+
+        if queue and self._unsub_offline_retry is None:
+            self._async_schedule_offline_retry()
+
+    async def _async_flush_entry(
+        self, queue: YunMaoOfflineQueue, entry: QueuedCommand
+    ) -> bool:
+        """Send a queued command and resolve it; return False if still unreachable."""
+
+        try:
+            await self.client.async_send_command(entry.mac, {entry.attribute: entry.value})
+        except YunMaoConnectionError:
+            queue.requeue(entry)
+            return False
+        except YunMaoClientError as err:
+            _LOGGER.debug("Queued Yun Mao command for %s failed: %s", entry.mac, err)
+            queue.resolve(entry, OUTCOME_FAILED)
+        else:
+            queue.resolve(entry, OUTCOME_SENT)
+        return True
+
     async def _async_set_cover_status(
         self, description: YunMaoCoverDescription, status: str
     ) -> None:
         """Send a cover command and update local state optimistically."""
 
-        try:
-            await self.client.async_set_cover_status(description.mac, status)
-        except YunMaoClientError as err:
-            raise HomeAssistantError(str(err)) from err
+        await self._async_send_command(
+            description.mac,
+            "WIN",
+            status,
+            self._cover_rollback(
+                description.mac, {"OPEN": 100, "CLOSE": 0}.get(status)
+            ),
+        )
 
         if self.data is None:
             return
 
         cover_states = dict(self.data.cover_states)
         cover_states[description.mac] = status
-        self.async_set_updated_data(
-            YunMaoCoordinatorData(
-                switch_states=dict(self.data.switch_states),
-                cover_states=cover_states,
-            )
-        )
+        self.async_set_updated_data(replace(self.data, cover_states=cover_states))
+
+    def _timed_parse_query_payload(
+        self, payload: dict[str, Any]
+    ) -> YunMaoCoordinatorData:
+        """Parse a query response and record how long it took."""
+
+        started = perf_counter()
+        data = self._parse_query_payload(payload)
+        self.client.metrics.observe("coordinator_parse_seconds", perf_counter() - started)
+        return data
 
     def _parse_query_payload(self, payload: dict[str, Any]) -> YunMaoCoordinatorData:
         """Parse the query response into cached raw state."""
@@ -471,6 +1376,7 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
 
         switch_states = dict(self.data.switch_states) if self.data else {}
         cover_states = dict(self.data.cover_states) if self.data else {}
+        cover_levels = dict(self.data.cover_levels) if self.data else {}
 
         for mac, state in attributes.items():
             if not isinstance(mac, str) or not isinstance(state, dict):
@@ -481,17 +1387,120 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
                     switch_states[mac] = int(str(raw_switch), 0)
                 except ValueError:
                     _LOGGER.debug("Ignoring invalid switch value from gateway: %s", raw_switch)
+                else:
+                    self._record_confirmed(mac, "SWI", switch_states[mac])
 
-            if mac in self._known_cover_macs and isinstance(state.get("WIN"), str):
-                status = state["WIN"]
-                cover_states[mac] = status
-                self._update_cover_position_cache(mac, status)
+            if mac in self._known_cover_macs:
+                self._merge_cover_attributes(
+                    mac, state, cover_states, cover_levels, is_push=False
+                )
 
         return YunMaoCoordinatorData(
             switch_states=switch_states,
             cover_states=cover_states,
+            cover_levels=cover_levels,
         )
 
+    def _merge_cover_attributes(
+        self,
+        mac: str,
+        attributes: dict[str, Any],
+        cover_states: dict[str, str],
+        cover_levels: dict[str, int],
+        is_push: bool,
+    ) -> bool:
+        """Merge reported WIN status and LEV level for a cover.
+
+        Returns True if anything was merged.
+        """
+
+        updated = False
+
+        if isinstance(status := attributes.get("WIN"), str):
+            cover_states[mac] = status
+            self._record_confirmed(mac, "WIN", status)
+            self._update_cover_position_cache(mac, status, mac in cover_levels)
+            updated = True
+
+        if (raw_level := attributes.get("LEV")) is not None:
+            if (level := self._parse_level(raw_level)) is None:
+                _LOGGER.debug("Ignoring invalid cover level for %s: %s", mac, raw_level)
+            else:
+                cover_levels[mac] = level
+                self._record_confirmed(mac, "LEV", level)
+                self._update_cover_level_cache(mac, level, is_push)
+                updated = True
+
+        return updated
+
+    def _record_confirmed(self, mac: str, attribute: str, value: Any) -> None:
+        """Remember a value the gateway reported and resolve matching waiters.
+
+        Only successfully parsed gateway reports are recorded, never optimistic
+        state, so they can answer whether a state is confirmed.
+        """
+
+        self._confirmed[(mac, attribute)] = (value, monotonic())
+        for waiter in self._state_waiters.get(mac, ()):
+            if (
+                waiter.attribute == attribute
+                and not waiter.future.done()
+                and waiter.matches(value)
+            ):
+                waiter.future.set_result(None)
+
+    def _is_confirmed(
+        self,
+        mac: str,
+        attribute: str,
+        matches: Callable[[Any], bool],
+        max_age: float | None = None,
+    ) -> bool:
+        """Return True if the gateway reported a matching value.
+
+        The cached state must still match too, so a command sent since the
+        report, whose result is not confirmed yet, is never treated as a no-op.
+        With max_age, older reports do not count.
+        """
+
+        if self.data is None:
+            return False
+
+        confirmed = self._confirmed.get((mac, attribute))
+        if confirmed is None or (
+            max_age is not None and monotonic() - confirmed[1] > max_age
+        ):
+            return False
+
+        if attribute == "SWI":
+            cached = self.data.switch_states.get(mac)
+        elif attribute == "WIN":
+            cached = self.data.cover_states.get(mac)
+        else:
+            cached = self.data.cover_levels.get(mac)
+
+        return cached is not None and matches(confirmed[0]) and matches(cached)
+
+    def _cover_is_confirmed(self, mac: str, status: str | None, level: int) -> bool:
+        """Return True if a cover was recently confirmed at rest at a status or level."""
+
+        if self.suppress_window is None or mac in self._cover_targets:
+            return False
+
+        if status is not None and self._is_confirmed(
+            mac, "WIN", status.__eq__, self.suppress_window
+        ):
+            return True
+
+        return self._is_confirmed(mac, "LEV", level.__eq__, self.suppress_window)
+
+    def _count_suppressed(self, name: str) -> None:
+        """Record a command skipped because it would not change anything."""
+
+        _LOGGER.debug("Skipping redundant Yun Mao command for %s", name)
+        self._suppressed_commands += 1
+        self.client.metrics.increment("coordinator_commands_suppressed_total")
+
     def _get_cover_motion(self, mac: str) -> tuple[bool, bool]:
         """Return transient cover movement flags."""
 
@@ -506,23 +1515,58 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
 
         return direction == "opening", direction == "closing"
 
-    def _update_cover_position_cache(self, mac: str, status: str) -> None:
-        """Keep the optimistic cover position in sync with coarse status updates."""
+    def _update_cover_position_cache(self, mac: str, status: str, has_level: bool) -> None:
+        """Keep the optimistic cover position in sync with coarse status updates.
 
-        if status == "OPEN":
+        Covers that report LEV get their position and motion from the level, so
+        only STOP is applied to them here.
+        """
+
+        if status == "STOP":
+            self._cover_motion_deadlines.pop(mac, None)
+            self._cover_targets.pop(mac, None)
+            self._cover_positions.setdefault(mac, 50)
+        elif has_level:
+            return
+        elif status == "OPEN":
             self._cover_positions[mac] = 100
             self._cover_motion_deadlines.pop(mac, None)
+            self._cover_targets.pop(mac, None)
         elif status == "CLOSE":
             self._cover_positions[mac] = 0
             self._cover_motion_deadlines.pop(mac, None)
-        elif status == "STOP":
+            self._cover_targets.pop(mac, None)
+
+    def _update_cover_level_cache(self, mac: str, level: int, is_push: bool) -> None:
+        """Apply a reported cover level and derive motion from it."""
+
+        previous = self._cover_positions.get(mac)
+        self._cover_positions[mac] = level
+        target = self._cover_targets.get(mac)
+
+        if target is not None:
+            if level == target:
+                self._cover_targets.pop(mac, None)
+                self._cover_motion_deadlines.pop(mac, None)
+                return
+            direction = "opening" if target > level else "closing"
+        elif is_push and previous is not None and level != previous:
+            # Progress pushes without a command of ours, e.g. from a wall switch.
+            direction = "opening" if level > previous else "closing"
+        else:
             self._cover_motion_deadlines.pop(mac, None)
-            self._cover_positions.setdefault(mac, 50)
+            return
+
+        self._cover_motion_deadlines[mac] = (direction, monotonic() + _MOTION_WINDOW_SECONDS)
 
     def _should_query_gateway(self) -> bool:
         """Return True when polling should fall back to a direct gateway query."""
 
-        if self._last_gateway_event_monotonic is None:
+        if (
+            self._last_gateway_event_monotonic is None
+            or self._resync_pending
+            or self._push_connected is False
+        ):
             return True
 
         return (
@@ -539,6 +1583,17 @@ class YunMaoCoordinator(DataUpdateCoordinator[YunMaoCoordinatorData]):
 
         return int(monotonic() - last_seen)
 
+    @staticmethod
+    def _parse_level(raw_level: Any) -> int | None:
+        """Return a reported cover level clamped to 0-100."""
+
+        try:
+            level = int(float(str(raw_level)))
+        except (OverflowError, ValueError):
+            return None
+
+        return max(0, min(100, level))
+
     @staticmethod
     def _switch_bit_is_on(status: int | None, pos: int) -> bool | None:
         """Return the value of a single switch bit."""
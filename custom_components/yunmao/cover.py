@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from time import monotonic
 from typing import Any
 
 from homeassistant.components.cover import (
@@ -10,11 +11,23 @@ from homeassistant.components.cover import (
     CoverEntity,
     CoverEntityFeature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+import voluptuous as vol
 
-from .coordinator import YunMaoConfigEntry
-from .entity import YunMaoEntity
+from .const import ATTR_COMMAND, ATTR_FORCE
+from .coordinator import YunMaoConfigEntry, YunMaoCoverState
+from .entity import YunMaoEntity, async_setup_device_entities
+
+COMMAND_OPEN = "open"
+COMMAND_CLOSE = "close"
+COMMAND_STOP = "stop"
+
+# While a cover moves, state changes inside this window are merged into one
+# write. Resting states are always written right away.
+_MOVING_WRITE_WINDOW_SECONDS = 1
 
 
 async def async_setup_entry(
@@ -24,14 +37,30 @@ async def async_setup_entry(
 ) -> None:
     """Set up Yun Mao cover entities."""
 
-    del hass
-
-    if not entry.runtime_data.coordinator.cover_descriptions:
-        return
-
-    async_add_entities(
-        YunMaoCurtain(entry.runtime_data.coordinator, description)
-        for description in entry.runtime_data.coordinator.cover_descriptions
+    async_setup_device_entities(
+        hass,
+        entry,
+        async_add_entities,
+        lambda coordinator: coordinator.cover_descriptions,
+        YunMaoCurtain,
+    )
+    entity_platform.async_get_current_platform().async_register_entity_service(
+        "set_cover",
+        vol.All(
+            cv.make_entity_service_schema(
+                {
+                    vol.Exclusive(ATTR_COMMAND, "target"): vol.In(
+                        (COMMAND_OPEN, COMMAND_CLOSE, COMMAND_STOP)
+                    ),
+                    vol.Exclusive(ATTR_POSITION, "target"): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=100)
+                    ),
+                    vol.Optional(ATTR_FORCE, default=False): cv.boolean,
+                }
+            ),
+            cv.has_at_least_one_key(ATTR_COMMAND, ATTR_POSITION),
+        ),
+        "async_set_cover",
     )
 
 
@@ -45,30 +74,100 @@ class YunMaoCurtain(YunMaoEntity, CoverEntity):
         | CoverEntityFeature.STOP
         | CoverEntityFeature.SET_POSITION
     )
+    _last_write_monotonic = 0.0
+    _cover_state: YunMaoCoverState | None = None
+    _unsub_deferred_write: CALLBACK_TYPE | None = None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending merged state write."""
+
+        await super().async_will_remove_from_hass()
+        self._cancel_deferred_write()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write resting states right away and merge writes while moving."""
+
+        state = self._current_state()
+        if self._unsub_deferred_write is None and self._written_state == (
+            state,
+            self.available,
+        ):
+            # Fan-outs for other devices do not change this cover.
+            return
+
+        if not state.is_opening and not state.is_closing:
+            self._async_write_state(state)
+            return
+
+        delay = self._last_write_monotonic + _MOVING_WRITE_WINDOW_SECONDS - monotonic()
+        if self._unsub_deferred_write is None and delay <= 0:
+            self._async_write_state(state)
+            return
+
+        self.coordinator.client.metrics.increment("cover_state_writes_suppressed_total")
+        if self._unsub_deferred_write is None:
+            self._unsub_deferred_write = async_call_later(
+                self.hass, delay, self._async_write_deferred_state
+            )
+
+    @callback
+    def _async_write_deferred_state(self, _now: Any) -> None:
+        """Write the merged state at the end of a window."""
+
+        self._unsub_deferred_write = None
+        self._async_write_state(self._current_state())
+
+    @callback
+    def _async_write_state(self, state: YunMaoCoverState) -> None:
+        """Write the current state and start a new merge window."""
+
+        self._cancel_deferred_write()
+        self._last_write_monotonic = monotonic()
+        super()._async_write_state(state)
+
+    def _current_state(self) -> YunMaoCoverState:
+        """Derive the cover state once per update for all state properties."""
+
+        self._cover_state = self.coordinator.get_cover_state(self.description)
+        return self._cover_state
+
+    @property
+    def _state(self) -> YunMaoCoverState:
+        """Return the cover state derived for the latest update."""
+
+        return self._cover_state or self._current_state()
+
+    def _cancel_deferred_write(self) -> None:
+        """Cancel a pending merged state write."""
+
+        if self._unsub_deferred_write is not None:
+            self._unsub_deferred_write()
+            self._unsub_deferred_write = None
 
     @property
     def is_opening(self) -> bool | None:
         """Return whether the cover is opening."""
 
-        return self.coordinator.get_cover_state(self.description).is_opening
+        return self._state.is_opening
 
     @property
     def is_closing(self) -> bool | None:
         """Return whether the cover is closing."""
 
-        return self.coordinator.get_cover_state(self.description).is_closing
+        return self._state.is_closing
 
     @property
     def is_closed(self) -> bool | None:
         """Return whether the cover is closed."""
 
-        return self.coordinator.get_cover_state(self.description).is_closed
+        return self._state.is_closed
 
     @property
     def current_cover_position(self) -> int | None:
         """Return the current cover position."""
 
-        return self.coordinator.get_cover_state(self.description).current_position
+        return self._state.current_position
 
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open the cover."""
@@ -96,3 +195,22 @@ class YunMaoCurtain(YunMaoEntity, CoverEntity):
             return
 
         await self.coordinator.async_set_cover_position(self.description, position)
+
+    async def async_set_cover(
+        self,
+        command: str | None = None,
+        position: int | None = None,
+        force: bool = False,
+    ) -> None:
+        """Move the cover, optionally sending even if nothing would change."""
+
+        if position is not None:
+            await self.coordinator.async_set_cover_position(
+                self.description, position, force=force
+            )
+        elif command == COMMAND_OPEN:
+            await self.coordinator.async_open_cover(self.description, force=force)
+        elif command == COMMAND_CLOSE:
+            await self.coordinator.async_close_cover(self.description, force=force)
+        else:
+            await self.coordinator.async_stop_cover(self.description)
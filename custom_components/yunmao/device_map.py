@@ -0,0 +1,149 @@
+"""Device map loading and hot reload for Yun Mao."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.util.yaml import load_yaml
+import voluptuous as vol
+
+from .const import (
+    CONF_MAC,
+    CONF_MAC2,
+    CONF_NAME,
+    CONF_POS,
+    CONF_POS2,
+    SIGNAL_DEVICE_MAP_UPDATED,
+    YunMaoCoverDescription,
+    YunMaoLightDescription,
+    get_cover_descriptions,
+    get_light_descriptions,
+    is_legacy_entry_data,
+)
+from .coordinator import YunMaoConfigEntry, async_get_push_server
+
+DEVICE_MAP_FILENAME = "yunmao_devices.yaml"
+
+CONF_LIGHTS = "lights"
+CONF_COVERS = "covers"
+
+DeviceMap = tuple[tuple[YunMaoLightDescription, ...], tuple[YunMaoCoverDescription, ...]]
+
+_MAC = vol.All(str, vol.Upper, vol.Match(r"^[0-9A-F]{16}$"))
+_POS = vol.All(vol.Coerce(int), vol.Range(min=1, max=8))
+
+DEVICE_MAP_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_LIGHTS, default=[]): [
+            vol.Schema(
+                {
+                    vol.Required(CONF_NAME): str,
+                    vol.Required(CONF_MAC): _MAC,
+                    vol.Required(CONF_POS): _POS,
+                    vol.Inclusive(CONF_MAC2, "secondary"): _MAC,
+                    vol.Inclusive(CONF_POS2, "secondary"): _POS,
+                }
+            )
+        ],
+        vol.Optional(CONF_COVERS, default=[]): [
+            vol.Schema({vol.Required(CONF_NAME): str, vol.Required(CONF_MAC): _MAC})
+        ],
+    }
+)
+
+
+def load_device_map(path: Path) -> DeviceMap | None:
+    """Load a device map file, or return None if there is none.
+
+    This does blocking I/O and must run in the executor.
+    """
+
+    if not path.is_file():
+        return None
+
+    try:
+        config = DEVICE_MAP_SCHEMA(load_yaml(path) or {})
+    except HomeAssistantError as err:
+        raise HomeAssistantError(f"Unable to read {path}: {err}") from err
+    except vol.Invalid as err:
+        raise HomeAssistantError(f"Invalid Yun Mao device map {path}: {err}") from err
+
+    names = [item[CONF_NAME] for item in (*config[CONF_LIGHTS], *config[CONF_COVERS])]
+    if len(names) != len(set(names)):
+        raise HomeAssistantError(f"Device names in {path} must be unique")
+
+    return (
+        tuple(
+            YunMaoLightDescription(
+                name=light[CONF_NAME],
+                primary_mac=light[CONF_MAC],
+                primary_pos=light[CONF_POS],
+                secondary_mac=light.get(CONF_MAC2),
+                secondary_pos=light.get(CONF_POS2),
+            )
+            for light in config[CONF_LIGHTS]
+        ),
+        tuple(
+            YunMaoCoverDescription(name=cover[CONF_NAME], mac=cover[CONF_MAC])
+            for cover in config[CONF_COVERS]
+        ),
+    )
+
+
+async def async_get_device_map(
+    hass: HomeAssistant, entry_data: Mapping[str, Any]
+) -> DeviceMap:
+    """Return the device map for a config entry.
+
+    Legacy single-device entries keep their own device; otherwise a
+    yunmao_devices.yaml file in the config directory replaces the built-in map.
+    """
+
+    if not is_legacy_entry_data(entry_data):
+        device_map = await hass.async_add_executor_job(
+            load_device_map, Path(hass.config.path(DEVICE_MAP_FILENAME))
+        )
+        if device_map is not None:
+            return device_map
+
+    return get_light_descriptions(entry_data), get_cover_descriptions(entry_data)
+
+
+async def async_reload_device_map(
+    hass: HomeAssistant, entry: YunMaoConfigEntry
+) -> dict[str, Any]:
+    """Swap the device map of a loaded entry in place.
+
+    The push listener, gateway client and cached state are kept; platforms
+    only add and remove the entities that changed.
+    """
+
+    coordinator = entry.runtime_data.coordinator
+    previous = {
+        description.unique_id
+        for description in (*coordinator.light_descriptions, *coordinator.cover_descriptions)
+    }
+
+    light_descriptions, cover_descriptions = await async_get_device_map(hass, entry.data)
+    coordinator.set_device_map(light_descriptions, cover_descriptions)
+    async_get_push_server(hass).update_listener_macs(
+        coordinator.handle_push_payload, coordinator.known_macs
+    )
+    async_dispatcher_send(hass, SIGNAL_DEVICE_MAP_UPDATED.format(entry.entry_id))
+    coordinator.async_update_listeners()
+    await coordinator.async_request_refresh()
+
+    current = {
+        description.unique_id for description in (*light_descriptions, *cover_descriptions)
+    }
+    return {
+        "lights": len(light_descriptions),
+        "covers": len(cover_descriptions),
+        "added": sorted(current - previous),
+        "removed": sorted(previous - current),
+    }
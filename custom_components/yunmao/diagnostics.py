@@ -8,7 +8,7 @@ from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.core import HomeAssistant
 
 from .const import CONF_INPUT_IP, CONF_MAC, CONF_MAC2, CONF_NAME, DOMAIN
-from .coordinator import YunMaoConfigEntry
+from .coordinator import YunMaoConfigEntry, async_get_push_server
 
 TO_REDACT = {CONF_INPUT_IP, CONF_MAC, CONF_MAC2, CONF_NAME}
 
@@ -18,10 +18,14 @@ async def async_get_config_entry_diagnostics(
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
 
-    del hass
+    push_server = async_get_push_server(hass)
+    recorder = push_server.recorder
 
     return {
         "domain": DOMAIN,
         "entry": async_redact_data(dict(entry.data), TO_REDACT),
         "runtime": entry.runtime_data.coordinator.diagnostics_data(),
+        "push_server": push_server.diagnostics_data(),
+        "metrics": entry.runtime_data.client.metrics.diagnostics_data(),
+        "capture": recorder.diagnostics_data() if recorder is not None else None,
     }
@@ -0,0 +1,149 @@
+"""LAN discovery of Yun Mao gateways."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+from collections.abc import Iterable
+from time import monotonic
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .protocol.frames import GATEWAY_PORT, build_query_payload, encode_frame
+
+_LOGGER = logging.getLogger(__name__)
+_DISCOVERY_CACHE = "discovered_gateways"
+
+DISCOVERY_CACHE_SECONDS = 300
+DISCOVERY_CONCURRENCY = 64
+DISCOVERY_CONNECT_TIMEOUT = 0.4
+DISCOVERY_PROBE_TIMEOUT = 2
+# Larger subnets are narrowed to the /24 around the host address so a scan
+# stays within a couple of seconds.
+DISCOVERY_MIN_PREFIX = 24
+
+
+async def async_discover_gateways(
+    hass: HomeAssistant, use_cache: bool = True
+) -> list[str]:
+    """Return gateway addresses found on the Home Assistant host's subnets."""
+
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cached: tuple[float, list[str]] | None = domain_data.get(_DISCOVERY_CACHE)
+    if use_cache and cached is not None and monotonic() - cached[0] < DISCOVERY_CACHE_SECONDS:
+        return list(cached[1])
+
+    hosts = await _async_get_scan_hosts(hass)
+    started = monotonic()
+    open_hosts = await async_scan_port(hosts, GATEWAY_PORT)
+    confirmed = await asyncio.gather(
+        *(async_probe_gateway(host, DISCOVERY_PROBE_TIMEOUT) for host in open_hosts)
+    )
+    gateways = [host for host, is_gateway in zip(open_hosts, confirmed) if is_gateway]
+
+    _LOGGER.debug(
+        "Scanned %s hosts for Yun Mao gateways in %.2fs, found %s",
+        len(hosts),
+        monotonic() - started,
+        gateways,
+    )
+    domain_data[_DISCOVERY_CACHE] = (monotonic(), gateways)
+    return list(gateways)
+
+
+async def async_scan_port(
+    hosts: Iterable[str],
+    port: int,
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_CONNECT_TIMEOUT,
+) -> list[str]:
+    """Return the hosts that accept TCP connections on a port."""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def async_check(host: str) -> bool:
+        async with semaphore:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host=host, port=port), timeout=timeout
+                )
+            except (asyncio.TimeoutError, OSError):
+                return False
+
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            return True
+
+    hosts = list(hosts)
+    results = await asyncio.gather(*(async_check(host) for host in hosts))
+    return [host for host, is_open in zip(hosts, results) if is_open]
+
+
+async def async_probe_gateway(host: str, timeout: float) -> bool:
+    """Return True if a host answers a state query like a Yun Mao gateway.
+
+    Only the first chunk of the response is read, so the probe stays cheap
+    even on gateways with large state dumps.
+    """
+
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host=host, port=GATEWAY_PORT), timeout=timeout
+        )
+    except (asyncio.TimeoutError, OSError):
+        return False
+
+    try:
+        writer.write(encode_frame(build_query_payload(host)))
+        await asyncio.wait_for(writer.drain(), timeout=timeout)
+        if writer.can_write_eof():
+            writer.write_eof()
+        chunk = await asyncio.wait_for(reader.read(4096), timeout=timeout)
+    except (asyncio.TimeoutError, OSError):
+        return False
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    chunk = chunk.lstrip()
+    return chunk.startswith(b"{") and (b'"attributes"' in chunk or b'"requestType"' in chunk)
+
+
+async def _async_get_scan_hosts(hass: HomeAssistant) -> list[str]:
+    """Return the candidate addresses on the enabled IPv4 interfaces."""
+
+    local_addresses: set[ipaddress.IPv4Address] = set()
+    networks: set[ipaddress.IPv4Network] = set()
+
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+
+        for ip_info in adapter["ipv4"]:
+            address = ipaddress.IPv4Address(ip_info["address"])
+            if address.is_loopback or address.is_link_local:
+                continue
+
+            local_addresses.add(address)
+            networks.add(
+                ipaddress.IPv4Network(
+                    (address, max(ip_info["network_prefix"], DISCOVERY_MIN_PREFIX)),
+                    strict=False,
+                )
+            )
+
+    return [
+        str(host)
+        for subnet in sorted(networks)
+        for host in subnet.hosts()
+        if host not in local_addresses
+    ]
@@ -2,20 +2,42 @@
 
 from __future__ import annotations
 
-from homeassistant.helpers.entity import DeviceInfo
+from abc import abstractmethod
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, YunMaoCoverDescription, YunMaoLightDescription
-from .coordinator import YunMaoCoordinator
+from .const import (
+    DOMAIN,
+    SIGNAL_DEVICE_MAP_UPDATED,
+    YunMaoCoverDescription,
+    YunMaoLightDescription,
+)
+from .coordinator import YunMaoConfigEntry, YunMaoCoordinator
+
+_DescriptionT = TypeVar(
+    "_DescriptionT", YunMaoLightDescription, YunMaoCoverDescription
+)
 
 
 class YunMaoEntity(
     CoordinatorEntity[YunMaoCoordinator],
 ):
-    """Base entity for Yun Mao devices."""
+    """Base entity for Yun Mao devices.
+
+    Coordinator fan-outs only write state when the entity's own state or
+    availability changed, so an update for one device does not rewrite every
+    entity of a large installation.
+    """
 
     _attr_has_entity_name = True
     _attr_name = None
+    _written_state: tuple[Any, bool] | None = None
 
     def __init__(
         self,
@@ -25,9 +47,87 @@ class YunMaoEntity(
         super().__init__(coordinator)
         self.description = description
         self._attr_unique_id = description.unique_id
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, description.device_identifier)},
-            manufacturer="lierda-new",
-            model=description.model,
-            name=description.name,
+        self._attr_device_info = coordinator.device_info(description)
+        if coordinator.device_identifier(description) != description.device_identifier:
+            # Grouped under a shared device, so the entity needs its own name.
+            self._attr_name = description.name
+
+    @abstractmethod
+    def _current_state(self) -> Any:
+        """Return the coordinator-derived state this entity writes."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if it changed since the last write."""
+
+        state = self._current_state()
+        if (state, self.available) != self._written_state:
+            self._async_write_state(state)
+
+    @callback
+    def _async_write_state(self, state: Any) -> None:
+        """Write the current state and remember what was written."""
+
+        self._written_state = (state, self.available)
+        self.async_write_ha_state()
+        self.coordinator.async_record_entity_write()
+
+
+@callback
+def async_setup_device_entities(
+    hass: HomeAssistant,
+    entry: YunMaoConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    get_descriptions: Callable[[YunMaoCoordinator], tuple[_DescriptionT, ...]],
+    entity_factory: Callable[[YunMaoCoordinator, _DescriptionT], YunMaoEntity],
+) -> None:
+    """Add entities for the device map and follow in-place device map reloads."""
+
+    coordinator = entry.runtime_data.coordinator
+    entities: dict[str, YunMaoEntity] = {}
+
+    @callback
+    def async_sync_entities() -> None:
+        descriptions = {
+            description.unique_id: description
+            for description in get_descriptions(coordinator)
+        }
+
+        entity_registry = er.async_get(hass)
+        device_registry = dr.async_get(hass)
+        kept_devices = {
+            coordinator.device_identifier(description)
+            for description in descriptions.values()
+        }
+        for unique_id in entities.keys() - descriptions.keys():
+            entity = entities.pop(unique_id)
+            if entity.entity_id is not None:
+                entity_registry.async_remove(entity.entity_id)
+            identifier = coordinator.device_identifier(entity.description)
+            if identifier in kept_devices:
+                continue
+            device = device_registry.async_get_device(
+                identifiers={(DOMAIN, identifier)}
+            )
+            if device is not None:
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=entry.entry_id
+                )
+
+        new_entities: list[YunMaoEntity] = []
+        for unique_id, description in descriptions.items():
+            if (entity := entities.get(unique_id)) is None:
+                entities[unique_id] = entity_factory(coordinator, description)
+                new_entities.append(entities[unique_id])
+            elif entity.description != description:
+                entity.description = description
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    async_sync_entities()
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_DEVICE_MAP_UPDATED.format(entry.entry_id), async_sync_entities
         )
+    )
@@ -0,0 +1,132 @@
+"""Raw push update events for Yun Mao."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .protocol.metrics import YunMaoMetrics
+
+EVENT_UPDATE = "yunmao_update"
+
+_SWITCH_CHANNELS = 8
+
+
+class YunMaoUpdateEvents:
+    """Fire a yunmao_update event for each push frame of selected devices.
+
+    Events skip the coordinator and entities, so automations that only react
+    to button presses see them first. Within the minimum interval, frames for
+    one MAC are merged into a single trailing event. Its changed channels
+    list every channel that flipped in any merged frame, so a press and
+    release inside one interval still shows up even though the bitmask ends
+    where it started.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        metrics: YunMaoMetrics,
+        macs: Iterable[str] | None,
+        min_interval: float,
+    ) -> None:
+        self.hass = hass
+        self.metrics = metrics
+        self.macs = frozenset(macs) if macs is not None else None
+        self.min_interval = min_interval
+        self._last_fired: dict[str, float] = {}
+        self._last_bitmask: dict[str, int] = {}
+        self._changed: dict[str, int] = {}
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+
+    @callback
+    def handle_push(
+        self, mac: str, attributes: dict[str, Any], known_bitmask: int | None = None
+    ) -> None:
+        """Fire or schedule an event for one decoded push frame.
+
+        known_bitmask is the MAC's switch state before this frame. It seeds
+        the changed channels of the first event, such as after a restart.
+        """
+
+        if self.macs is not None and mac not in self.macs:
+            return
+
+        if known_bitmask is not None:
+            self._last_bitmask.setdefault(mac, known_bitmask)
+
+        if (bitmask := _parse_bitmask(attributes.get("SWI"))) is not None:
+            previous = self._last_bitmask.get(mac)
+            self._last_bitmask[mac] = bitmask
+            if previous is not None:
+                self._changed[mac] = self._changed.get(mac, 0) | (bitmask ^ previous)
+
+        pending = self._pending.setdefault(mac, {})
+        pending.update(attributes)
+
+        if mac in self._timers:
+            self.metrics.increment("push_events_rate_limited_total")
+            return
+
+        delay = self._last_fired.get(mac, -self.min_interval) + self.min_interval - monotonic()
+        if delay > 0:
+            self.metrics.increment("push_events_rate_limited_total")
+            self._timers[mac] = self.hass.loop.call_later(delay, self._fire, mac)
+            return
+
+        self._fire(mac)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop pending trailing events."""
+
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._pending.clear()
+        self._changed.clear()
+
+    @callback
+    def _fire(self, mac: str) -> None:
+        """Fire the merged event for a MAC."""
+
+        self._timers.pop(mac, None)
+        attributes = self._pending.pop(mac, None)
+        if attributes is None:
+            return
+
+        changed = self._changed.pop(mac, 0)
+        status = attributes.get("WIN")
+        self._last_fired[mac] = monotonic()
+        self.metrics.increment("push_events_fired_total")
+        self.hass.bus.async_fire(
+            EVENT_UPDATE,
+            {
+                "mac": mac,
+                "bitmask": _parse_bitmask(attributes.get("SWI")),
+                "changed_channels": [
+                    pos
+                    for pos in range(1, _SWITCH_CHANNELS + 1)
+                    if changed >> (pos - 1) & 1
+                ],
+                "cover_status": status if isinstance(status, str) else None,
+                "cover_level": attributes.get("LEV"),
+            },
+        )
+
+
+def _parse_bitmask(raw_switch: Any) -> int | None:
+    """Return a reported switch bitmask, or None if absent or invalid."""
+
+    if raw_switch is None:
+        return None
+
+    try:
+        return int(str(raw_switch), 0)
+    except ValueError:
+        return None
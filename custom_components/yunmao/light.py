@@ -6,10 +6,13 @@ from typing import Any
 
 from homeassistant.components.light import ColorMode, LightEntity
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+import voluptuous as vol
 
+from .const import ATTR_FORCE
 from .coordinator import YunMaoConfigEntry
-from .entity import YunMaoEntity
+from .entity import YunMaoEntity, async_setup_device_entities
 
 
 async def async_setup_entry(
@@ -19,14 +22,20 @@ async def async_setup_entry(
 ) -> None:
     """Set up Yun Mao light entities."""
 
-    del hass
-
-    if not entry.runtime_data.coordinator.light_descriptions:
-        return
-
-    async_add_entities(
-        YunMaoLight(entry.runtime_data.coordinator, description)
-        for description in entry.runtime_data.coordinator.light_descriptions
+    async_setup_device_entities(
+        hass,
+        entry,
+        async_add_entities,
+        lambda coordinator: coordinator.light_descriptions,
+        YunMaoLight,
+    )
+    entity_platform.async_get_current_platform().async_register_entity_service(
+        "set_light",
+        {
+            vol.Required("on"): cv.boolean,
+            vol.Optional(ATTR_FORCE, default=False): cv.boolean,
+        },
+        "async_set_light",
     )
 
 
@@ -36,6 +45,11 @@ class YunMaoLight(YunMaoEntity, LightEntity):
     _attr_color_mode = ColorMode.ONOFF
     _attr_supported_color_modes = {ColorMode.ONOFF}
 
+    def _current_state(self) -> bool | None:
+        """Return the light state written to Home Assistant."""
+
+        return self.is_on
+
     @property
     def is_on(self) -> bool | None:
         """Return whether the light is on."""
@@ -53,3 +67,8 @@ class YunMaoLight(YunMaoEntity, LightEntity):
 
         del kwargs
         await self.coordinator.async_set_light_state(self.description, False)
+
+    async def async_set_light(self, on: bool, force: bool = False) -> None:
+        """Switch the light, optionally sending even if nothing would change."""
+
+        await self.coordinator.async_set_light_state(self.description, on, force=force)
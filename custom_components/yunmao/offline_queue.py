@@ -0,0 +1,152 @@
+"""Bounded queue for commands sent while the Yun Mao gateway is unreachable."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_MAX_QUEUED_COMMANDS = 64
+
+OUTCOME_SENT = "sent"
+OUTCOME_SUPERSEDED = "superseded"
+OUTCOME_EXPIRED = "expired"
+OUTCOME_FAILED = "failed"
+OUTCOME_DROPPED = "dropped"
+
+_OUTCOMES = (
+    OUTCOME_SENT,
+    OUTCOME_SUPERSEDED,
+    OUTCOME_EXPIRED,
+    OUTCOME_FAILED,
+    OUTCOME_DROPPED,
+)
+
+
+@dataclass(slots=True)
+class QueuedCommand:
+    """A command attribute waiting for the gateway to come back."""
+
+    mac: str
+    attribute: str
+    value: str
+    deadline: float
+    future: asyncio.Future[str]
+    expiry: asyncio.TimerHandle | None = None
+
+
+class YunMaoOfflineQueue:
+    """Hold commands for a limited time, keeping only the last per attribute.
+
+    Every enqueued command resolves to exactly one outcome: sent once a flush
+    delivered it, superseded by a later command for the same MAC and
+    attribute, expired after the TTL, failed, or dropped when the queue is
+    full or cleared.
+    """
+
+    def __init__(self, ttl: float, max_size: int = DEFAULT_MAX_QUEUED_COMMANDS) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: dict[tuple[str, str], QueuedCommand] = {}
+        self._outcomes = dict.fromkeys(_OUTCOMES, 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def async_enqueue(self, mac: str, attribute: str, value: str) -> str:
+        """Queue a command and wait for its outcome."""
+
+        loop = asyncio.get_running_loop()
+        key = (mac, attribute)
+
+        if (previous := self._entries.pop(key, None)) is not None:
+            self._resolve(previous, OUTCOME_SUPERSEDED)
+        elif len(self._entries) >= self.max_size:
+            self._outcomes[OUTCOME_DROPPED] += 1
+            return OUTCOME_DROPPED
+
+        entry = QueuedCommand(
+            mac, attribute, value, loop.time() + self.ttl, loop.create_future()
+        )
+        self._entries[key] = entry
+        self._schedule_expiry(entry)
+        return await entry.future
+
+    def take(self) -> list[QueuedCommand]:
+        """Remove and return every queued command for a flush, oldest first."""
+
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            self._cancel_expiry(entry)
+        return entries
+
+    def requeue(self, entry: QueuedCommand) -> None:
+        """Put back a command whose flush could not reach the gateway."""
+
+        if entry.future.done():
+            return
+
+        key = (entry.mac, entry.attribute)
+        if key in self._entries:
+            self._resolve(entry, OUTCOME_SUPERSEDED)
+        elif asyncio.get_running_loop().time() >= entry.deadline:
+            self._resolve(entry, OUTCOME_EXPIRED)
+        else:
+            self._entries[key] = entry
+            self._schedule_expiry(entry)
+
+    def resolve(self, entry: QueuedCommand, outcome: str) -> None:
+        """Report the outcome of a flushed command."""
+
+        self._resolve(entry, outcome)
+
+    def clear(self) -> None:
+        """Drop every queued command."""
+
+        for entry in self.take():
+            self._resolve(entry, OUTCOME_DROPPED)
+
+    def diagnostics_data(self) -> dict[str, Any]:
+        """Return queue settings, queued commands and outcome counts."""
+
+        return {
+            "ttl": self.ttl,
+            "max_size": self.max_size,
+            "queued": len(self._entries),
+            "outcomes": dict(self._outcomes),
+        }
+
+    def _schedule_expiry(self, entry: QueuedCommand) -> None:
+        """Expire a queued command at its deadline."""
+
+        entry.expiry = asyncio.get_running_loop().call_at(
+            entry.deadline, self._expire, entry
+        )
+
+    @staticmethod
+    def _cancel_expiry(entry: QueuedCommand) -> None:
+        """Cancel the expiry of a command that left the queue."""
+
+        if entry.expiry is not None:
+            entry.expiry.cancel()
+            entry.expiry = None
+
+    def _expire(self, entry: QueuedCommand) -> None:
+        """Expire a command that is still queued when its TTL runs out."""
+
+        entry.expiry = None
+        key = (entry.mac, entry.attribute)
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+            self._resolve(entry, OUTCOME_EXPIRED)
+
+    def _resolve(self, entry: QueuedCommand, outcome: str) -> None:
+        """Resolve a command's waiter with an outcome once."""
+
+        self._cancel_expiry(entry)
+        if entry.future.done():
+            return
+
+        self._outcomes[outcome] += 1
+        entry.future.set_result(outcome)
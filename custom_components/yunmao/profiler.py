@@ -0,0 +1,169 @@
+"""On-demand profiling of the Yun Mao push and command pipelines."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+_PROFILE_LOCK = "profile_lock"
+
+# Restricts the summary to frames from this integration. cProfile records the
+# whole event loop thread, which covers the push server, push handling,
+# coordinator refreshes and client requests without any hooks in those paths.
+INTEGRATION_PATH_PATTERN = r"custom_components[\\/]yunmao[\\/]"
+
+
+async def async_run_profile(
+    hass: HomeAssistant, duration: float, top: int, sampling: bool
+) -> dict[str, Any]:
+    """Profile the event loop for a fixed duration and write the results."""
+
+    lock: asyncio.Lock = hass.data.setdefault(DOMAIN, {}).setdefault(
+        _PROFILE_LOCK, asyncio.Lock()
+    )
+    if lock.locked():
+        raise HomeAssistantError("A Yun Mao profile is already running")
+
+    async with lock:
+        started = dt_util.utcnow()
+        base_path = Path(hass.config.path(f"{DOMAIN}_profile_{_file_stamp(started)}"))
+
+        stats_path = base_path.with_suffix(".pstats")
+        summary_path = base_path.with_suffix(".txt")
+
+        if sampling:
+            sampler = _async_create_sampler()
+            if sampler is not None:
+                return await _async_run_sampler(
+                    hass, sampler, duration, stats_path, summary_path, top
+                )
+            _LOGGER.warning(
+                "Sampling profiler requested but pyinstrument is not installed, using cProfile"
+            )
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as err:
+            raise HomeAssistantError(f"Unable to start profiler: {err}") from err
+
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            profiler.disable()
+
+        await hass.async_add_executor_job(
+            _write_cprofile_results, profiler, stats_path, summary_path, top
+        )
+
+        _LOGGER.info("Yun Mao profile written to %s", summary_path)
+        return {
+            "profiler": "cprofile",
+            "duration": duration,
+            "stats_path": str(stats_path),
+            "summary_path": str(summary_path),
+        }
+
+
+def _async_create_sampler() -> Any | None:
+    """Return a sampling profiler when pyinstrument is available.
+
+    Versions without a pstats renderer count as unavailable, so both
+    profilers always write the same files.
+    """
+
+    try:
+        from pyinstrument import Profiler  # noqa: PLC0415
+        from pyinstrument.renderers import PstatsRenderer  # noqa: F401, PLC0415
+    except ImportError:
+        return None
+
+    return Profiler(interval=0.001, async_mode="disabled")
+
+
+async def _async_run_sampler(
+    hass: HomeAssistant,
+    sampler: Any,
+    duration: float,
+    stats_path: Path,
+    summary_path: Path,
+    top: int,
+) -> dict[str, Any]:
+    """Run the sampling profiler and write the same files as cProfile."""
+
+    from pyinstrument.renderers import PstatsRenderer  # noqa: PLC0415
+
+    sampler.start()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        sampler.stop()
+
+    # The renderer returns marshalled stats decoded with surrogateescape.
+    stats = sampler.output(PstatsRenderer()).encode("utf-8", "surrogateescape")
+    await hass.async_add_executor_job(
+        _write_sampler_results, stats, stats_path, summary_path, top
+    )
+
+    _LOGGER.info("Yun Mao sampling profile written to %s", summary_path)
+    return {
+        "profiler": "pyinstrument",
+        "duration": duration,
+        "stats_path": str(stats_path),
+        "summary_path": str(summary_path),
+    }
+
+
+def _write_cprofile_results(
+    profiler: cProfile.Profile, stats_path: Path, summary_path: Path, top: int
+) -> None:
+    """Dump raw stats and a top-N summary to disk."""
+
+    profiler.dump_stats(stats_path)
+    _write_summary(stats_path, summary_path, top)
+
+
+def _write_sampler_results(
+    stats: bytes, stats_path: Path, summary_path: Path, top: int
+) -> None:
+    """Write sampled stats and a top-N summary to disk."""
+
+    stats_path.write_bytes(stats)
+    _write_summary(stats_path, summary_path, top)
+
+
+def _write_summary(stats_path: Path, summary_path: Path, top: int) -> None:
+    """Write the top-N summary of a stats file."""
+
+    output = io.StringIO()
+
+    output.write("Yun Mao functions by cumulative time\n\n")
+    # strip_dirs drops the path, so the integration view filters a full copy.
+    pstats.Stats(str(stats_path), stream=output).sort_stats(
+        pstats.SortKey.CUMULATIVE
+    ).print_stats(INTEGRATION_PATH_PATTERN, top)
+    output.write("\nEvent loop functions by internal time\n\n")
+    pstats.Stats(str(stats_path), stream=output).strip_dirs().sort_stats(
+        pstats.SortKey.TIME
+    ).print_stats(top)
+
+    summary_path.write_text(output.getvalue(), "utf-8")
+
+
+def _file_stamp(moment: datetime) -> str:
+    """Return a filesystem-safe timestamp."""
+
+    return moment.strftime("%Y%m%d_%H%M%S")
@@ -0,0 +1,31 @@
+"""Home Assistant independent Yun Mao gateway protocol library.
+
+Nothing in this package imports Home Assistant or the integration, so
+tooling can load it without Home Assistant, see scripts/protocol_path.py.
+"""
+
+from .client import YunMaoGatewayClient
+from .errors import YunMaoConnectionError, YunMaoError, YunMaoProtocolError
+from .frames import (
+    GATEWAY_PORT,
+    PUSH_PORT,
+    PushFramer,
+    build_command_payload,
+    build_query_payload,
+    decode_response,
+    encode_frame,
+)
+
+__all__ = [
+    "GATEWAY_PORT",
+    "PUSH_PORT",
+    "PushFramer",
+    "YunMaoConnectionError",
+    "YunMaoError",
+    "YunMaoGatewayClient",
+    "YunMaoProtocolError",
+    "build_command_payload",
+    "build_query_payload",
+    "decode_response",
+    "encode_frame",
+]
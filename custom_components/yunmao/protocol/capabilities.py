@@ -0,0 +1,199 @@
+"""Gateway capability probing for Yun Mao."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+from .errors import YunMaoError
+from .frames import GATEWAY_PORT, build_query_payload, encode_frame
+from .scheduler import PRIORITY_QUERY, YunMaoRequestScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 3
+# How long a connection must stay open after a response to count as
+# persistent.
+PERSISTENT_LINGER_SECONDS = 0.5
+
+_VERSION_KEY_HINTS = ("ver", "firmware", "fw", "model")
+
+
+@dataclass(frozen=True, slots=True)
+class YunMaoCapabilities:
+    """Optional protocol features a gateway supports.
+
+    The defaults describe the most conservative gateway.
+    """
+
+    persistent_connection: bool = False
+    single_mac_query: bool = False
+
+    def as_dict(self) -> dict[str, bool]:
+        """Return the capabilities for storage and diagnostics."""
+
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> YunMaoCapabilities:
+        """Return capabilities from stored data, ignoring unknown keys."""
+
+        return cls(
+            **{
+                field.name: bool(data[field.name])
+                for field in fields(cls)
+                if field.name in data
+            }
+        )
+
+
+def firmware_signature(payload: dict[str, Any]) -> str:
+    """Return a short signature of a query response's firmware-specific shape.
+
+    The signature covers the top-level keys and any version-like values, but
+    not the device list, so pairing a device does not trigger a new probe.
+    """
+
+    shape = {
+        key: value if any(hint in key.lower() for hint in _VERSION_KEY_HINTS) else None
+        for key, value in payload.items()
+        if key != "attributes"
+    }
+    encoded = json.dumps(shape, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+async def async_probe_capabilities(
+    host: str,
+    state: dict[str, Any],
+    scheduler: YunMaoRequestScheduler,
+    port: int = GATEWAY_PORT,
+    timeout: float = PROBE_TIMEOUT,
+) -> YunMaoCapabilities:
+    """Probe a gateway with query frames, which never change a device.
+
+    The state is a full query response from the same gateway. Probes run as
+    background requests on the gateway's scheduler, so they never compete
+    with user commands for a connection slot.
+    """
+
+    attributes = state.get("attributes")
+    devices = attributes if isinstance(attributes, dict) else {}
+
+    capabilities = YunMaoCapabilities(
+        single_mac_query=await scheduler.async_run(
+            lambda: _async_probe_single_mac_query(host, port, timeout, devices),
+            priority=PRIORITY_QUERY,
+        ),
+        persistent_connection=await scheduler.async_run(
+            lambda: _async_probe_persistent_connection(host, port, timeout),
+            priority=PRIORITY_QUERY,
+        ),
+    )
+    _LOGGER.debug("Yun Mao gateway %s capabilities: %s", host, capabilities)
+    return capabilities
+
+
+async def _async_probe_single_mac_query(
+    host: str, port: int, timeout: float, devices: dict[str, Any]
+) -> bool:
+    """Return True if a query for one MAC returns only that device."""
+
+    if len(devices) < 2:
+        return False
+
+    mac = next(iter(devices))
+    payload = build_query_payload(host)
+    payload["id"] = mac
+    try:
+        response = await _async_exchange(host, port, timeout, encode_frame(payload))
+    except (YunMaoError, OSError, asyncio.TimeoutError):
+        return False
+
+    returned = response.get("attributes") if response else None
+    return isinstance(returned, dict) and list(returned) == [mac]
+
+
+async def _async_probe_persistent_connection(host: str, port: int, timeout: float) -> bool:
+    """Return True if two queries can share one connection."""
+
+    frame = encode_frame(build_query_payload(host))
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host=host, port=port), timeout=timeout
+        )
+    except (asyncio.TimeoutError, OSError):
+        return False
+
+    try:
+        for _ in range(2):
+            writer.write(frame)
+            await asyncio.wait_for(writer.drain(), timeout=timeout)
+            if await async_read_json_object(reader, timeout) is None:
+                return False
+            try:
+                if await asyncio.wait_for(reader.read(1), PERSISTENT_LINGER_SECONDS) == b"":
+                    return False
+            except asyncio.TimeoutError:
+                pass
+        return True
+    except (asyncio.TimeoutError, OSError):
+        return False
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _async_exchange(
+    host: str, port: int, timeout: float, frame: bytes
+) -> dict[str, Any] | None:
+    """Send one frame on its own connection and return the JSON reply, if any."""
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host=host, port=port), timeout=timeout
+    )
+    try:
+        writer.write(frame)
+        await asyncio.wait_for(writer.drain(), timeout=timeout)
+        if writer.can_write_eof():
+            writer.write_eof()
+        return await async_read_json_object(reader, timeout)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def async_read_json_object(
+    reader: asyncio.StreamReader, timeout: float
+) -> dict[str, Any] | None:
+    """Read one JSON object from a stream without waiting for it to close.
+
+    Returns None if the stream ends or goes quiet before a complete object.
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while True:
+        try:
+            chunk = await asyncio.wait_for(reader.read(8192), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if not chunk:
+            return None
+
+        buffer += chunk.decode("utf-8", errors="replace")
+        try:
+            decoded, _ = decoder.raw_decode(buffer.lstrip())
+        except json.JSONDecodeError:
+            continue
+        return decoded if isinstance(decoded, dict) else None
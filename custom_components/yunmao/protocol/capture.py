@@ -0,0 +1,174 @@
+"""Traffic capture for Yun Mao gateway and push streams."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import logging
+import queue
+from collections.abc import Iterator
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from time import time
+from typing import Any
+
+CAPTURE_FILENAME = "yunmao_capture.jsonl"
+DEFAULT_CAPTURE_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_CAPTURE_BACKUPS = 3
+
+KIND_PUSH = "push"
+KIND_REQUEST = "request"
+
+
+class YunMaoTrafficRecorder:
+    """Append raw push lines and gateway requests to a rotating JSON lines file.
+
+    Records are handed to a background thread, so the event loop never waits
+    for disk writes. Each record carries a wall clock arrival time that replay
+    uses to reproduce the original pacing. Push lines are stored base64
+    encoded, so frames that are not valid UTF-8 replay byte for byte.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_CAPTURE_MAX_BYTES,
+        backups: int = DEFAULT_CAPTURE_BACKUPS,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.records = 0
+        self._queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._logger = logging.Logger(f"{__name__}.recorder")
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(self._queue))
+        self._listener: QueueListener | None = None
+
+    def start(self) -> None:
+        """Open the capture file and start the writer thread.
+
+        This does blocking I/O and must run in the executor.
+        """
+
+        handler = RotatingFileHandler(
+            self.path,
+            maxBytes=self.max_bytes,
+            backupCount=self.backups,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Flush pending records and close the capture file.
+
+        This does blocking I/O and must run in the executor.
+        """
+
+        if self._listener is None:
+            return
+
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+    def record_push(self, line: bytes, source: str | None) -> None:
+        """Record a raw push line as it arrived."""
+
+        self._write(
+            {
+                "t": time(),
+                "kind": KIND_PUSH,
+                "source": source,
+                "data": base64.b64encode(line).decode("ascii"),
+            }
+        )
+
+    def record_request(
+        self,
+        host: str,
+        payload: dict[str, Any],
+        response: dict[str, Any] | None,
+        error: str | None = None,
+    ) -> None:
+        """Record a gateway request together with its response or error."""
+
+        record: dict[str, Any] = {
+            "t": time(),
+            "kind": KIND_REQUEST,
+            "host": host,
+            "payload": payload,
+            "response": response,
+        }
+        if error is not None:
+            record["error"] = error
+        self._write(record)
+
+    def diagnostics_data(self) -> dict[str, Any]:
+        """Return the recorder configuration and record count."""
+
+        return {
+            "path": str(self.path),
+            "max_bytes": self.max_bytes,
+            "backups": self.backups,
+            "records": self.records,
+        }
+
+    def _write(self, record: dict[str, Any]) -> None:
+        """Queue a record for the writer thread."""
+
+        self.records += 1
+        self._logger.info(
+            "%s", json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        )
+
+
+def iter_capture_records(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield capture records oldest first, including rotated backups."""
+
+    backups = sorted(
+        (
+            candidate
+            for candidate in path.parent.glob(f"{path.name}.*")
+            if candidate.suffix[1:].isdigit()
+        ),
+        key=lambda candidate: int(candidate.suffix[1:]),
+        reverse=True,
+    )
+
+    for file_path in (*backups, path):
+        if not file_path.exists():
+            continue
+        with file_path.open(encoding="utf-8") as capture:
+            for line in capture:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+def capture_push_line(record: dict[str, Any]) -> bytes | None:
+    """Return the raw line of a push record, or None if it has none.
+
+    Captures written before lines were stored as bytes hold a decoded
+    "line" string instead.
+    """
+
+    if isinstance(data := record.get("data"), str):
+        try:
+            return base64.b64decode(data, validate=True)
+        except binascii.Error:
+            return None
+
+    if isinstance(line := record.get("line"), str):
+        return line.encode("utf-8")
+
+    return None
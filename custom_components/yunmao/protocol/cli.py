@@ -0,0 +1,247 @@
+"""Command line tool for talking to Yun Mao gateways.
+
+Run it through scripts/yunmao_cli.py, which loads this package without
+Home Assistant:
+
+    python scripts/yunmao_cli.py query 192.168.1.50
+    python scripts/yunmao_cli.py set 192.168.1.50 FFFF301B977B24F4 KY1=ON
+    python scripts/yunmao_cli.py watch --mac FFFF301B977B24F4
+    python scripts/yunmao_cli.py bench 192.168.1.50 --requests 200
+    python scripts/yunmao_cli.py simulate --lights 8 --covers 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Sequence
+from time import perf_counter, strftime
+
+from .client import YunMaoGatewayClient
+from .errors import YunMaoError
+from .frames import GATEWAY_PORT, PUSH_PORT
+from .metrics import YunMaoMetrics
+from .push import async_start_push_listener
+from .push_filter import FRAME_RELEVANT, FRAME_UNKNOWN, YunMaoPushFilter
+from .scheduler import YunMaoRequestScheduler
+from .simulator import YunMaoGatewaySimulator
+
+
+def _client(args: argparse.Namespace) -> YunMaoGatewayClient:
+    """Return a client with its own scheduler for one CLI run."""
+
+    return YunMaoGatewayClient(
+        args.host,
+        scheduler=YunMaoRequestScheduler(
+            max_in_flight=args.concurrency, reserved_command_slots=0
+        ),
+        port=args.port,
+        timeout=args.timeout,
+    )
+
+
+def _parse_attributes(values: Sequence[str]) -> dict[str, str]:
+    """Parse ATTRIBUTE=VALUE arguments."""
+
+    attributes: dict[str, str] = {}
+    for value in values:
+        attribute, separator, setting = value.partition("=")
+        if not separator or not attribute:
+            raise argparse.ArgumentTypeError(f"Expected ATTRIBUTE=VALUE, got {value!r}")
+        attributes[attribute] = setting
+    return attributes
+
+
+async def _async_query(args: argparse.Namespace) -> int:
+    """Print the gateway state."""
+
+    state = await _client(args).async_fetch_state()
+    if args.mac:
+        state = state.get("attributes", {}).get(args.mac, {})
+    print(json.dumps(state, ensure_ascii=False, indent=None if args.compact else 2))
+    return 0
+
+
+async def _async_set(args: argparse.Namespace) -> int:
+    """Send one command frame."""
+
+    await _client(args).async_send_command(args.mac, _parse_attributes(args.attributes))
+    return 0
+
+
+async def _async_watch(args: argparse.Namespace) -> int:
+    """Print push frames until interrupted."""
+
+    push_filter = YunMaoPushFilter(args.mac) if args.mac else None
+
+    def handle_line(line: bytes, source: str | None) -> None:
+        if push_filter is not None and push_filter.classify(line) not in (
+            FRAME_RELEVANT,
+            FRAME_UNKNOWN,
+        ):
+            return
+        print(f"{strftime('%H:%M:%S')} {source} {line.decode('utf-8', 'replace')}", flush=True)
+
+    server = await async_start_push_listener(handle_line, host=args.bind, port=args.port)
+    async with server:
+        await server.serve_forever()
+    return 0
+
+
+async def _async_bench(args: argparse.Namespace) -> int:
+    """Measure request latency and throughput against a gateway."""
+
+    metrics = YunMaoMetrics()
+    client = _client(args)
+    client.metrics = metrics
+    attributes = _parse_attributes(args.attributes) if args.attributes else None
+    if attributes is not None and not args.mac:
+        raise argparse.ArgumentTypeError("--mac is required with command attributes")
+
+    errors = 0
+    latencies: list[float] = []
+
+    async def async_one() -> None:
+        nonlocal errors
+        started = perf_counter()
+        try:
+            if attributes is None:
+                await client.async_fetch_state(coalesce=False)
+            else:
+                await client.async_send_command(args.mac, attributes)
+        except YunMaoError:
+            errors += 1
+            return
+        latencies.append(perf_counter() - started)
+
+    started = perf_counter()
+    await asyncio.gather(*(async_one() for _ in range(args.requests)))
+    elapsed = perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(percent: float) -> float:
+        if not latencies:
+            return float("nan")
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percent / 100))] * 1000
+
+    print(
+        json.dumps(
+            {
+                "requests": args.requests,
+                "errors": errors,
+                "seconds": round(elapsed, 3),
+                "requests_per_second": round(args.requests / elapsed, 1) if elapsed else None,
+                "p50_ms": round(percentile(50), 2),
+                "p95_ms": round(percentile(95), 2),
+                "p99_ms": round(percentile(99), 2),
+                "metrics": metrics.diagnostics_data(),
+            },
+            indent=2,
+        )
+    )
+    return 1 if errors else 0
+
+
+async def _async_simulate(args: argparse.Namespace) -> int:
+    """Run a simulated gateway until interrupted or the traffic run ends."""
+
+    simulator = YunMaoGatewaySimulator(
+        [f"FFFF301B977B{index:04X}" for index in range(args.lights)],
+        [f"00124B0024{index:06X}" for index in range(args.covers)],
+        host=args.bind,
+        port=args.port,
+        push_host=args.push_host,
+        push_port=args.push_port,
+        persistent=args.persistent,
+    )
+    await simulator.async_start()
+    print(f"Simulated gateway listening on {args.bind}:{simulator.port}", flush=True)
+    try:
+        if args.rate > 0:
+            sent = await simulator.async_run_traffic(args.rate, args.duration, args.seed)
+            print(f"Pushed {sent} frames", flush=True)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await simulator.async_stop()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser."""
+
+    parser = argparse.ArgumentParser(prog="yunmao", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_gateway_arguments(command: argparse.ArgumentParser) -> None:
+        command.add_argument("host")
+        command.add_argument("--port", type=int, default=GATEWAY_PORT)
+        command.add_argument("--timeout", type=float, default=5)
+        command.add_argument("--concurrency", type=int, default=2)
+
+    query = commands.add_parser("query", help="print the gateway state")
+    add_gateway_arguments(query)
+    query.add_argument("--mac", help="only print this device")
+    query.add_argument("--compact", action="store_true")
+    query.set_defaults(handler=_async_query)
+
+    set_command = commands.add_parser("set", help="send a command, e.g. KY1=ON or LEV=40")
+    add_gateway_arguments(set_command)
+    set_command.add_argument("mac")
+    set_command.add_argument("attributes", nargs="+", metavar="ATTRIBUTE=VALUE")
+    set_command.set_defaults(handler=_async_set)
+
+    watch = commands.add_parser("watch", help="listen for push frames")
+    watch.add_argument("--bind", default="0.0.0.0")
+    watch.add_argument("--port", type=int, default=PUSH_PORT)
+    watch.add_argument("--mac", action="append", help="only print these devices")
+    watch.set_defaults(handler=_async_watch)
+
+    bench = commands.add_parser("bench", help="measure request latency and throughput")
+    add_gateway_arguments(bench)
+    bench.add_argument("--requests", type=int, default=100)
+    bench.add_argument("--mac", help="device for command benchmarks")
+    bench.add_argument(
+        "attributes",
+        nargs="*",
+        metavar="ATTRIBUTE=VALUE",
+        help="benchmark this command instead of state queries",
+    )
+    bench.set_defaults(handler=_async_bench)
+
+    simulate = commands.add_parser("simulate", help="run a simulated gateway")
+    simulate.add_argument("--bind", default="127.0.0.1")
+    simulate.add_argument("--port", type=int, default=GATEWAY_PORT)
+    simulate.add_argument("--push-host", default="127.0.0.1")
+    simulate.add_argument("--push-port", type=int, default=PUSH_PORT)
+    simulate.add_argument("--lights", type=int, default=8, help="switch panels")
+    simulate.add_argument("--covers", type=int, default=2)
+    simulate.add_argument("--rate", type=float, default=0, help="random pushes per second")
+    simulate.add_argument("--duration", type=float, default=60)
+    simulate.add_argument("--seed", type=int)
+    simulate.add_argument(
+        "--persistent", action="store_true", help="keep request connections open"
+    )
+    simulate.set_defaults(handler=_async_simulate)
+
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command line tool."""
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(args.handler(args))
+    except argparse.ArgumentTypeError as err:
+        parser.error(str(err))
+    except YunMaoError as err:
+        print(f"error: {err}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
@@ -0,0 +1,349 @@
+"""Async TCP client for Yun Mao gateways."""
+
+from __future__ import annotations
+
+import asyncio
+from time import perf_counter
+from typing import Any
+
+from .capabilities import YunMaoCapabilities
+from .capture import YunMaoTrafficRecorder
+from .errors import YunMaoConnectionError, YunMaoError, YunMaoProtocolError
+from .frames import (
+    GATEWAY_PORT,
+    build_command_payload,
+    build_query_payload,
+    decode_response,
+    encode_frame,
+)
+from .metrics import YunMaoMetrics
+from .scheduler import (
+    PRIORITY_COMMAND,
+    PRIORITY_QUERY,
+    YunMaoRequestScheduler,
+    get_scheduler,
+    release_scheduler,
+)
+
+DEFAULT_TIMEOUT = 5
+# Persistent command connections are reopened after this much idle time
+# rather than trusting a socket the gateway may have dropped silently.
+PERSISTENT_IDLE_SECONDS = 30
+
+
+class YunMaoGatewayClient:
+    """Async Yun Mao TCP client.
+
+    By default every request opens its own connection: the frame is written,
+    the write side is shut down and the response is read until the gateway
+    closes. Gateways known to keep connections open get their commands over
+    one reused connection instead.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        metrics: YunMaoMetrics | None = None,
+        scheduler: YunMaoRequestScheduler | None = None,
+        *,
+        port: int = GATEWAY_PORT,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.metrics = metrics or YunMaoMetrics()
+        # Clients without their own scheduler share one per host until closed.
+        self._shared_scheduler = scheduler is None
+        self.scheduler = scheduler or get_scheduler(host)
+        self.recorder: YunMaoTrafficRecorder | None = None
+        self.capabilities = YunMaoCapabilities()
+        self._command_writer: asyncio.StreamWriter | None = None
+        self._command_reader_task: asyncio.Task[None] | None = None
+        self._command_last_used = 0.0
+        self._command_connect_lock = asyncio.Lock()
+
+    async def async_close(self) -> None:
+        """Close the persistent command connection and release the shared scheduler."""
+
+        self._drop_command_connection()
+        if self._shared_scheduler:
+            self._shared_scheduler = False
+            release_scheduler(self.host)
+
+    async def async_fetch_state(self, *, coalesce: bool = True) -> dict[str, Any]:
+        """Fetch the latest gateway state.
+
+        Queued queries are coalesced into one request unless coalesce is False.
+        """
+
+        response = await self._async_request(
+            build_query_payload(self.host),
+            expect_response=True,
+            priority=PRIORITY_QUERY,
+            key="query" if coalesce else None,
+        )
+        if response is None:
+            raise YunMaoProtocolError("Missing Yun Mao gateway response")
+        return response
+
+    async def async_fetch_device_state(self, mac: str) -> dict[str, Any]:
+        """Fetch the state of one device.
+
+        Gateways without single-MAC queries answer with a full state dump.
+        """
+
+        if not self.capabilities.single_mac_query:
+            return await self.async_fetch_state()
+
+        payload = build_query_payload(self.host)
+        payload["id"] = mac
+        response = await self._async_request(
+            payload, expect_response=True, priority=PRIORITY_QUERY, key=f"query:{mac}"
+        )
+        if response is None:
+            raise YunMaoProtocolError("Missing Yun Mao gateway response")
+        return response
+
+    async def async_send_command(self, mac: str, attributes: dict[str, str]) -> None:
+        """Send a command frame setting attributes on a device."""
+
+        await self._async_request(
+            build_command_payload(self.host, mac, attributes), expect_response=False
+        )
+
+    async def async_dispatch_command(
+        self, mac: str, attributes: dict[str, str]
+    ) -> asyncio.Task[None]:
+        """Send a command frame and return as soon as it is flushed to the socket.
+
+        The returned task finishes the request, including connection teardown,
+        and raises if that fails. Gateways do not acknowledge commands, so
+        after the flush only a failure to shut down the write side is
+        detected. Errors before the frame is flushed are raised here instead.
+        """
+
+        loop = asyncio.get_running_loop()
+        flushed: asyncio.Future[None] = loop.create_future()
+        delivery = loop.create_task(
+            self._async_request(
+                build_command_payload(self.host, mac, attributes),
+                expect_response=False,
+                flushed=flushed,
+            )
+        )
+        await asyncio.wait((flushed, delivery), return_when=asyncio.FIRST_COMPLETED)
+        if not flushed.done():
+            flushed.cancel()
+            delivery.result()
+        return delivery
+
+    async def async_set_light_state(self, mac: str, pos: int, is_on: bool) -> None:
+        """Set a light channel state."""
+
+        await self.async_send_command(mac, {f"KY{pos}": "ON" if is_on else "OFF"})
+
+    async def async_set_cover_status(self, mac: str, status: str) -> None:
+        """Set a cover status command."""
+
+        await self.async_send_command(mac, {"WIN": status})
+
+    async def async_set_cover_position(self, mac: str, position: int) -> None:
+        """Set a cover target position."""
+
+        await self.async_send_command(mac, {"LEV": str(position)})
+
+    async def _async_request(
+        self,
+        payload: dict[str, Any],
+        expect_response: bool,
+        *,
+        priority: int = PRIORITY_COMMAND,
+        key: str | None = None,
+        flushed: asyncio.Future[None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Queue a request on the gateway scheduler and return its response.
+
+        If given, flushed is resolved once the frame has been written.
+        """
+
+        queued = perf_counter()
+
+        async def async_send() -> dict[str, Any] | None:
+            self.metrics.observe("gateway_queue_wait_seconds", perf_counter() - queued)
+            self.metrics.set_gauge("gateway_queue_depth", self.scheduler.queue_depth)
+            try:
+                response = await self._async_send_request(
+                    payload, expect_response, flushed
+                )
+            except YunMaoError as err:
+                if self.recorder is not None:
+                    self.recorder.record_request(self.host, payload, None, str(err))
+                raise
+
+            if self.recorder is not None:
+                self.recorder.record_request(self.host, payload, response)
+            return response
+
+        self.metrics.set_gauge("gateway_queue_depth", self.scheduler.queue_depth + 1)
+        return await self.scheduler.async_run(async_send, priority=priority, key=key)
+
+    async def _async_send_request(
+        self,
+        payload: dict[str, Any],
+        expect_response: bool,
+        flushed: asyncio.Future[None] | None = None,
+    ) -> dict[str, Any] | None:
+        """Send a request to the gateway."""
+
+        if not expect_response and self.capabilities.persistent_connection:
+            await self._async_send_persistent(payload)
+            _set_flushed(flushed)
+            return None
+
+        metrics = self.metrics
+        metrics.increment("gateway_requests_total")
+        started = perf_counter()
+
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host=self.host, port=self.port),
+                timeout=self.timeout,
+            )
+        except (asyncio.TimeoutError, OSError) as err:
+            metrics.increment("gateway_request_errors_total")
+            raise YunMaoConnectionError("Unable to connect to the Yun Mao gateway") from err
+
+        metrics.observe("gateway_connect_seconds", perf_counter() - started)
+
+        try:
+            frame = encode_frame(payload)
+            writer.write(frame)
+            metrics.increment("gateway_bytes_out_total", len(frame))
+            await asyncio.wait_for(writer.drain(), timeout=self.timeout)
+            _set_flushed(flushed)
+
+            if writer.can_write_eof():
+                writer.write_eof()
+
+            if not expect_response:
+                return None
+
+            read_started = perf_counter()
+            response = await self._async_read_response(reader)
+            metrics.observe("gateway_read_seconds", perf_counter() - read_started)
+            metrics.increment("gateway_bytes_in_total", len(response))
+
+            return decode_response(response)
+        except asyncio.TimeoutError as err:
+            metrics.increment("gateway_request_errors_total")
+            raise YunMaoConnectionError("Timed out while talking to the Yun Mao gateway") from err
+        except OSError as err:
+            metrics.increment("gateway_request_errors_total")
+            raise YunMaoConnectionError("Lost connection to the Yun Mao gateway") from err
+        except YunMaoProtocolError:
+            metrics.increment("gateway_request_errors_total")
+            raise
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _async_send_persistent(self, payload: dict[str, Any]) -> None:
+        """Write a command on the reused connection, reconnecting once if needed."""
+
+        metrics = self.metrics
+        metrics.increment("gateway_requests_total")
+        frame = encode_frame(payload)
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(2):
+            # Concurrent first sends would otherwise each open a connection
+            # and leak all but the last one.
+            async with self._command_connect_lock:
+                if (
+                    self._command_writer is None
+                    or self._command_writer.is_closing()
+                    or loop.time() - self._command_last_used > PERSISTENT_IDLE_SECONDS
+                ):
+                    self._drop_command_connection()
+                    started = perf_counter()
+                    try:
+                        reader, self._command_writer = await asyncio.wait_for(
+                            asyncio.open_connection(host=self.host, port=self.port),
+                            timeout=self.timeout,
+                        )
+                    except (asyncio.TimeoutError, OSError) as err:
+                        metrics.increment("gateway_request_errors_total")
+                        raise YunMaoConnectionError(
+                            "Unable to connect to the Yun Mao gateway"
+                        ) from err
+                    metrics.observe("gateway_connect_seconds", perf_counter() - started)
+                    self._command_last_used = loop.time()
+                    self._command_reader_task = loop.create_task(
+                        self._async_discard_replies(reader, self._command_writer)
+                    )
+                writer = self._command_writer
+
+            try:
+                writer.write(frame)
+                await asyncio.wait_for(writer.drain(), timeout=self.timeout)
+            except (asyncio.TimeoutError, OSError) as err:
+                if self._command_writer is writer:
+                    self._drop_command_connection()
+                if attempt:
+                    metrics.increment("gateway_request_errors_total")
+                    raise YunMaoConnectionError(
+                        "Lost connection to the Yun Mao gateway"
+                    ) from err
+                continue
+
+            self._command_last_used = loop.time()
+            metrics.increment("gateway_bytes_out_total", len(frame))
+            return
+
+    async def _async_discard_replies(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read and drop replies so a closed command connection is noticed."""
+
+        try:
+            while await reader.read(8192):
+                pass
+        except OSError:
+            pass
+        if self._command_writer is writer:
+            self._command_writer = None
+        writer.close()
+
+    def _drop_command_connection(self) -> None:
+        """Close the persistent command connection."""
+
+        if self._command_reader_task is not None:
+            self._command_reader_task.cancel()
+            self._command_reader_task = None
+        if self._command_writer is not None:
+            self._command_writer.close()
+            self._command_writer = None
+
+    async def _async_read_response(self, reader: asyncio.StreamReader) -> bytes:
+        """Read the full response body from the gateway."""
+
+        payload = bytearray()
+
+        while True:
+            chunk = await asyncio.wait_for(reader.read(8192), timeout=self.timeout)
+            if not chunk:
+                break
+            payload.extend(chunk)
+
+        return bytes(payload)
+
+
+def _set_flushed(flushed: asyncio.Future[None] | None) -> None:
+    """Report that a request frame has been written."""
+
+    if flushed is not None and not flushed.done():
+        flushed.set_result(None)
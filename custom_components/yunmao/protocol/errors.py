@@ -0,0 +1,15 @@
+"""Exceptions raised by the Yun Mao protocol library."""
+
+from __future__ import annotations
+
+
+class YunMaoError(Exception):
+    """Base Yun Mao protocol error."""
+
+
+class YunMaoConnectionError(YunMaoError):
+    """Raised when the Yun Mao gateway is unavailable."""
+
+
+class YunMaoProtocolError(YunMaoError):
+    """Raised when the Yun Mao gateway response is invalid."""
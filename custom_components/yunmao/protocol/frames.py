@@ -0,0 +1,89 @@
+"""Frame building and decoding for the Yun Mao gateway protocol."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from .errors import YunMaoProtocolError
+
+GATEWAY_PORT = 8888
+PUSH_PORT = 21688
+
+COMMAND_SERIAL = "210431"
+QUERY_ID = "0000000000000000"
+
+
+def build_query_payload(host: str) -> dict[str, Any]:
+    """Return the full state query frame for a gateway."""
+
+    return {
+        "sourceId": host,
+        "serialNum": host,
+        "requestType": "query",
+        "id": QUERY_ID,
+    }
+
+
+def build_command_payload(host: str, mac: str, attributes: dict[str, str]) -> dict[str, Any]:
+    """Return a command frame setting attributes on a device."""
+
+    return {
+        "sourceId": host,
+        "serialNum": COMMAND_SERIAL,
+        "requestType": "cmd",
+        "id": mac,
+        "attributes": attributes,
+    }
+
+
+def encode_frame(payload: dict[str, Any]) -> bytes:
+    """Encode a request frame the way the gateway expects it."""
+
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def decode_response(response: bytes) -> dict[str, Any]:
+    """Decode a gateway response body into a JSON object."""
+
+    if not response:
+        raise YunMaoProtocolError("Empty response from the Yun Mao gateway")
+
+    try:
+        decoded = json.loads(response.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as err:
+        raise YunMaoProtocolError("Invalid response from the Yun Mao gateway") from err
+
+    if not isinstance(decoded, dict):
+        raise YunMaoProtocolError("Unexpected response type from the Yun Mao gateway")
+
+    return decoded
+
+
+class PushFramer:
+    """Split a push byte stream into newline-delimited frames."""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Buffer received bytes and return the complete, non-empty lines."""
+
+        buffer = self._buffer
+        buffer.extend(data)
+        lines: list[bytes] = []
+        while (newline := buffer.find(b"\n")) >= 0:
+            line = bytes(buffer[:newline]).strip()
+            del buffer[: newline + 1]
+            if line:
+                lines.append(line)
+        return lines
+
+    def flush(self) -> bytes | None:
+        """Return a trailing frame without newline once the stream ended."""
+
+        line = bytes(self._buffer).strip()
+        self._buffer.clear()
+        return line or None
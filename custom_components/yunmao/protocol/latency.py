@@ -0,0 +1,217 @@
+"""Command round-trip latency tracking for Yun Mao."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any
+
+COMMAND_CONFIRM_TIMEOUT_SECONDS = 30
+LATENCY_SAMPLE_SIZE = 256
+
+
+@dataclass(slots=True)
+class LatencyHistogram:
+    """Bounded latency sample window with percentile summaries."""
+
+    samples: deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_SAMPLE_SIZE)
+    )
+    count: int = 0
+    total: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a single latency sample."""
+
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, percent: float) -> float | None:
+        """Return a percentile of the recent samples in seconds."""
+
+        if not self.samples:
+            return None
+
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def summary(self) -> dict[str, Any]:
+        """Return a diagnostics-friendly summary in milliseconds."""
+
+        return {
+            "count": self.count,
+            "mean_ms": _to_ms(self.total / self.count) if self.count else None,
+            "p50_ms": _to_ms(self.percentile(50)),
+            "p95_ms": _to_ms(self.percentile(95)),
+            "p99_ms": _to_ms(self.percentile(99)),
+        }
+
+
+@dataclass(slots=True)
+class _PendingCommand:
+    """A command frame still waiting for a gateway confirmation."""
+
+    command_type: str
+    sent_monotonic: float
+
+
+class YunMaoCommandTracker:
+    """Correlate sent command frames with the push updates that confirm them."""
+
+    def __init__(self, timeout: float = COMMAND_CONFIRM_TIMEOUT_SECONDS) -> None:
+        self._timeout = timeout
+        self._pending: dict[str, dict[tuple[str, str], _PendingCommand]] = {}
+        self._by_mac: dict[str, LatencyHistogram] = {}
+        self._by_type: dict[str, LatencyHistogram] = {}
+        self._unconfirmed_by_mac: dict[str, int] = {}
+        self._unconfirmed_by_type: dict[str, int] = {}
+        self._superseded = 0
+        self._reported_switches: dict[str, int] = {}
+
+    def track(self, mac: str, attribute: str, value: str) -> None:
+        """Start tracking a command frame that is about to be sent."""
+
+        self._expire()
+        pending = self._pending.setdefault(mac, {})
+
+        for key in [key for key in pending if key[0] == attribute and key[1] != value]:
+            del pending[key]
+            self._superseded += 1
+
+        pending[(attribute, value)] = _PendingCommand(
+            command_type=_command_type(attribute),
+            sent_monotonic=monotonic(),
+        )
+
+    def discard(self, mac: str, attribute: str, value: str) -> None:
+        """Stop tracking a command frame that never reached the gateway."""
+
+        pending = self._pending.get(mac)
+        if pending is None:
+            return
+
+        pending.pop((attribute, value), None)
+        if not pending:
+            del self._pending[mac]
+
+    def confirm(self, mac: str, attributes: Mapping[str, Any]) -> None:
+        """Close pending commands that a gateway push for a MAC confirms."""
+
+        previous = self._reported_switches.get(mac)
+        status = _parse_switch(attributes.get("SWI"))
+        if status is not None:
+            self._reported_switches[mac] = status
+
+        pending = self._pending.get(mac)
+        if not pending:
+            return
+
+        now = monotonic()
+        for key in [
+            key for key in pending if _is_confirmed(key, attributes, status, previous)
+        ]:
+            command = pending.pop(key)
+            latency = now - command.sent_monotonic
+            self._by_mac.setdefault(mac, LatencyHistogram()).observe(latency)
+            self._by_type.setdefault(command.command_type, LatencyHistogram()).observe(
+                latency
+            )
+
+        if not pending:
+            del self._pending[mac]
+
+    def diagnostics_data(self) -> dict[str, Any]:
+        """Return latency histograms and confirmation counters."""
+
+        self._expire()
+
+        return {
+            "confirm_timeout_seconds": self._timeout,
+            "pending": sum(len(pending) for pending in self._pending.values()),
+            "superseded": self._superseded,
+            "unconfirmed_by_mac": dict(self._unconfirmed_by_mac),
+            "unconfirmed_by_type": dict(self._unconfirmed_by_type),
+            "latency_by_mac": {
+                mac: histogram.summary() for mac, histogram in self._by_mac.items()
+            },
+            "latency_by_type": {
+                command_type: histogram.summary()
+                for command_type, histogram in self._by_type.items()
+            },
+        }
+
+    def _expire(self) -> None:
+        """Count and drop commands that were never confirmed in time."""
+
+        deadline = monotonic() - self._timeout
+
+        for mac in list(self._pending):
+            pending = self._pending[mac]
+            for key in [
+                key for key, command in pending.items() if command.sent_monotonic <= deadline
+            ]:
+                command = pending.pop(key)
+                self._unconfirmed_by_mac[mac] = self._unconfirmed_by_mac.get(mac, 0) + 1
+                self._unconfirmed_by_type[command.command_type] = (
+                    self._unconfirmed_by_type.get(command.command_type, 0) + 1
+                )
+            if not pending:
+                del self._pending[mac]
+
+
+def _command_type(attribute: str) -> str:
+    """Return the command family of an attribute, such as KY for KY3."""
+
+    return attribute.rstrip("0123456789") or attribute
+
+
+def _parse_switch(raw_switch: Any) -> int | None:
+    """Return a reported SWI bitmask, or None if it is missing or invalid."""
+
+    if raw_switch is None:
+        return None
+    try:
+        return int(str(raw_switch), 0)
+    except ValueError:
+        return None
+
+
+def _is_confirmed(
+    key: tuple[str, str],
+    attributes: Mapping[str, Any],
+    status: int | None,
+    previous: int | None,
+) -> bool:
+    """Return True if pushed attributes report the expected command value.
+
+    A KY command is only confirmed by a push that flips its channel, or that
+    repeats the last reported bitmask unchanged, as the gateway does for a
+    command that changed nothing. A push for another channel of the panel,
+    whose bit merely matches already, does not confirm it.
+    """
+
+    attribute, value = key
+
+    if attribute.startswith("KY") and attribute[2:].isdigit():
+        if status is None:
+            return False
+        mask = 1 << (int(attribute[2:]) - 1)
+        if bool(status & mask) != (value == "ON"):
+            return False
+        return previous is None or previous == status or bool((previous ^ status) & mask)
+
+    reported = attributes.get(attribute)
+    return reported is not None and str(reported) == value
+
+
+def _to_ms(seconds: float | None) -> float | None:
+    """Convert seconds to rounded milliseconds."""
+
+    if seconds is None:
+        return None
+
+    return round(seconds * 1000, 1)
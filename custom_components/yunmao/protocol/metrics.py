@@ -0,0 +1,245 @@
+"""In-process metrics registry for Yun Mao."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Final
+
+from .latency import LatencyHistogram
+
+METRIC_PREFIX = "yunmao_"
+RATE_WINDOW_SECONDS = 10
+
+COUNTER: Final = "counter"
+SUMMARY: Final = "summary"
+GAUGE: Final = "gauge"
+
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+@dataclass(frozen=True, slots=True)
+class MetricDefinition:
+    """Static description of an exported metric."""
+
+    kind: str
+    help: str
+
+
+METRICS: dict[str, MetricDefinition] = {
+    "gateway_requests_total": MetricDefinition(COUNTER, "Requests sent to the gateway."),
+    "gateway_request_errors_total": MetricDefinition(
+        COUNTER, "Gateway requests that failed to connect, time out or decode."
+    ),
+    "gateway_connect_seconds": MetricDefinition(SUMMARY, "Gateway TCP connect latency."),
+    "gateway_read_seconds": MetricDefinition(SUMMARY, "Gateway response read latency."),
+    "gateway_queue_depth": MetricDefinition(
+        GAUGE, "Gateway requests waiting for a connection slot."
+    ),
+    "gateway_queue_wait_seconds": MetricDefinition(
+        SUMMARY, "Time gateway requests spent queued before starting."
+    ),
+    "gateway_bytes_out_total": MetricDefinition(COUNTER, "Bytes written to the gateway."),
+    "gateway_bytes_in_total": MetricDefinition(COUNTER, "Bytes read from the gateway."),
+    "push_connections_total": MetricDefinition(COUNTER, "Accepted push connections."),
+    "push_bytes_in_total": MetricDefinition(COUNTER, "Bytes read from push connections."),
+    "push_frames_total": MetricDefinition(COUNTER, "Push frames received."),
+    "push_frames_per_second": MetricDefinition(
+        GAUGE, f"Push frames per second over the last {RATE_WINDOW_SECONDS} seconds."
+    ),
+    "push_decode_seconds": MetricDefinition(SUMMARY, "JSON decode time per push frame."),
+    "push_invalid_frames_total": MetricDefinition(
+        COUNTER, "Push frames that were not valid JSON."
+    ),
+    "push_dropped_frames_total": MetricDefinition(
+        COUNTER, "Push frames dropped before reaching listeners."
+    ),
+    "push_filtered_frames_total": MetricDefinition(
+        COUNTER, "Push frames ruled out by the raw pre-filter without decoding."
+    ),
+    "push_listener_errors_total": MetricDefinition(
+        COUNTER, "Unhandled exceptions raised by push listeners."
+    ),
+    "coordinator_parse_seconds": MetricDefinition(
+        SUMMARY, "Time spent merging gateway payloads into coordinator state."
+    ),
+    "coordinator_updates_total": MetricDefinition(
+        COUNTER, "Coordinator state fan-outs to entities."
+    ),
+    "coordinator_entity_writes_per_update": MetricDefinition(
+        SUMMARY,
+        "Entity states written per coordinator state fan-out, including merged "
+        "writes deferred since the previous one.",
+    ),
+    "coordinator_commands_suppressed_total": MetricDefinition(
+        COUNTER, "Commands skipped because the gateway already confirmed the target state."
+    ),
+    "cover_state_writes_suppressed_total": MetricDefinition(
+        COUNTER, "Moving cover state writes merged into a later write."
+    ),
+    "push_events_fired_total": MetricDefinition(
+        COUNTER, "yunmao_update events fired from push frames."
+    ),
+    "push_events_rate_limited_total": MetricDefinition(
+        COUNTER, "Push frames merged into a later yunmao_update event."
+    ),
+}
+
+
+class _RateMeter:
+    """Sliding window event rate using one bucket per second."""
+
+    __slots__ = ("_buckets",)
+
+    def __init__(self) -> None:
+        self._buckets: deque[list[int]] = deque()
+
+    def mark(self, count: int) -> None:
+        """Record events for the current second."""
+
+        second = int(monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([second, count])
+        self._trim(second)
+
+    def rate(self) -> float:
+        """Return the average events per second over the window."""
+
+        self._trim(int(monotonic()))
+        return sum(count for _, count in self._buckets) / RATE_WINDOW_SECONDS
+
+    def _trim(self, second: int) -> None:
+        """Drop buckets that fell out of the window."""
+
+        while self._buckets and self._buckets[0][0] <= second - RATE_WINDOW_SECONDS:
+            self._buckets.popleft()
+
+
+class YunMaoMetrics:
+    """Lightweight counters, rates and summaries shared by the integration."""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, float] = {}
+        self._summaries: dict[str, LatencyHistogram] = {}
+        self._rates: dict[str, _RateMeter] = {}
+        self._gauges: dict[str, float] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter."""
+
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a summary sample."""
+
+        summary = self._summaries.get(name)
+        if summary is None:
+            summary = self._summaries[name] = LatencyHistogram()
+        summary.observe(value)
+
+    def mark(self, name: str, count: int = 1) -> None:
+        """Record events for a per-second rate gauge."""
+
+        meter = self._rates.get(name)
+        if meter is None:
+            meter = self._rates[name] = _RateMeter()
+        meter.mark(count)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its latest value."""
+
+        self._gauges[name] = value
+
+    def value(self, name: str) -> float:
+        """Return the current value of a counter."""
+
+        return self._counters.get(name, 0)
+
+    def gauge(self, name: str) -> float:
+        """Return the current value of a gauge or rate."""
+
+        if name in self._gauges:
+            return self._gauges[name]
+
+        return self.rate(name)
+
+    def rate(self, name: str) -> float:
+        """Return the current value of a rate gauge."""
+
+        meter = self._rates.get(name)
+        return meter.rate() if meter is not None else 0.0
+
+    def percentile(self, name: str, percent: float) -> float | None:
+        """Return a percentile of a summary."""
+
+        summary = self._summaries.get(name)
+        return summary.percentile(percent) if summary is not None else None
+
+    def diagnostics_data(self) -> dict[str, Any]:
+        """Return a snapshot of every recorded metric."""
+
+        return {
+            "counters": dict(self._counters),
+            "gauges": dict(self._gauges),
+            "rates": {name: round(meter.rate(), 2) for name, meter in self._rates.items()},
+            "summaries": {
+                name: summary.summary() if name.endswith("_seconds") else _plain_summary(summary)
+                for name, summary in self._summaries.items()
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+
+        for name, definition in METRICS.items():
+            metric = f"{METRIC_PREFIX}{name}"
+            lines.append(f"# HELP {metric} {_escape_help(definition.help)}")
+            lines.append(f"# TYPE {metric} {definition.kind}")
+
+            if definition.kind == COUNTER:
+                lines.append(f"{metric} {_format_value(self.value(name))}")
+            elif definition.kind == GAUGE:
+                lines.append(f"{metric} {_format_value(self.gauge(name))}")
+            else:
+                summary = self._summaries.get(name)
+                for quantile in QUANTILES:
+                    value = summary.percentile(quantile * 100) if summary else None
+                    lines.append(
+                        f'{metric}{{quantile="{quantile}"}} {_format_value(value)}'
+                    )
+                lines.append(f"{metric}_sum {_format_value(summary.total if summary else 0)}")
+                lines.append(f"{metric}_count {summary.count if summary else 0}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _plain_summary(summary: LatencyHistogram) -> dict[str, Any]:
+    """Return a summary of unitless samples such as counts."""
+
+    return {
+        "count": summary.count,
+        "mean": round(summary.total / summary.count, 2) if summary.count else None,
+        "p50": summary.percentile(50),
+        "p95": summary.percentile(95),
+        "p99": summary.percentile(99),
+    }
+
+
+def _escape_help(text: str) -> str:
+    """Escape HELP text as the Prometheus text format requires."""
+
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float | None) -> str:
+    """Format a sample value for the Prometheus text format."""
+
+    if value is None:
+        return "NaN"
+
+    return repr(float(value))
@@ -0,0 +1,75 @@
+"""Push channel helpers for Yun Mao gateways."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+from collections.abc import Callable
+
+from .frames import PUSH_PORT, PushFramer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Dead push links are detected by TCP keepalive after roughly
+# idle + interval * count seconds.
+KEEPALIVE_IDLE_SECONDS = 10
+KEEPALIVE_INTERVAL_SECONDS = 5
+KEEPALIVE_COUNT = 3
+
+PushLineHandler = Callable[[bytes, "str | None"], None]
+
+
+def enable_keepalive(sock: socket.socket | None) -> None:
+    """Enable aggressive TCP keepalive on a push connection socket."""
+
+    if sock is None:
+        return
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE_SECONDS)
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL_SECONDS
+            )
+        if hasattr(socket, "TCP_KEEPCNT"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+    except OSError as err:
+        _LOGGER.debug("Unable to enable keepalive on Yun Mao push connection: %s", err)
+
+
+async def async_start_push_listener(
+    handler: PushLineHandler, host: str = "0.0.0.0", port: int = PUSH_PORT
+) -> asyncio.AbstractServer:
+    """Listen for gateway push connections and hand every frame to a handler.
+
+    The handler gets the raw frame and the peer address. This is the minimal
+    listener used by tooling; Home Assistant runs its own shared push server.
+    """
+
+    async def async_handle_client(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername")
+        source = peer[0] if peer else None
+        enable_keepalive(writer.get_extra_info("socket"))
+        framer = PushFramer()
+
+        try:
+            while data := await reader.read(8192):
+                for line in framer.feed(data):
+                    handler(line, source)
+        except OSError as err:
+            _LOGGER.debug("Yun Mao push connection closed: %s", err)
+        finally:
+            if line := framer.flush():
+                handler(line, source)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    return await asyncio.start_server(async_handle_client, host=host, port=port)
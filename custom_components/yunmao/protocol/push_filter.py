@@ -0,0 +1,73 @@
+"""Pre-decode filtering of raw Yun Mao push frames."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+REQUEST_TYPE_MARKER = b'"requestType":"'
+UPDATE_VALUE = b"update"
+ID_MARKER = b'"id":"'
+_TYPE_VALUE_OFFSET = len(REQUEST_TYPE_MARKER)
+_ID_VALUE_OFFSET = len(ID_MARKER)
+
+# Plain ints rather than an enum keep classification cheap on the hot path.
+# Verdicts at or above FRAME_IGNORED_UPDATE never need decoding.
+FRAME_RELEVANT = 0
+FRAME_UNKNOWN = 1
+FRAME_IGNORED_UPDATE = 2
+FRAME_IGNORED_OTHER = 3
+
+
+class YunMaoPushFilter:
+    """Classify raw push lines by request type and device id without decoding.
+
+    Markers cannot occur inside JSON strings because their quotes would be
+    escaped, so a marker found before the first nested object belongs to the
+    top-level frame. Any other shape, including frames with whitespace around
+    the separators or escape sequences in the type or id, returns
+    FRAME_UNKNOWN so the caller falls back to a full JSON parse.
+    """
+
+    __slots__ = ("_macs",)
+
+    def __init__(self, macs: Iterable[str]) -> None:
+        self._macs = frozenset(mac.encode("ascii") for mac in macs)
+
+    def classify(self, line: bytes) -> int:
+        """Return whether a frame needs to be decoded for this filter."""
+
+        if not line.startswith(b"{"):
+            return FRAME_UNKNOWN
+
+        type_index = line.find(REQUEST_TYPE_MARKER)
+        nested_index = line.find(b"{", 1)
+        if type_index < 0 or 0 <= nested_index < type_index:
+            return FRAME_UNKNOWN
+
+        type_start = type_index + _TYPE_VALUE_OFFSET
+        type_end = line.find(b'"', type_start)
+        if type_end < 0:
+            return FRAME_UNKNOWN
+
+        request_type = line[type_start:type_end]
+        if b"\\" in request_type:
+            return FRAME_UNKNOWN
+        if request_type != UPDATE_VALUE:
+            return FRAME_IGNORED_OTHER
+
+        id_index = line.find(ID_MARKER)
+        if id_index < 0 or 0 <= nested_index < id_index:
+            return FRAME_UNKNOWN
+
+        start = id_index + _ID_VALUE_OFFSET
+        end = line.find(b'"', start)
+        if end < 0:
+            return FRAME_UNKNOWN
+
+        mac = line[start:end]
+        if mac in self._macs:
+            return FRAME_RELEVANT
+        if b"\\" in mac:
+            return FRAME_UNKNOWN
+
+        return FRAME_IGNORED_UPDATE
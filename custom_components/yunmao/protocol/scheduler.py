@@ -0,0 +1,214 @@
+"""Per-gateway request scheduling for Yun Mao."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from itertools import count
+from time import monotonic
+from typing import Any
+
+from .latency import LatencyHistogram
+
+PRIORITY_COMMAND = 0
+PRIORITY_QUERY = 10
+
+DEFAULT_MAX_IN_FLIGHT = 2
+# Slots that background queries may never take, so user commands can always
+# start even while a full state dump is being fetched.
+RESERVED_COMMAND_SLOTS = 1
+
+RequestFactory = Callable[[], Awaitable[Any]]
+
+# Shared schedulers per gateway host, with the number of clients using each.
+_SCHEDULERS: dict[str, tuple[YunMaoRequestScheduler, int]] = {}
+
+
+@dataclass(order=True, slots=True)
+class _QueuedRequest:
+    """A request waiting for a free connection slot."""
+
+    priority: int
+    sequence: int
+    factory: RequestFactory = field(compare=False)
+    key: str | None = field(compare=False)
+    enqueued_monotonic: float = field(compare=False)
+    waiters: list[asyncio.Future[Any]] = field(compare=False, default_factory=list)
+
+
+class YunMaoRequestScheduler:
+    """Order and bound the requests sent to a single gateway."""
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        reserved_command_slots: int = RESERVED_COMMAND_SLOTS,
+    ) -> None:
+        self._max_in_flight = max_in_flight
+        self._max_background = max(1, max_in_flight - reserved_command_slots)
+        self._queue: list[_QueuedRequest] = []
+        self._queued_by_key: dict[str, _QueuedRequest] = {}
+        self._sequence = count()
+        self._in_flight = 0
+        self._background_in_flight = 0
+        self._running: dict[asyncio.Task[None], _QueuedRequest] = {}
+        self._wait_times = LatencyHistogram()
+        self._max_queue_depth = 0
+        self._superseded = 0
+        self._completed = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a slot."""
+
+        return len(self._queue)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests currently talking to the gateway."""
+
+        return self._in_flight
+
+    async def async_run(
+        self,
+        factory: RequestFactory,
+        *,
+        priority: int = PRIORITY_COMMAND,
+        key: str | None = None,
+    ) -> Any:
+        """Queue a request and return its result once it has run.
+
+        A queued request with the same key is superseded: its callers share the
+        result of the newer request instead of triggering a second round trip.
+        """
+
+        waiter: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+
+        if key is not None and (queued := self._queued_by_key.get(key)) is not None:
+            queued.factory = factory
+            queued.waiters.append(waiter)
+            self._superseded += 1
+        else:
+            entry = _QueuedRequest(
+                priority=priority,
+                sequence=next(self._sequence),
+                factory=factory,
+                key=key,
+                enqueued_monotonic=monotonic(),
+                waiters=[waiter],
+            )
+            heapq.heappush(self._queue, entry)
+            if key is not None:
+                self._queued_by_key[key] = entry
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+
+        self._pump()
+        return await waiter
+
+    def cancel(self) -> None:
+        """Cancel queued and running requests."""
+
+        for entry in self._queue:
+            for waiter in entry.waiters:
+                waiter.cancel()
+        self._queue.clear()
+        self._queued_by_key.clear()
+        # A task cancelled before its first step never reaches the cleanup in
+        # _async_execute, so its waiters are cancelled here as well.
+        for task, entry in self._running.items():
+            for waiter in entry.waiters:
+                waiter.cancel()
+            task.cancel()
+
+    def diagnostics_data(self) -> dict[str, Any]:
+        """Return queue and wait time statistics."""
+
+        return {
+            "max_in_flight": self._max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self._max_queue_depth,
+            "completed": self._completed,
+            "superseded": self._superseded,
+            "wait_time": self._wait_times.summary(),
+        }
+
+    def _pump(self) -> None:
+        """Start queued requests while connection slots are free."""
+
+        while self._queue and self._in_flight < self._max_in_flight:
+            entry = self._queue[0]
+            is_background = entry.priority > PRIORITY_COMMAND
+            if is_background and self._background_in_flight >= self._max_background:
+                return
+
+            heapq.heappop(self._queue)
+            if entry.key is not None:
+                self._queued_by_key.pop(entry.key, None)
+
+            if all(waiter.done() for waiter in entry.waiters):
+                continue
+
+            self._in_flight += 1
+            if is_background:
+                self._background_in_flight += 1
+            self._wait_times.observe(monotonic() - entry.enqueued_monotonic)
+
+            task = asyncio.create_task(self._async_execute(entry, is_background))
+            self._running[task] = entry
+            task.add_done_callback(self._running.pop)
+
+    async def _async_execute(self, entry: _QueuedRequest, is_background: bool) -> None:
+        """Run a request and resolve everyone waiting on it."""
+
+        try:
+            result = await entry.factory()
+        except asyncio.CancelledError:
+            for waiter in entry.waiters:
+                waiter.cancel()
+            raise
+        except Exception as err:  # noqa: BLE001
+            for waiter in entry.waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+        else:
+            for waiter in entry.waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+        finally:
+            self._in_flight -= 1
+            if is_background:
+                self._background_in_flight -= 1
+            self._completed += 1
+            self._pump()
+
+
+def get_scheduler(host: str) -> YunMaoRequestScheduler:
+    """Return the scheduler shared by every client of a gateway host.
+
+    Every call must be paired with a release_scheduler call once the client
+    is closed.
+    """
+
+    scheduler, users = _SCHEDULERS.get(host, (None, 0))
+    if scheduler is None:
+        scheduler = YunMaoRequestScheduler()
+    _SCHEDULERS[host] = (scheduler, users + 1)
+    return scheduler
+
+
+def release_scheduler(host: str) -> None:
+    """Release a shared scheduler and cancel its requests when it is unused."""
+
+    if (shared := _SCHEDULERS.get(host)) is None:
+        return
+
+    scheduler, users = shared
+    if users > 1:
+        _SCHEDULERS[host] = (scheduler, users - 1)
+        return
+
+    del _SCHEDULERS[host]
+    scheduler.cancel()
@@ -0,0 +1,237 @@
+"""Simulated Yun Mao gateway for tooling and load tests."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+from collections.abc import Iterable
+from typing import Any
+
+from .frames import GATEWAY_PORT, PUSH_PORT, encode_frame
+
+_LOGGER = logging.getLogger(__name__)
+
+_SWITCH_CHANNELS = 6
+
+
+class YunMaoGatewaySimulator:
+    """Answer queries and commands like a gateway and push state changes.
+
+    Switch panels keep a SWI bitmask and covers a WIN status and LEV level.
+    Every applied command is pushed as an update frame over one long-lived
+    connection to the push target, which is reopened when it breaks.
+
+    By default the simulator behaves like the most conservative firmware: one
+    frame per connection, read until the client shuts down its write side.
+    With persistent set, frames are parsed from the stream as they arrive and
+    the connection stays open.
+    """
+
+    def __init__(
+        self,
+        switch_macs: Iterable[str],
+        cover_macs: Iterable[str] = (),
+        *,
+        host: str = "127.0.0.1",
+        port: int = GATEWAY_PORT,
+        push_host: str | None = "127.0.0.1",
+        push_port: int = PUSH_PORT,
+        persistent: bool = False,
+    ) -> None:
+        self.host = host
+        self.persistent = persistent
+        self.port = port
+        self.push_host = push_host
+        self.push_port = push_port
+        self.switches: dict[str, int] = dict.fromkeys(switch_macs, 0)
+        self.covers: dict[str, dict[str, str]] = {
+            mac: {"WIN": "STOP", "LEV": "0"} for mac in cover_macs
+        }
+        self.requests = 0
+        self.pushes = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._push_writer: asyncio.StreamWriter | None = None
+        self._push_lock = asyncio.Lock()
+        self._push_tasks: set[asyncio.Task[None]] = set()
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task[Any]] = set()
+
+    async def async_start(self) -> None:
+        """Start serving the request port."""
+
+        self._server = await asyncio.start_server(
+            self._async_handle_request, host=self.host, port=self.port
+        )
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def async_stop(self) -> None:
+        """Stop serving, close every connection and wait for request handlers."""
+
+        if self._push_writer is not None:
+            self._push_writer.close()
+            self._push_writer = None
+        for writer in self._connections:
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    def state_payload(self) -> dict[str, Any]:
+        """Return a full state query response."""
+
+        attributes: dict[str, dict[str, str]] = {
+            mac: {"SWI": str(status)} for mac, status in self.switches.items()
+        }
+        attributes.update({mac: dict(state) for mac, state in self.covers.items()})
+        return {"requestType": "query", "attributes": attributes}
+
+    def apply(self, mac: str, attributes: dict[str, str]) -> dict[str, str] | None:
+        """Apply command attributes and return the resulting update attributes."""
+
+        if mac in self.switches:
+            status = self.switches[mac]
+            for attribute, value in attributes.items():
+                if attribute.startswith("KY") and attribute[2:].isdigit():
+                    mask = 1 << (int(attribute[2:]) - 1)
+                    status = status | mask if value == "ON" else status & ~mask
+            self.switches[mac] = status
+            return {"SWI": str(status)}
+
+        if (state := self.covers.get(mac)) is not None:
+            if (status := attributes.get("WIN")) is not None:
+                state["WIN"] = status
+                if status in ("OPEN", "CLOSE"):
+                    state["LEV"] = "100" if status == "OPEN" else "0"
+            if (level := attributes.get("LEV")) is not None:
+                state["LEV"] = level
+                state["WIN"] = "STOP"
+            return dict(state)
+
+        return None
+
+    async def async_push(self, mac: str, attributes: dict[str, str]) -> None:
+        """Push an update frame to the push target."""
+
+        if self.push_host is None:
+            return
+
+        line = encode_frame({"requestType": "update", "id": mac, "attributes": attributes})
+        async with self._push_lock:
+            for _ in range(2):
+                if self._push_writer is None:
+                    try:
+                        _, self._push_writer = await asyncio.open_connection(
+                            self.push_host, self.push_port
+                        )
+                    except OSError as err:
+                        _LOGGER.debug("Unable to reach push target: %s", err)
+                        return
+                try:
+                    self._push_writer.write(line + b"\n")
+                    await self._push_writer.drain()
+                except OSError:
+                    self._push_writer.close()
+                    self._push_writer = None
+                    continue
+                self.pushes += 1
+                return
+
+    async def async_run_traffic(
+        self,
+        frames_per_second: float,
+        duration: float,
+        seed: int | None = None,
+    ) -> int:
+        """Push random switch and cover changes at a steady rate."""
+
+        rng = random.Random(seed)
+        macs = [*self.switches, *self.covers]
+        if not macs or frames_per_second <= 0:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        interval = 1 / frames_per_second
+        deadline = loop.time() + duration
+        next_frame = loop.time()
+        sent = 0
+
+        while (now := loop.time()) < deadline:
+            if next_frame > now:
+                await asyncio.sleep(next_frame - now)
+            next_frame += interval
+
+            mac = rng.choice(macs)
+            if mac in self.switches:
+                command = {f"KY{rng.randint(1, _SWITCH_CHANNELS)}": rng.choice(("ON", "OFF"))}
+            else:
+                command = {"LEV": str(rng.randint(0, 100))}
+            if (update := self.apply(mac, command)) is not None:
+                await self.async_push(mac, update)
+                sent += 1
+
+        return sent
+
+    async def _async_handle_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the frames sent on one request connection."""
+
+        self._connections.add(writer)
+        if (handler := asyncio.current_task()) is not None:
+            self._handlers.add(handler)
+        try:
+            if not self.persistent:
+                await self._async_handle_frame(await reader.read(), writer)
+                return
+
+            decoder = json.JSONDecoder()
+            buffer = ""
+            while chunk := await reader.read(8192):
+                buffer += chunk.decode("utf-8", errors="replace")
+                while buffer := buffer.lstrip():
+                    try:
+                        _, end = decoder.raw_decode(buffer)
+                    except ValueError:
+                        break
+                    await self._async_handle_frame(buffer[:end].encode("utf-8"), writer)
+                    buffer = buffer[end:]
+        except OSError as err:
+            _LOGGER.debug("Simulated request connection failed: %s", err)
+        finally:
+            self._connections.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _async_handle_frame(self, frame: bytes, writer: asyncio.StreamWriter) -> None:
+        """Answer one request frame."""
+
+        self.requests += 1
+        try:
+            payload = json.loads(frame)
+        except ValueError:
+            return
+
+        if not isinstance(payload, dict):
+            return
+
+        if payload.get("requestType") == "query":
+            writer.write(encode_frame(self.state_payload()))
+            await writer.drain()
+        elif payload.get("requestType") == "cmd" and isinstance(
+            payload.get("attributes"), dict
+        ):
+            mac = str(payload.get("id"))
+            if (update := self.apply(mac, payload["attributes"])) is not None:
+                task = asyncio.get_running_loop().create_task(self.async_push(mac, update))
+                self._push_tasks.add(task)
+                task.add_done_callback(self._push_tasks.discard)
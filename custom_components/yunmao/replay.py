@@ -0,0 +1,160 @@
+"""Deterministic replay of captured Yun Mao traffic."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from time import monotonic
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .client import YunMaoClient
+from .const import CONF_INPUT_IP
+from .coordinator import YunMaoConfigEntry, YunMaoCoordinator, YunMaoPushServer
+from .protocol.capture import (
+    KIND_PUSH,
+    KIND_REQUEST,
+    capture_push_line,
+    iter_capture_records,
+)
+from .protocol.metrics import YunMaoMetrics
+from .protocol.scheduler import YunMaoRequestScheduler
+
+_YIELD_EVERY = 200
+
+
+async def async_replay_capture(
+    hass: HomeAssistant, entry: YunMaoConfigEntry, path: Path, speed: float
+) -> dict[str, Any]:
+    """Feed a capture through a detached push server and coordinator.
+
+    The replay pipeline uses the loaded entry's current device map but has
+    its own metrics and no entities, so live state is never touched. A speed
+    of 0 replays as fast as possible; otherwise the captured pacing is
+    divided by speed.
+    """
+
+    records = await hass.async_add_executor_job(_load_records, path)
+    if not records:
+        raise HomeAssistantError(f"No Yun Mao capture records found in {path}")
+
+    metrics = YunMaoMetrics()
+    client = YunMaoClient(
+        entry.data[CONF_INPUT_IP], metrics, scheduler=YunMaoRequestScheduler()
+    )
+    coordinator = YunMaoCoordinator(hass, client, dict(entry.data))
+    live_coordinator = entry.runtime_data.coordinator
+    coordinator.set_device_map(
+        live_coordinator.light_descriptions, live_coordinator.cover_descriptions
+    )
+    push_server = YunMaoPushServer(hass, metrics)
+    await push_server.async_add_listener(
+        coordinator.handle_push_payload,
+        start_server=False,
+        macs=coordinator.known_macs,
+        activity_listener=coordinator.handle_push_activity,
+    )
+
+    try:
+        return await _async_replay_records(
+            coordinator, push_server, metrics, records, path, speed
+        )
+    finally:
+        await push_server.async_remove_listener(coordinator.handle_push_payload)
+        await coordinator.async_shutdown()
+
+
+async def _async_replay_records(
+    coordinator: YunMaoCoordinator,
+    push_server: YunMaoPushServer,
+    metrics: YunMaoMetrics,
+    records: list[dict[str, Any]],
+    path: Path,
+    speed: float,
+) -> dict[str, Any]:
+    """Feed the records in order and return the replay summary."""
+
+    push_frames = 0
+    query_responses = 0
+    skipped = 0
+    first_timestamp = records[0].get("t", 0)
+    started = monotonic()
+
+    for index, record in enumerate(records):
+        if speed > 0:
+            delay = (record.get("t", first_timestamp) - first_timestamp) / speed - (
+                monotonic() - started
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif index % _YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+
+        kind = record.get("kind")
+        if kind == KIND_PUSH and (line := capture_push_line(record)) is not None:
+            push_server.dispatch_line(line, record.get("source"))
+            push_frames += 1
+        elif (
+            kind == KIND_REQUEST
+            and isinstance(record.get("payload"), dict)
+            and record["payload"].get("requestType") == "query"
+            and isinstance(record.get("response"), dict)
+        ):
+            try:
+                coordinator.async_apply_query_payload(record["response"])
+            except UpdateFailed:
+                skipped += 1
+                continue
+            query_responses += 1
+        else:
+            skipped += 1
+
+    elapsed = monotonic() - started
+    processed = push_frames + query_responses
+
+    return {
+        "path": str(path),
+        "speed": speed,
+        "records": len(records),
+        "push_frames": push_frames,
+        "query_responses": query_responses,
+        "skipped": skipped,
+        "captured_seconds": round(records[-1].get("t", first_timestamp) - first_timestamp, 3),
+        "replay_seconds": round(elapsed, 3),
+        "records_per_second": round(processed / elapsed, 1) if elapsed > 0 else None,
+        "final_state": _final_state(coordinator),
+        "metrics": metrics.diagnostics_data(),
+    }
+
+
+def _load_records(path: Path) -> list[dict[str, Any]]:
+    """Read every record of a capture, oldest first."""
+
+    return list(iter_capture_records(path))
+
+
+def _final_state(coordinator: YunMaoCoordinator) -> dict[str, Any]:
+    """Return the entity-level state reached at the end of a replay."""
+
+    covers: dict[str, Any] = {}
+    for description in coordinator.cover_descriptions:
+        cover_state = coordinator.get_cover_state(description)
+        covers[description.name] = {
+            "status": (
+                coordinator.data.cover_states.get(description.mac)
+                if coordinator.data
+                else None
+            ),
+            "position": cover_state.current_position,
+        }
+
+    return {
+        "lights": {
+            description.name: coordinator.is_light_on(description)
+            for description in coordinator.light_descriptions
+        },
+        "covers": covers,
+    }
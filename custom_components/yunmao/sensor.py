@@ -0,0 +1,143 @@
+"""Diagnostic sensor platform for Yun Mao."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import YunMaoConfigEntry
+from .protocol.metrics import YunMaoMetrics
+
+SCAN_INTERVAL = timedelta(seconds=30)
+
+
+@dataclass(frozen=True, kw_only=True)
+class YunMaoMetricSensorDescription(SensorEntityDescription):
+    """Description of a sensor backed by the metrics registry."""
+
+    value_fn: Callable[[YunMaoMetrics], float | None]
+
+
+def _p95_ms(name: str) -> Callable[[YunMaoMetrics], float | None]:
+    """Return a reader for the p95 of a latency summary in milliseconds."""
+
+    def value(metrics: YunMaoMetrics) -> float | None:
+        seconds = metrics.percentile(name, 95)
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+    return value
+
+
+METRIC_SENSORS: tuple[YunMaoMetricSensorDescription, ...] = (
+    YunMaoMetricSensorDescription(
+        key="push_frames_per_second",
+        translation_key="push_frames_per_second",
+        native_unit_of_measurement="frames/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda metrics: round(metrics.rate("push_frames_per_second"), 2),
+    ),
+    YunMaoMetricSensorDescription(
+        key="push_invalid_frames",
+        translation_key="push_invalid_frames",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.value("push_invalid_frames_total"),
+    ),
+    YunMaoMetricSensorDescription(
+        key="push_listener_errors",
+        translation_key="push_listener_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.value("push_listener_errors_total"),
+    ),
+    YunMaoMetricSensorDescription(
+        key="gateway_connect_latency",
+        translation_key="gateway_connect_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_p95_ms("gateway_connect_seconds"),
+    ),
+    YunMaoMetricSensorDescription(
+        key="gateway_read_latency",
+        translation_key="gateway_read_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_p95_ms("gateway_read_seconds"),
+    ),
+    YunMaoMetricSensorDescription(
+        key="gateway_bytes_in",
+        translation_key="gateway_bytes_in",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.value("gateway_bytes_in_total"),
+    ),
+    YunMaoMetricSensorDescription(
+        key="gateway_bytes_out",
+        translation_key="gateway_bytes_out",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.value("gateway_bytes_out_total"),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: YunMaoConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up Yun Mao diagnostic sensor entities."""
+
+    del hass
+
+    async_add_entities(
+        YunMaoMetricSensor(entry, entry.runtime_data.client.metrics, description)
+        for description in METRIC_SENSORS
+    )
+
+
+class YunMaoMetricSensor(SensorEntity):
+    """Diagnostic sensor reporting a single integration metric."""
+
+    entity_description: YunMaoMetricSensorDescription
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        entry: YunMaoConfigEntry,
+        metrics: YunMaoMetrics,
+        description: YunMaoMetricSensorDescription,
+    ) -> None:
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="lierda-new",
+            model="gateway",
+            name="Yun Mao Gateway",
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the current metric value."""
+
+        return self.entity_description.value_fn(self._metrics)
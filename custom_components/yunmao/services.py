@@ -0,0 +1,272 @@
+"""Services for the Yun Mao integration."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from time import monotonic
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+import voluptuous as vol
+
+from .const import DOMAIN
+from .coordinator import YunMaoConfigEntry, async_get_push_server
+from .device_map import async_reload_device_map
+from .profiler import async_run_profile
+from .protocol.capture import (
+    CAPTURE_FILENAME,
+    DEFAULT_CAPTURE_BACKUPS,
+    DEFAULT_CAPTURE_MAX_BYTES,
+    YunMaoTrafficRecorder,
+)
+from .replay import async_replay_capture
+
+SERVICE_PROFILE = "profile"
+SERVICE_CAPTURE_START = "capture_start"
+SERVICE_CAPTURE_STOP = "capture_stop"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+SERVICE_RELOAD_DEVICES = "reload_devices"
+SERVICE_WAIT_FOR_STATE = "wait_for_state"
+
+ATTR_DURATION = "duration"
+ATTR_TOP = "top"
+ATTR_SAMPLING = "sampling"
+ATTR_MAX_MEGABYTES = "max_megabytes"
+ATTR_BACKUPS = "backups"
+ATTR_PATH = "path"
+ATTR_SPEED = "speed"
+ATTR_MAC = "mac"
+ATTR_CHANNEL = "channel"
+ATTR_ON = "on"
+ATTR_COVER_STATUS = "cover_status"
+ATTR_POSITION = "position"
+ATTR_TIMEOUT = "timeout"
+ATTR_QUERY = "query"
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=30): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(ATTR_TOP, default=40): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=500)
+        ),
+        vol.Optional(ATTR_SAMPLING, default=False): cv.boolean,
+    }
+)
+
+CAPTURE_START_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            ATTR_MAX_MEGABYTES, default=DEFAULT_CAPTURE_MAX_BYTES / (1024 * 1024)
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=500)),
+        vol.Optional(ATTR_BACKUPS, default=DEFAULT_CAPTURE_BACKUPS): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=20)
+        ),
+    }
+)
+
+REPLAY_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_SPEED, default=1): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+
+def _validate_condition(data: dict[str, Any]) -> dict[str, Any]:
+    """Require exactly one condition, with on given for channels only."""
+
+    conditions = [key for key in (ATTR_CHANNEL, ATTR_COVER_STATUS, ATTR_POSITION) if key in data]
+    if len(conditions) != 1:
+        raise vol.Invalid("Specify exactly one of channel, cover_status or position")
+    if (ATTR_CHANNEL in data) != (ATTR_ON in data):
+        raise vol.Invalid("channel and on must be given together")
+    return data
+
+
+WAIT_FOR_STATE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_MAC): vol.All(cv.string, vol.Upper),
+            vol.Optional(ATTR_CHANNEL): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+            vol.Optional(ATTR_ON): cv.boolean,
+            vol.Optional(ATTR_COVER_STATUS): vol.In(("OPEN", "CLOSE", "STOP")),
+            vol.Optional(ATTR_POSITION): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            vol.Optional(ATTR_TIMEOUT, default=30): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=3600)
+            ),
+            vol.Optional(ATTR_QUERY, default=False): cv.boolean,
+        }
+    ),
+    _validate_condition,
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Yun Mao services."""
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the push and command pipelines for a while."""
+
+        return await async_run_profile(
+            hass,
+            call.data[ATTR_DURATION],
+            call.data[ATTR_TOP],
+            call.data[ATTR_SAMPLING],
+        )
+
+    async def async_capture_start(call: ServiceCall) -> None:
+        """Start recording push lines and gateway requests."""
+
+        push_server = async_get_push_server(hass)
+        if push_server.recorder is not None:
+            raise HomeAssistantError("A Yun Mao capture is already running")
+
+        recorder = YunMaoTrafficRecorder(
+            Path(hass.config.path(CAPTURE_FILENAME)),
+            max_bytes=int(call.data[ATTR_MAX_MEGABYTES] * 1024 * 1024),
+            backups=call.data[ATTR_BACKUPS],
+        )
+        await hass.async_add_executor_job(recorder.start)
+
+        push_server.recorder = recorder
+        for entry in _loaded_entries(hass):
+            entry.runtime_data.client.recorder = recorder
+
+    async def async_capture_stop(call: ServiceCall) -> ServiceResponse:
+        """Stop recording and close the capture file."""
+
+        del call
+        push_server = async_get_push_server(hass)
+        recorder = push_server.recorder
+        if recorder is None:
+            raise HomeAssistantError("No Yun Mao capture is running")
+
+        push_server.recorder = None
+        for entry in _loaded_entries(hass):
+            entry.runtime_data.client.recorder = None
+        await hass.async_add_executor_job(recorder.stop)
+
+        return recorder.diagnostics_data()
+
+    async def async_replay(call: ServiceCall) -> ServiceResponse:
+        """Replay a capture through a detached pipeline and report the result."""
+
+        entries = _loaded_entries(hass)
+        if not entries:
+            raise HomeAssistantError("The Yun Mao integration is not loaded")
+
+        path = Path(call.data.get(ATTR_PATH) or hass.config.path(CAPTURE_FILENAME))
+        return await async_replay_capture(hass, entries[0], path, call.data[ATTR_SPEED])
+
+    async def async_reload_devices(call: ServiceCall) -> ServiceResponse:
+        """Reload the device map without restarting the integration."""
+
+        del call
+        entries = _loaded_entries(hass)
+        if not entries:
+            raise HomeAssistantError("The Yun Mao integration is not loaded")
+
+        return await async_reload_device_map(hass, entries[0])
+
+    async def async_wait_for_state(call: ServiceCall) -> ServiceResponse:
+        """Wait until the gateway reports a device state."""
+
+        mac = call.data[ATTR_MAC]
+        entry = next(
+            (
+                entry
+                for entry in _loaded_entries(hass)
+                if mac in entry.runtime_data.coordinator.known_macs
+            ),
+            None,
+        )
+        if entry is None:
+            raise HomeAssistantError(f"{mac} is not a mapped Yun Mao device")
+
+        if ATTR_CHANNEL in call.data:
+            mask = 1 << (call.data[ATTR_CHANNEL] - 1)
+            on = call.data[ATTR_ON]
+            attribute = "SWI"
+
+            def matches(value: Any) -> bool:
+                return bool(value & mask) is on
+
+        elif ATTR_COVER_STATUS in call.data:
+            attribute = "WIN"
+            matches = call.data[ATTR_COVER_STATUS].__eq__
+        else:
+            attribute = "LEV"
+            matches = call.data[ATTR_POSITION].__eq__
+
+        started = monotonic()
+        matched = await entry.runtime_data.coordinator.async_wait_for_state(
+            mac, attribute, matches, call.data[ATTR_TIMEOUT], call.data[ATTR_QUERY]
+        )
+        if not matched and not call.return_response:
+            raise HomeAssistantError(
+                f"Timed out waiting for {mac} to report the requested state"
+            )
+
+        return {"matched": matched, "waited_seconds": round(monotonic() - started, 3)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE_START,
+        async_capture_start,
+        schema=CAPTURE_START_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE_STOP,
+        async_capture_stop,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_CAPTURE,
+        async_replay,
+        schema=REPLAY_CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RELOAD_DEVICES,
+        async_reload_devices,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_WAIT_FOR_STATE,
+        async_wait_for_state,
+        schema=WAIT_FOR_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _loaded_entries(hass: HomeAssistant) -> list[YunMaoConfigEntry]:
+    """Return the loaded Yun Mao config entries."""
+
+    return [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.state is ConfigEntryState.LOADED
+    ]
@@ -0,0 +1,31 @@
+"""HTTP views for Yun Mao."""
+
+from __future__ import annotations
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+
+from .protocol.metrics import YunMaoMetrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class YunMaoMetricsView(HomeAssistantView):
+    """Expose the metrics registry in the Prometheus text format."""
+
+    url = "/api/yunmao/metrics"
+    name = "api:yunmao:metrics"
+    requires_auth = True
+
+    def __init__(self, metrics: YunMaoMetrics) -> None:
+        self._metrics = metrics
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the current metrics snapshot."""
+
+        del request
+        return web.Response(
+            body=self._metrics.prometheus_text().encode("utf-8"),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
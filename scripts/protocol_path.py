@@ -0,0 +1,35 @@
+"""Make custom_components.yunmao.protocol importable without Home Assistant.
+
+The protocol package has no Home Assistant or integration imports, but
+importing it runs custom_components/yunmao/__init__.py, which needs Home
+Assistant. Without Home Assistant installed, the two parent packages are
+registered as bare packages instead, so the protocol package still loads
+under its one real name. That keeps a single copy of its modules, and with
+it a single scheduler registry and one set of exception classes. Command
+line tools, benchmarks and tests import this module first:
+
+    import protocol_path  # noqa: F401
+    from custom_components.yunmao.protocol.client import YunMaoGatewayClient
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+if importlib.util.find_spec("homeassistant") is None:
+    for name, path in (
+        ("custom_components", ROOT / "custom_components"),
+        ("custom_components.yunmao", ROOT / "custom_components" / "yunmao"),
+    ):
+        if name not in sys.modules:
+            package = ModuleType(name)
+            package.__path__ = [str(path)]
+            sys.modules[name] = package
@@ -0,0 +1,16 @@
+"""Run the Yun Mao protocol command line tool without Home Assistant.
+
+Run from the repository root:
+
+    python scripts/yunmao_cli.py --help
+"""
+
+from __future__ import annotations
+
+import sys
+
+import protocol_path  # noqa: F401
+from custom_components.yunmao.protocol.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Helpers for tests that run the integration against a simulated gateway.
+
+This module imports Home Assistant, so test modules import it only after
+skipping when Home Assistant is not installed.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.yunmao.client import YunMaoClient
+from custom_components.yunmao.const import YunMaoCoverDescription, YunMaoLightDescription
+from custom_components.yunmao.coordinator import YunMaoCoordinator
+from custom_components.yunmao.protocol.metrics import YunMaoMetrics
+from custom_components.yunmao.protocol.scheduler import YunMaoRequestScheduler
+from custom_components.yunmao.protocol.simulator import YunMaoGatewaySimulator
+
+SWITCH_MAC = "FFFF301B977B24F4"
+COVER_MAC = "FFFF301B977B24F5"
+LIGHT = YunMaoLightDescription("Hall", SWITCH_MAC, 1)
+COVER = YunMaoCoverDescription("Blind", COVER_MAC)
+
+
+class RecordingSimulator(YunMaoGatewaySimulator):
+    """Simulated gateway that records commands and can send empty query replies."""
+
+    def __init__(self) -> None:
+        super().__init__([SWITCH_MAC], [COVER_MAC], port=0, push_host=None)
+        self.applied: list[tuple[str, dict[str, str]]] = []
+        self.empty_replies = False
+
+    def apply(self, mac: str, attributes: dict[str, str]) -> dict[str, str] | None:
+        self.applied.append((mac, dict(attributes)))
+        return super().apply(mac, attributes)
+
+    def state_payload(self) -> dict[str, Any]:
+        if self.empty_replies:
+            return {"requestType": "query"}
+        return super().state_payload()
+
+
+@asynccontextmanager
+async def async_coordinator(
+    config_dir: Path,
+) -> AsyncIterator[tuple[YunMaoCoordinator, RecordingSimulator]]:
+    """Yield a refreshed coordinator with one light and one cover."""
+
+    hass = HomeAssistant(str(config_dir))
+    simulator = RecordingSimulator()
+    await simulator.async_start()
+    client = YunMaoClient(
+        "127.0.0.1", YunMaoMetrics(), YunMaoRequestScheduler(), port=simulator.port, timeout=1
+    )
+    coordinator = YunMaoCoordinator(hass, client, {})
+    coordinator.set_device_map((LIGHT,), (COVER,))
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    try:
+        yield coordinator, simulator
+    finally:
+        await coordinator.async_shutdown()
+        await simulator.async_stop()
+        await hass.async_block_till_done()
+
+
+def push(coordinator: YunMaoCoordinator, mac: str, attributes: dict[str, str]) -> None:
+    """Hand an update frame to the coordinator as the push server would."""
+
+    coordinator.handle_push_payload(
+        {"requestType": "update", "id": mac, "attributes": attributes}
+    )
@@ -0,0 +1,10 @@
+"""Shared test setup for the Yun Mao integration."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import protocol_path  # noqa: E402,F401
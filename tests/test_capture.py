@@ -0,0 +1,98 @@
+"""Tests for traffic capture and replay."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from custom_components.yunmao.protocol.capture import (
+    KIND_PUSH,
+    YunMaoTrafficRecorder,
+    capture_push_line,
+    iter_capture_records,
+)
+
+SWITCH_MAC = "FFFF301B977B24F4"
+COVER_MAC = "FFFF301B977B24F5"
+
+
+def _frame(mac: str, attributes: dict[str, str]) -> bytes:
+    return json.dumps(
+        {"requestType": "update", "id": mac, "attributes": attributes}
+    ).encode("utf-8")
+
+
+def _capture(path: Path, lines: list[bytes], query: dict[str, Any] | None = None) -> None:
+    recorder = YunMaoTrafficRecorder(path)
+    recorder.start()
+    try:
+        if query is not None:
+            recorder.record_request("127.0.0.1", {"requestType": "query"}, query)
+        for line in lines:
+            recorder.record_push(line, "127.0.0.1")
+    finally:
+        recorder.stop()
+
+
+def test_push_lines_are_captured_byte_for_byte(tmp_path: Path) -> None:
+    path = tmp_path / "capture.jsonl"
+    lines = [_frame(SWITCH_MAC, {"SWI": "1"}), b'{"id":"\xff\xfe"}\r', b"\x00\n"]
+
+    _capture(path, lines)
+
+    records = list(iter_capture_records(path))
+    assert [record["kind"] for record in records] == [KIND_PUSH] * 3
+    assert [capture_push_line(record) for record in records] == lines
+
+
+def test_push_line_of_older_and_damaged_records() -> None:
+    assert capture_push_line({"line": '{"id":"é"}'}) == '{"id":"é"}'.encode("utf-8")
+    assert capture_push_line({"data": "not base64!"}) is None
+    assert capture_push_line({"kind": KIND_PUSH}) is None
+
+
+def test_replay_is_deterministic(tmp_path: Path) -> None:
+    pytest.importorskip("homeassistant")
+    from custom_components.yunmao.const import CONF_INPUT_IP
+    from custom_components.yunmao.replay import async_replay_capture
+
+    from common import RecordingSimulator, async_coordinator
+
+    path = tmp_path / "capture.jsonl"
+    _capture(
+        path,
+        [
+            _frame(SWITCH_MAC, {"SWI": "1"}),
+            b"\xff\xfe not a frame",
+            _frame(COVER_MAC, {"WIN": "STOP", "LEV": "40"}),
+        ],
+        RecordingSimulator().state_payload(),
+    )
+
+    async def run() -> list[dict[str, Any]]:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            entry = SimpleNamespace(
+                data={CONF_INPUT_IP: "127.0.0.1"},
+                runtime_data=SimpleNamespace(coordinator=coordinator),
+            )
+            return [
+                await async_replay_capture(coordinator.hass, entry, path, 0)
+                for _ in range(2)
+            ]
+
+    first, second = asyncio.run(run())
+
+    for result in (first, second):
+        assert result["push_frames"] == 3
+        assert result["query_responses"] == 1
+        assert result["skipped"] == 0
+        assert result["metrics"]["counters"]["push_invalid_frames_total"] == 1
+    assert first["final_state"] == second["final_state"] == {
+        "lights": {"Hall": True},
+        "covers": {"Blind": {"status": "STOP", "position": 40}},
+    }
@@ -0,0 +1,125 @@
+"""Tests for the gateway client against the simulated gateway."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from custom_components.yunmao.protocol.capabilities import (
+    YunMaoCapabilities,
+    async_probe_capabilities,
+)
+from custom_components.yunmao.protocol.client import YunMaoGatewayClient
+from custom_components.yunmao.protocol.scheduler import (
+    YunMaoRequestScheduler,
+    get_scheduler,
+    release_scheduler,
+)
+from custom_components.yunmao.protocol.simulator import YunMaoGatewaySimulator
+
+SWITCH_MAC = "FFFF301B977B24F4"
+COVER_MAC = "FFFF301B977B24F5"
+
+
+class RecordingSimulator(YunMaoGatewaySimulator):
+    """Simulated gateway that records every command it applies."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__([SWITCH_MAC], [COVER_MAC], port=0, push_host=None, **kwargs)
+        self.applied: list[tuple[str, dict[str, str]]] = []
+
+    def apply(self, mac: str, attributes: dict[str, str]) -> dict[str, str] | None:
+        self.applied.append((mac, dict(attributes)))
+        return super().apply(mac, attributes)
+
+
+def test_persistent_first_sends_share_one_connection() -> None:
+    async def run() -> tuple[int, int]:
+        simulator = RecordingSimulator(persistent=True)
+        await simulator.async_start()
+        client = YunMaoGatewayClient(
+            "127.0.0.1", scheduler=YunMaoRequestScheduler(), port=simulator.port, timeout=1
+        )
+        client.capabilities = YunMaoCapabilities(persistent_connection=True)
+        try:
+            await asyncio.gather(
+                *(
+                    client.async_send_command(SWITCH_MAC, {f"KY{channel}": "ON"})
+                    for channel in range(1, 4)
+                )
+            )
+            for _ in range(50):
+                if len(simulator.applied) == 3:
+                    break
+                await asyncio.sleep(0.01)
+            return len(simulator._connections), simulator.switches[SWITCH_MAC]
+        finally:
+            await client.async_close()
+            await simulator.async_stop()
+
+    connections, status = asyncio.run(run())
+
+    assert connections == 1
+    assert status == 0b111
+
+
+def test_dispatched_command_reaches_the_gateway() -> None:
+    async def run() -> int:
+        simulator = RecordingSimulator()
+        await simulator.async_start()
+        client = YunMaoGatewayClient(
+            "127.0.0.1", scheduler=YunMaoRequestScheduler(), port=simulator.port, timeout=1
+        )
+        try:
+            delivery = await client.async_dispatch_command(SWITCH_MAC, {"KY2": "ON"})
+            await delivery
+            return simulator.switches[SWITCH_MAC]
+        finally:
+            await client.async_close()
+            await simulator.async_stop()
+
+    assert asyncio.run(run()) == 0b10
+
+
+def test_closing_the_last_client_releases_the_shared_scheduler() -> None:
+    async def run() -> None:
+        host = "192.0.2.20"
+        first = YunMaoGatewayClient(host)
+        second = YunMaoGatewayClient(host)
+        assert first.scheduler is second.scheduler
+
+        await first.async_close()
+        await first.async_close()
+        assert get_scheduler(host) is second.scheduler
+        release_scheduler(host)
+
+        await second.async_close()
+        assert get_scheduler(host) is not second.scheduler
+        release_scheduler(host)
+
+    asyncio.run(run())
+
+
+def test_capability_probe_only_queries() -> None:
+    async def run() -> tuple[YunMaoCapabilities, list[Any], int]:
+        simulator = RecordingSimulator(persistent=True)
+        await simulator.async_start()
+        scheduler = YunMaoRequestScheduler()
+        try:
+            capabilities = await async_probe_capabilities(
+                "127.0.0.1",
+                simulator.state_payload(),
+                scheduler,
+                port=simulator.port,
+                timeout=1,
+            )
+            return capabilities, simulator.applied, scheduler.diagnostics_data()["completed"]
+        finally:
+            await simulator.async_stop()
+
+    capabilities, applied, completed = asyncio.run(run())
+
+    assert capabilities.persistent_connection
+    assert not capabilities.single_mac_query
+    assert applied == []
+    assert completed == 2
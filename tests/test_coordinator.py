@@ -0,0 +1,109 @@
+"""Tests for coordinator commands, rollbacks and state waiters."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+
+from common import (  # noqa: E402
+    COVER,
+    COVER_MAC,
+    LIGHT,
+    SWITCH_MAC,
+    async_coordinator,
+    push,
+)
+
+
+def test_cover_positions_in_a_burst_are_sent_once(tmp_path: Path) -> None:
+    async def run() -> tuple[list[Any], int]:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            await asyncio.gather(
+                *(
+                    coordinator.async_set_cover_position(COVER, position)
+                    for position in (20, 40, 60)
+                )
+            )
+            return simulator.applied, coordinator.get_cover_state(COVER).current_position
+
+    applied, position = asyncio.run(run())
+
+    assert applied == [(COVER_MAC, {"LEV": "60"})]
+    assert position == 60
+
+
+def test_failed_cover_position_is_rolled_back(tmp_path: Path) -> None:
+    async def run() -> int:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            await simulator.async_stop()
+            with pytest.raises(HomeAssistantError):
+                await coordinator.async_set_cover_position(COVER, 30)
+            return coordinator.get_cover_state(COVER).current_position
+
+    assert asyncio.run(run()) == 0
+
+
+def test_failed_fast_dispatch_light_is_rolled_back(tmp_path: Path) -> None:
+    async def run() -> bool | None:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            coordinator.fast_dispatch = True
+            await simulator.async_stop()
+            with pytest.raises(HomeAssistantError):
+                await coordinator.async_set_light_state(LIGHT, True)
+            return coordinator.is_light_on(LIGHT)
+
+    assert asyncio.run(run()) is False
+
+def test_state_waiter_resolves_on_a_matching_push(tmp_path: Path) -> None:
+    async def run() -> tuple[bool, int]:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            waiting = asyncio.ensure_future(
+                coordinator.async_wait_for_state(COVER_MAC, "LEV", (70).__eq__, 2)
+            )
+            await asyncio.sleep(0)
+            push(coordinator, COVER_MAC, {"LEV": "50"})
+            push(coordinator, COVER_MAC, {"LEV": "70"})
+            return await waiting, coordinator.diagnostics_data()["state_waiters"]
+
+    assert asyncio.run(run()) == (True, 0)
+
+
+def test_state_waiter_ignores_unparsable_values(tmp_path: Path) -> None:
+    async def run() -> tuple[bool, int]:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+            waiting = asyncio.ensure_future(
+                coordinator.async_wait_for_state(
+                    SWITCH_MAC, "SWI", lambda status: not status & 1, 0.2
+                )
+            )
+            await asyncio.sleep(0)
+            push(coordinator, SWITCH_MAC, {"SWI": "zz"})
+            return await waiting, coordinator.diagnostics_data()["state_waiters"]
+
+    assert asyncio.run(run()) == (False, 0)
+
+
+def test_state_waiter_outlives_an_empty_query_reply(tmp_path: Path) -> None:
+    async def run() -> bool:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            simulator.empty_replies = True
+            waiting = asyncio.ensure_future(
+                coordinator.async_wait_for_state(
+                    COVER_MAC, "LEV", (70).__eq__, 2, query=True
+                )
+            )
+            while simulator.requests < 2:
+                await asyncio.sleep(0.01)
+            assert not waiting.done()
+            push(coordinator, COVER_MAC, {"LEV": "70"})
+            return await waiting
+
+    assert asyncio.run(run())
@@ -0,0 +1,124 @@
+"""Tests for the cover entity."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.yunmao import cover  # noqa: E402
+from custom_components.yunmao.cover import YunMaoCurtain  # noqa: E402
+
+from common import COVER, COVER_MAC, async_coordinator, push  # noqa: E402
+
+
+class _Timers:
+    """Stand-in for async_call_later that fires only when told to."""
+
+    def __init__(self) -> None:
+        self.pending: list[tuple[float, Callable[[Any], None]]] = []
+        self.cancelled = 0
+
+    def call_later(
+        self, hass: Any, delay: float, action: Callable[[Any], None]
+    ) -> Callable[[], None]:
+        timer = (delay, action)
+        self.pending.append(timer)
+
+        def cancel() -> None:
+            self.pending.remove(timer)
+            self.cancelled += 1
+
+        return cancel
+
+    def fire(self) -> None:
+        (_, action), = self.pending
+        self.pending.clear()
+        action(None)
+
+
+def test_moving_cover_writes_once_per_window(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    clock = [1000.0]
+    timers = _Timers()
+    monkeypatch.setattr(cover, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(cover, "async_call_later", timers.call_later)
+
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            entity = YunMaoCurtain(coordinator, COVER)
+            entity.hass = coordinator.hass
+            entity.entity_id = "cover.blind"
+            writes: list[int | None] = []
+            entity.async_write_ha_state = lambda: writes.append(
+                entity.current_cover_position
+            )
+
+            def report(level: int) -> None:
+                push(coordinator, COVER_MAC, {"LEV": str(level)})
+                entity._handle_coordinator_update()
+
+            report(10)
+            assert entity.is_opening
+            assert writes == [10]
+
+            clock[0] += cover._MOVING_WRITE_WINDOW_SECONDS / 4
+            report(20)
+            report(30)
+            report(40)
+            assert writes == [10]
+            assert len(timers.pending) == 1
+            assert timers.pending[0][0] == pytest.approx(
+                cover._MOVING_WRITE_WINDOW_SECONDS * 3 / 4
+            )
+
+            clock[0] += cover._MOVING_WRITE_WINDOW_SECONDS
+            timers.fire()
+            assert writes == [10, 40]
+            metrics = coordinator.client.metrics
+            assert metrics.value("cover_state_writes_suppressed_total") == 3
+
+            report(50)
+            assert writes == [10, 40]
+            assert len(timers.pending) == 1
+
+            await entity.async_will_remove_from_hass()
+            assert timers.pending == []
+            assert timers.cancelled == 1
+            assert writes == [10, 40]
+
+    asyncio.run(run())
+
+
+def test_resting_cover_writes_right_away(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    timers = _Timers()
+    monkeypatch.setattr(cover, "async_call_later", timers.call_later)
+
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            entity = YunMaoCurtain(coordinator, COVER)
+            entity.hass = coordinator.hass
+            entity.entity_id = "cover.blind"
+            writes: list[int | None] = []
+            entity.async_write_ha_state = lambda: writes.append(
+                entity.current_cover_position
+            )
+
+            push(coordinator, COVER_MAC, {"LEV": "30"})
+            entity._handle_coordinator_update()
+            push(coordinator, COVER_MAC, {"WIN": "STOP"})
+            entity._handle_coordinator_update()
+
+            assert not entity.is_opening
+            assert writes == [30, 30]
+            assert timers.pending == []
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+"""Tests for merging reported cover status and level."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.yunmao.coordinator import YunMaoCoverState  # noqa: E402
+
+from common import COVER, COVER_MAC, async_coordinator, push  # noqa: E402
+
+
+def test_status_and_level_in_one_push_are_both_merged(tmp_path: Path) -> None:
+    async def run() -> tuple[str, int, YunMaoCoverState]:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            push(coordinator, COVER_MAC, {"WIN": "OPEN", "LEV": "40"})
+            data = coordinator.data
+            return (
+                data.cover_states[COVER_MAC],
+                data.cover_levels[COVER_MAC],
+                coordinator.get_cover_state(COVER),
+            )
+
+    status, level, state = asyncio.run(run())
+
+    assert status == "OPEN"
+    assert level == 40
+    # The reported level wins over the position implied by OPEN.
+    assert state.current_position == 40
+    assert not state.is_closed
+
+
+def test_status_alone_keeps_the_reported_level(tmp_path: Path) -> None:
+    async def run() -> YunMaoCoverState:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            push(coordinator, COVER_MAC, {"LEV": "30"})
+            push(coordinator, COVER_MAC, {"WIN": "OPEN"})
+            return coordinator.get_cover_state(COVER)
+
+    state = asyncio.run(run())
+
+    assert state.current_position == 30
+    assert state.is_opening
+
+
+def test_queried_level_sets_the_position_without_motion(tmp_path: Path) -> None:
+    async def run() -> YunMaoCoverState:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            simulator.apply(COVER_MAC, {"LEV": "70"})
+            coordinator.async_apply_query_payload(simulator.state_payload())
+            return coordinator.get_cover_state(COVER)
+
+    state = asyncio.run(run())
+
+    assert state.current_position == 70
+    assert not state.is_opening
+    assert not state.is_closing
+
+
+@pytest.mark.parametrize(
+    ("raw_level", "position"),
+    [
+        ("42.9", 42),
+        (42, 42),
+        ("150", 100),
+        ("-5", 0),
+        ("1e400", 20),
+        ("zz", 20),
+        ("", 20),
+        ("nan", 20),
+        ("inf", 20),
+        ([], 20),
+    ],
+)
+def test_reported_level_is_clamped_or_ignored(
+    tmp_path: Path, raw_level: object, position: int
+) -> None:
+    async def run() -> tuple[int, int]:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            push(coordinator, COVER_MAC, {"LEV": "20"})
+            push(coordinator, COVER_MAC, {"LEV": raw_level})
+            return (
+                coordinator.data.cover_levels[COVER_MAC],
+                coordinator.get_cover_state(COVER).current_position,
+            )
+
+    assert asyncio.run(run()) == (position, position)
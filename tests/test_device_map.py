@@ -0,0 +1,118 @@
+"""Tests for reloading the device map of a loaded entry."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.helpers import (  # noqa: E402
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from custom_components.yunmao.const import DOMAIN  # noqa: E402
+from custom_components.yunmao.cover import YunMaoCurtain  # noqa: E402
+from custom_components.yunmao.device_map import (  # noqa: E402
+    DEVICE_MAP_FILENAME,
+    async_reload_device_map,
+)
+from custom_components.yunmao.entity import (  # noqa: E402
+    YunMaoEntity,
+    async_setup_device_entities,
+)
+from custom_components.yunmao.light import YunMaoLight  # noqa: E402
+
+from common import COVER_MAC, SWITCH_MAC, async_coordinator  # noqa: E402
+
+NEW_MAC = "FFFF301B977B24F6"
+
+
+def test_reload_adds_and_removes_entities(tmp_path: Path) -> None:
+    device_map = tmp_path / DEVICE_MAP_FILENAME
+
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            hass = coordinator.hass
+            await er.async_load(hass)
+            await dr.async_load(hass)
+            entity_registry = er.async_get(hass)
+            fetches: list[None] = []
+            fetch_state = coordinator.client.async_fetch_state
+
+            async def async_fetch_state() -> dict[str, Any]:
+                fetches.append(None)
+                return await fetch_state()
+
+            coordinator.client.async_fetch_state = async_fetch_state
+
+            entities: dict[str, YunMaoEntity] = {}
+            unloads: list[Any] = []
+            entry = SimpleNamespace(
+                entry_id="entry",
+                data={},
+                runtime_data=SimpleNamespace(coordinator=coordinator),
+                async_on_unload=unloads.append,
+            )
+
+            for domain, get_descriptions, factory in (
+                ("light", lambda coordinator: coordinator.light_descriptions, YunMaoLight),
+                ("cover", lambda coordinator: coordinator.cover_descriptions, YunMaoCurtain),
+            ):
+
+                def add_entities(new: list[YunMaoEntity], domain: str = domain) -> None:
+                    for entity in new:
+                        entity.entity_id = entity_registry.async_get_or_create(
+                            domain, DOMAIN, entity.unique_id
+                        ).entity_id
+                        entities[entity.unique_id] = entity
+
+                async_setup_device_entities(
+                    hass, entry, add_entities, get_descriptions, factory
+                )
+            hall = entities["Hall"]
+            blind_id = entities["Blind"].entity_id
+
+            device_map.write_text(
+                "lights:\n"
+                f"  - {{name: Hall, mac: {SWITCH_MAC}, pos: 1}}\n"
+                f"  - {{name: Stairs, mac: {SWITCH_MAC}, pos: 2}}\n"
+            )
+            result = await async_reload_device_map(hass, entry)
+            await hass.async_block_till_done()
+
+            assert result == {
+                "lights": 2,
+                "covers": 0,
+                "added": ["Stairs"],
+                "removed": ["Blind"],
+            }
+            assert entities["Hall"] is hall
+            assert entities["Stairs"].description.primary_pos == 2
+            assert entity_registry.async_get_entity_id("light", DOMAIN, "Stairs")
+            assert entity_registry.async_get(blind_id) is None
+            assert coordinator.known_macs == {SWITCH_MAC}
+            assert COVER_MAC not in coordinator.data.cover_states
+            # Every mapped MAC already has cached state.
+            assert fetches == []
+
+            device_map.write_text(
+                "lights:\n"
+                f"  - {{name: Hall, mac: {SWITCH_MAC}, pos: 1}}\n"
+                f"  - {{name: Porch, mac: {NEW_MAC}, pos: 1}}\n"
+            )
+            result = await async_reload_device_map(hass, entry)
+
+            assert result["added"] == ["Porch"]
+            assert result["removed"] == ["Stairs"]
+            assert coordinator._should_query_gateway()
+
+            for unload in unloads:
+                unload()
+
+    asyncio.run(run())
@@ -0,0 +1,41 @@
+"""Tests for config entry diagnostics."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.yunmao.const import CONF_INPUT_IP  # noqa: E402
+from custom_components.yunmao.diagnostics import (  # noqa: E402
+    async_get_config_entry_diagnostics,
+)
+
+from common import LIGHT, SWITCH_MAC, async_coordinator, push  # noqa: E402
+
+
+def test_confirmed_command_latency_is_reported(tmp_path: Path) -> None:
+    async def run() -> dict[str, Any]:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            await coordinator.async_set_light_state(LIGHT, True)
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+            entry = SimpleNamespace(
+                data={CONF_INPUT_IP: "127.0.0.1"},
+                runtime_data=SimpleNamespace(
+                    coordinator=coordinator, client=coordinator.client
+                ),
+            )
+            return await async_get_config_entry_diagnostics(coordinator.hass, entry)
+
+    diagnostics = asyncio.run(run())
+
+    latency = diagnostics["runtime"]["command_latency"]
+    assert latency["pending"] == 0
+    assert latency["latency_by_mac"][SWITCH_MAC]["count"] == 1
+    assert latency["latency_by_type"]["KY"]["count"] == 1
+    assert diagnostics["entry"][CONF_INPUT_IP] == "**REDACTED**"
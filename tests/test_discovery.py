@@ -0,0 +1,203 @@
+"""Tests for gateway discovery and the config flow steps that use it."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.yunmao import config_flow, discovery  # noqa: E402
+from custom_components.yunmao.const import CONF_INPUT_IP, DOMAIN  # noqa: E402
+from custom_components.yunmao.discovery import (  # noqa: E402
+    async_discover_gateways,
+    async_probe_gateway,
+    async_scan_port,
+)
+from custom_components.yunmao.protocol.simulator import (  # noqa: E402
+    YunMaoGatewaySimulator,
+)
+
+SWITCH_MAC = "FFFF301B977B24F4"
+
+
+async def _async_serve(
+    handler: Callable[[asyncio.StreamReader, asyncio.StreamWriter], Any],
+) -> tuple[asyncio.AbstractServer, int]:
+    server = await asyncio.start_server(handler, host="127.0.0.1", port=0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def _async_closed_port() -> int:
+    server, port = await _async_serve(lambda reader, writer: writer.close())
+    server.close()
+    await server.wait_closed()
+    return port
+
+
+def test_probe_accepts_a_gateway(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def run() -> tuple[list[str], bool]:
+        simulator = YunMaoGatewaySimulator([SWITCH_MAC], [], port=0, push_host=None)
+        await simulator.async_start()
+        monkeypatch.setattr(discovery, "GATEWAY_PORT", simulator.port)
+        try:
+            return (
+                await async_scan_port(["127.0.0.1"], simulator.port),
+                await async_probe_gateway("127.0.0.1", 1),
+            )
+        finally:
+            await simulator.async_stop()
+
+    assert asyncio.run(run()) == (["127.0.0.1"], True)
+
+
+def test_probe_rejects_other_services(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.read(4096)
+        writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    async def run() -> bool:
+        server, port = await _async_serve(handle)
+        monkeypatch.setattr(discovery, "GATEWAY_PORT", port)
+        try:
+            return await async_probe_gateway("127.0.0.1", 1)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(run()) is False
+
+
+def test_unreachable_and_silent_hosts_are_skipped(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def run() -> tuple[list[str], bool, bool, float]:
+        done = asyncio.Event()
+
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            # Accepts the connection but never answers the query.
+            await done.wait()
+            writer.close()
+
+        closed_port = await _async_closed_port()
+        server, silent_port = await _async_serve(handle)
+        try:
+            scanned = await async_scan_port(["127.0.0.1"], closed_port, timeout=0.2)
+            monkeypatch.setattr(discovery, "GATEWAY_PORT", closed_port)
+            refused = await async_probe_gateway("127.0.0.1", 1)
+            monkeypatch.setattr(discovery, "GATEWAY_PORT", silent_port)
+            started = asyncio.get_running_loop().time()
+            silent = await async_probe_gateway("127.0.0.1", 0.2)
+            elapsed = asyncio.get_running_loop().time() - started
+        finally:
+            done.set()
+            server.close()
+            await server.wait_closed()
+        return scanned, refused, silent, elapsed
+
+    scanned, refused, silent, elapsed = asyncio.run(run())
+
+    assert scanned == []
+    assert refused is False
+    assert silent is False
+    assert elapsed < 1
+
+
+def test_discovery_finds_the_gateway_and_caches_it(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def scan_hosts(hass: HomeAssistant) -> list[str]:
+        return ["127.0.0.1", "127.0.0.2"]
+
+    monkeypatch.setattr(discovery, "_async_get_scan_hosts", scan_hosts)
+
+    async def run() -> tuple[list[str], list[str], list[str]]:
+        hass = HomeAssistant(str(tmp_path))
+        simulator = YunMaoGatewaySimulator([SWITCH_MAC], [], port=0, push_host=None)
+        await simulator.async_start()
+        monkeypatch.setattr(discovery, "GATEWAY_PORT", simulator.port)
+        try:
+            found = await async_discover_gateways(hass)
+        finally:
+            await simulator.async_stop()
+        cached = await async_discover_gateways(hass)
+        rescanned = await async_discover_gateways(hass, use_cache=False)
+        await hass.async_stop(force=True)
+        return found, cached, rescanned
+
+    assert asyncio.run(run()) == (["127.0.0.1"], ["127.0.0.1"], [])
+
+
+def _flow(hass: HomeAssistant) -> config_flow.YunMaoConfigFlow:
+    flow = config_flow.YunMaoConfigFlow()
+    flow.hass = hass
+    flow.handler = DOMAIN
+    flow.flow_id = "flow"
+    flow.context = {"source": "user"}
+    return flow
+
+
+def test_config_flow_offers_discovered_gateways(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def scan_hosts(hass: HomeAssistant) -> list[str]:
+        return ["127.0.0.1"]
+
+    monkeypatch.setattr(discovery, "_async_get_scan_hosts", scan_hosts)
+
+    async def run() -> dict[str, Any]:
+        hass = HomeAssistant(str(tmp_path))
+        simulator = YunMaoGatewaySimulator([SWITCH_MAC], [], port=0, push_host=None)
+        await simulator.async_start()
+        monkeypatch.setattr(discovery, "GATEWAY_PORT", simulator.port)
+        try:
+            return await _flow(hass).async_step_user()
+        finally:
+            await simulator.async_stop()
+            await hass.async_stop(force=True)
+
+    result = asyncio.run(run())
+
+    assert result["step_id"] == "pick"
+    choices = result["data_schema"].schema[CONF_INPUT_IP].container
+    assert list(choices) == ["127.0.0.1", config_flow.MANUAL_ENTRY]
+
+
+def test_config_flow_reports_an_unreachable_gateway(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def scan_hosts(hass: HomeAssistant) -> list[str]:
+        return []
+
+    monkeypatch.setattr(discovery, "_async_get_scan_hosts", scan_hosts)
+    monkeypatch.setattr(config_flow, "VALIDATION_TIMEOUT", 0.2)
+
+    async def run() -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+        hass = HomeAssistant(str(tmp_path))
+        monkeypatch.setattr(discovery, "GATEWAY_PORT", await _async_closed_port())
+        flow = _flow(hass)
+        try:
+            return (
+                await flow.async_step_user(),
+                await flow.async_step_user({CONF_INPUT_IP: "127.0.0.1"}),
+                await flow.async_step_user({CONF_INPUT_IP: "gateway"}),
+            )
+        finally:
+            await hass.async_stop(force=True)
+
+    empty, unreachable, invalid = asyncio.run(run())
+
+    assert empty["step_id"] == "user"
+    assert not empty["errors"]
+    assert unreachable["errors"] == {"base": "cannot_connect"}
+    assert invalid["errors"] == {"base": "address_not_valid"}
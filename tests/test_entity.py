@@ -0,0 +1,145 @@
+"""Tests for the shared entity state writes and device map sync."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.helpers import (  # noqa: E402
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.dispatcher import async_dispatcher_send  # noqa: E402
+
+from custom_components.yunmao import cover  # noqa: E402
+from custom_components.yunmao.const import (  # noqa: E402
+    DOMAIN,
+    SIGNAL_DEVICE_MAP_UPDATED,
+    YunMaoLightDescription,
+)
+from custom_components.yunmao.cover import YunMaoCurtain  # noqa: E402
+from custom_components.yunmao.entity import (  # noqa: E402
+    YunMaoEntity,
+    async_setup_device_entities,
+)
+from custom_components.yunmao.light import YunMaoLight  # noqa: E402
+
+from common import (  # noqa: E402
+    COVER,
+    COVER_MAC,
+    LIGHT,
+    SWITCH_MAC,
+    async_coordinator,
+    push,
+)
+
+
+def _record_writes(entity: YunMaoEntity, entity_id: str) -> list[Any]:
+    writes: list[Any] = []
+    entity.hass = entity.coordinator.hass
+    entity.entity_id = entity_id
+    entity.async_write_ha_state = lambda: writes.append(entity._current_state())
+    entity.coordinator.async_add_listener(entity._handle_coordinator_update)
+    return writes
+
+
+def test_fan_out_writes_changed_entities_only(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    deferred: list[Any] = []
+    monkeypatch.setattr(
+        cover,
+        "async_call_later",
+        lambda hass, delay, action: deferred.append(action) or (lambda: None),
+    )
+
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            light_writes = _record_writes(YunMaoLight(coordinator, LIGHT), "light.hall")
+            cover_writes = _record_writes(YunMaoCurtain(coordinator, COVER), "cover.blind")
+
+            push(coordinator, COVER_MAC, {"LEV": "10"})
+            assert light_writes == [False]
+            assert len(cover_writes) == 1
+
+            push(coordinator, COVER_MAC, {"LEV": "20"})
+            assert light_writes == [False]
+            assert len(cover_writes) == 1
+
+            # The merged cover write lands between fan-outs.
+            deferred.pop()(None)
+            assert cover_writes[-1].current_position == 20
+
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+            assert light_writes == [False, True]
+            assert len(cover_writes) == 2
+
+            summary = coordinator.client.metrics.diagnostics_data()["summaries"][
+                "coordinator_entity_writes_per_update"
+            ]
+            # The refresh wrote nothing, then 2, 0 and 1 plus the deferred write.
+            assert summary["count"] == 4
+            assert summary["mean"] == 1.0
+
+    asyncio.run(run())
+
+
+def test_device_map_change_syncs_entities_in_place(tmp_path: Path) -> None:
+    kept = YunMaoLightDescription("Hall", SWITCH_MAC, 1)
+    dropped = YunMaoLightDescription("Porch", SWITCH_MAC, 2)
+    rewired = YunMaoLightDescription("Hall", SWITCH_MAC, 4)
+    new = YunMaoLightDescription("Stairs", SWITCH_MAC, 3)
+
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            hass = coordinator.hass
+            await er.async_load(hass)
+            await dr.async_load(hass)
+            entity_registry = er.async_get(hass)
+
+            added: list[YunMaoEntity] = []
+
+            def add_entities(entities: list[YunMaoEntity]) -> None:
+                for entity in entities:
+                    entity.entity_id = entity_registry.async_get_or_create(
+                        "light", DOMAIN, entity.unique_id
+                    ).entity_id
+                added.extend(entities)
+
+            unloads: list[Any] = []
+            entry = SimpleNamespace(
+                entry_id="entry",
+                runtime_data=SimpleNamespace(coordinator=coordinator),
+                async_on_unload=unloads.append,
+            )
+
+            coordinator.set_device_map((kept, dropped), (COVER,))
+            async_setup_device_entities(
+                hass,
+                entry,
+                add_entities,
+                lambda coordinator: coordinator.light_descriptions,
+                YunMaoLight,
+            )
+            first, second = added
+            dropped_id = second.entity_id
+
+            coordinator.set_device_map((rewired, new), (COVER,))
+            async_dispatcher_send(hass, SIGNAL_DEVICE_MAP_UPDATED.format("entry"))
+
+            assert [entity.unique_id for entity in added] == ["Hall", "Porch", "Stairs"]
+            assert added[2].description == new
+            assert first.description == rewired
+            assert entity_registry.async_get(dropped_id) is None
+            assert entity_registry.async_get(first.entity_id) is not None
+
+            for unload in unloads:
+                unload()
+
+    asyncio.run(run())
@@ -0,0 +1,95 @@
+"""Tests for yunmao_update push events."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import Event, HomeAssistant  # noqa: E402
+
+from custom_components.yunmao.events import EVENT_UPDATE, YunMaoUpdateEvents  # noqa: E402
+from custom_components.yunmao.protocol.metrics import YunMaoMetrics  # noqa: E402
+
+MAC = "FFFF301B977B24F4"
+OTHER_MAC = "FFFF301B977B24F6"
+
+
+def _run(
+    config_dir: Path, frames: list[tuple[str, dict[str, Any]]], macs: list[str] | None
+) -> tuple[list[dict[str, Any]], YunMaoMetrics]:
+    async def run() -> tuple[list[dict[str, Any]], YunMaoMetrics]:
+        hass = HomeAssistant(str(config_dir))
+        metrics = YunMaoMetrics()
+        events = YunMaoUpdateEvents(hass, metrics, macs, min_interval=0.05)
+        fired: list[dict[str, Any]] = []
+
+        def listener(event: Event) -> None:
+            fired.append(dict(event.data))
+
+        hass.bus.async_listen(EVENT_UPDATE, listener)
+        for mac, attributes in frames:
+            events.handle_push(mac, attributes, known_bitmask=0)
+        await asyncio.sleep(0.1)
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+        return fired, metrics
+
+    return asyncio.run(run())
+
+
+def test_first_push_fires_right_away_with_changed_channels(tmp_path: Path) -> None:
+    fired, metrics = _run(tmp_path, [(MAC, {"SWI": "5"})], None)
+
+    assert fired == [
+        {
+            "mac": MAC,
+            "bitmask": 5,
+            "changed_channels": [1, 3],
+            "cover_status": None,
+            "cover_level": None,
+        }
+    ]
+    assert metrics.value("push_events_fired_total") == 1
+    assert metrics.value("push_events_rate_limited_total") == 0
+
+
+def test_press_and_release_inside_the_interval_keeps_its_channel(
+    tmp_path: Path,
+) -> None:
+    fired, metrics = _run(
+        tmp_path,
+        [(MAC, {"SWI": "1"}), (MAC, {"SWI": "3"}), (MAC, {"SWI": "1"})],
+        None,
+    )
+
+    assert [(event["bitmask"], event["changed_channels"]) for event in fired] == [
+        (1, [1]),
+        (1, [2]),
+    ]
+    assert metrics.value("push_events_fired_total") == 2
+    assert metrics.value("push_events_rate_limited_total") == 2
+
+
+def test_rate_limit_is_per_mac_and_skips_unselected_macs(tmp_path: Path) -> None:
+    fired, metrics = _run(
+        tmp_path,
+        [
+            (MAC, {"SWI": "1"}),
+            (OTHER_MAC, {"SWI": "1"}),
+            (MAC, {"SWI": "0"}),
+            ("FFFF301B977B24F7", {"SWI": "1"}),
+        ],
+        [MAC, OTHER_MAC],
+    )
+
+    assert [(event["mac"], event["changed_channels"]) for event in fired] == [
+        (MAC, [1]),
+        (OTHER_MAC, [1]),
+        (MAC, [1]),
+    ]
+    assert metrics.value("push_events_rate_limited_total") == 1
@@ -0,0 +1,64 @@
+"""Tests for command round-trip tracking."""
+
+from __future__ import annotations
+
+from custom_components.yunmao.protocol.latency import YunMaoCommandTracker
+
+MAC = "FFFF301B977B24F4"
+
+
+def _confirmed(tracker: YunMaoCommandTracker) -> int:
+    return sum(
+        histogram["count"]
+        for histogram in tracker.diagnostics_data()["latency_by_type"].values()
+    )
+
+
+def test_push_flipping_the_channel_confirms_a_command() -> None:
+    tracker = YunMaoCommandTracker()
+    tracker.confirm(MAC, {"SWI": "0x0"})
+    tracker.track(MAC, "KY1", "ON")
+
+    tracker.confirm(MAC, {"SWI": "0x1"})
+
+    data = tracker.diagnostics_data()
+    assert data["pending"] == 0
+    assert data["latency_by_mac"][MAC]["count"] == 1
+    assert data["latency_by_type"]["KY"]["count"] == 1
+
+
+def test_push_for_another_channel_does_not_confirm() -> None:
+    tracker = YunMaoCommandTracker()
+    tracker.confirm(MAC, {"SWI": "0x1"})
+    tracker.track(MAC, "KY1", "ON")
+
+    tracker.confirm(MAC, {"SWI": "0x3"})
+    assert _confirmed(tracker) == 0
+    assert tracker.diagnostics_data()["pending"] == 1
+
+    # The gateway echoes an unchanged bitmask for a command that changed nothing.
+    tracker.confirm(MAC, {"SWI": "0x3"})
+    assert _confirmed(tracker) == 1
+
+
+def test_push_with_another_value_does_not_confirm() -> None:
+    tracker = YunMaoCommandTracker()
+    tracker.track(MAC, "LEV", "60")
+
+    tracker.confirm(MAC, {"LEV": "40"})
+    tracker.confirm(MAC, {"SWI": "zz"})
+    assert _confirmed(tracker) == 0
+
+    tracker.confirm(MAC, {"LEV": "60"})
+    assert tracker.diagnostics_data()["latency_by_type"]["LEV"]["count"] == 1
+
+
+def test_unconfirmed_commands_expire() -> None:
+    tracker = YunMaoCommandTracker(timeout=0)
+    tracker.track(MAC, "KY2", "OFF")
+
+    data = tracker.diagnostics_data()
+
+    assert data["pending"] == 0
+    assert data["unconfirmed_by_mac"] == {MAC: 1}
+    assert data["unconfirmed_by_type"] == {"KY": 1}
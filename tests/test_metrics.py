@@ -0,0 +1,94 @@
+"""Tests for the metrics registry and its Prometheus text output."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+
+import pytest
+
+from custom_components.yunmao.protocol import metrics as metrics_module
+from custom_components.yunmao.protocol.metrics import (
+    COUNTER,
+    METRICS,
+    MetricDefinition,
+    YunMaoMetrics,
+)
+
+_SAMPLE = re.compile(
+    r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(\{quantile="(?P<quantile>[0-9.]+)"\})? (?P<value>\S+)$'
+)
+
+
+def _samples(text: str) -> dict[str, str]:
+    samples: dict[str, str] = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        assert match is not None, line
+        name = match["name"]
+        if match["quantile"] is not None:
+            name = f'{name}{{quantile="{match["quantile"]}"}}'
+        assert name not in samples, line
+        samples[name] = match["value"]
+    return samples
+
+
+def test_every_metric_is_declared_once_with_its_type() -> None:
+    text = YunMaoMetrics().prometheus_text()
+
+    assert text.endswith("\n")
+    for name, definition in METRICS.items():
+        metric = f"yunmao_{name}"
+        assert text.count(f"# TYPE {metric} ") == 1
+        assert f"# TYPE {metric} {definition.kind}\n" in text
+        assert f"# HELP {metric} " in text
+        if definition.kind == COUNTER:
+            assert name.endswith("_total")
+
+
+def test_samples_render_counters_gauges_and_summaries() -> None:
+    metrics = YunMaoMetrics()
+    metrics.increment("gateway_requests_total", 3)
+    metrics.set_gauge("gateway_queue_depth", 2)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.observe("gateway_connect_seconds", seconds)
+
+    samples = _samples(metrics.prometheus_text())
+
+    assert samples["yunmao_gateway_requests_total"] == "3.0"
+    assert samples["yunmao_gateway_queue_depth"] == "2.0"
+    assert samples['yunmao_gateway_connect_seconds{quantile="0.5"}'] == "0.3"
+    assert samples['yunmao_gateway_connect_seconds{quantile="0.99"}'] == "0.4"
+    assert float(samples["yunmao_gateway_connect_seconds_sum"]) == pytest.approx(1.0)
+    assert samples["yunmao_gateway_connect_seconds_count"] == "4"
+    # Summaries without samples report NaN quantiles, not zero latency.
+    assert samples['yunmao_gateway_read_seconds{quantile="0.5"}'] == "NaN"
+    assert samples["yunmao_gateway_read_seconds_count"] == "0"
+
+
+def test_help_text_is_escaped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(
+        metrics_module.METRICS,
+        "test_escapes_total",
+        MetricDefinition(COUNTER, "Back\\slash and\nnew line."),
+    )
+
+    text = YunMaoMetrics().prometheus_text()
+
+    assert "# HELP yunmao_test_escapes_total Back\\\\slash and\\nnew line.\n" in text
+    _samples(text)
+
+
+def test_view_serves_the_text_format() -> None:
+    pytest.importorskip("homeassistant")
+    from custom_components.yunmao.views import PROMETHEUS_CONTENT_TYPE, YunMaoMetricsView
+
+    metrics = YunMaoMetrics()
+    metrics.increment("push_frames_total")
+
+    response = asyncio.run(YunMaoMetricsView(metrics).get(None))
+
+    assert response.headers["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+    assert response.body.decode("utf-8") == metrics.prometheus_text()
@@ -0,0 +1,104 @@
+"""Tests for the offline command queue."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.yunmao.offline_queue import (
+    OUTCOME_EXPIRED,
+    OUTCOME_SENT,
+    OUTCOME_SUPERSEDED,
+    QueuedCommand,
+    YunMaoOfflineQueue,
+)
+
+
+async def _queued(
+    queue: YunMaoOfflineQueue, mac: str, attribute: str, value: str
+) -> tuple[asyncio.Task[str], QueuedCommand]:
+    task = asyncio.ensure_future(queue.async_enqueue(mac, attribute, value))
+    await asyncio.sleep(0)
+    return task, queue._entries[(mac, attribute)]
+
+
+def test_command_for_the_same_attribute_replaces_the_queued_one() -> None:
+    async def run() -> None:
+        queue = YunMaoOfflineQueue(ttl=60)
+        first, first_entry = await _queued(queue, "A", "SWI", "ON")
+        second, second_entry = await _queued(queue, "A", "SWI", "OFF")
+
+        assert await first == OUTCOME_SUPERSEDED
+        assert first_entry.expiry is None
+        assert len(queue) == 1
+
+        (entry,) = queue.take()
+        assert entry is second_entry
+        assert entry.value == "OFF"
+        assert entry.expiry is None
+        queue.resolve(entry, OUTCOME_SENT)
+        assert await second == OUTCOME_SENT
+
+    asyncio.run(run())
+
+
+def test_command_expires_after_the_ttl() -> None:
+    async def run() -> None:
+        queue = YunMaoOfflineQueue(ttl=0.01)
+
+        assert await queue.async_enqueue("A", "SWI", "ON") == OUTCOME_EXPIRED
+        assert len(queue) == 0
+        assert queue.diagnostics_data()["outcomes"][OUTCOME_EXPIRED] == 1
+
+    asyncio.run(run())
+
+
+def test_requeued_command_still_expires() -> None:
+    async def run() -> None:
+        queue = YunMaoOfflineQueue(ttl=0.05)
+        task, _ = await _queued(queue, "A", "SWI", "ON")
+
+        (entry,) = queue.take()
+        queue.requeue(entry)
+
+        assert entry.expiry is not None
+        assert await task == OUTCOME_EXPIRED
+        assert len(queue) == 0
+
+    asyncio.run(run())
+
+
+def test_flush_takes_commands_in_order_of_their_last_update() -> None:
+    async def run() -> None:
+        queue = YunMaoOfflineQueue(ttl=0.05)
+        tasks = [
+            (await _queued(queue, mac, attribute, value))[0]
+            for mac, attribute, value in (
+                ("A", "SWI", "ON"),
+                ("B", "SWI", "ON"),
+                ("C", "WIN", "OPEN"),
+                ("A", "SWI", "OFF"),
+            )
+        ]
+
+        entries = queue.take()
+        assert [(entry.mac, entry.value) for entry in entries] == [
+            ("B", "ON"),
+            ("C", "OPEN"),
+            ("A", "OFF"),
+        ]
+        assert all(entry.expiry is None for entry in entries)
+
+        # Taken commands no longer expire while the flush sends them.
+        await asyncio.sleep(0.1)
+        for entry in entries:
+            queue.resolve(entry, OUTCOME_SENT)
+
+        assert await asyncio.gather(*tasks) == [
+            OUTCOME_SUPERSEDED,
+            OUTCOME_SENT,
+            OUTCOME_SENT,
+            OUTCOME_SENT,
+        ]
+        assert queue.diagnostics_data()["outcomes"][OUTCOME_EXPIRED] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+"""Tests for the profiling service."""
+
+from __future__ import annotations
+
+import asyncio
+import pstats
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.yunmao.profiler import async_run_profile  # noqa: E402
+
+
+def _run_profile(config_dir: Path, sampling: bool) -> dict[str, Any]:
+    async def run() -> dict[str, Any]:
+        hass = HomeAssistant(str(config_dir))
+        try:
+            return await async_run_profile(hass, 0.2, 5, sampling)
+        finally:
+            await hass.async_stop(force=True)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("sampling", [False, True])
+def test_both_profilers_write_stats_and_summary(
+    tmp_path: Path, sampling: bool
+) -> None:
+    if sampling:
+        pytest.importorskip("pyinstrument.renderers")
+
+    result = _run_profile(tmp_path, sampling)
+
+    assert result["profiler"] == ("pyinstrument" if sampling else "cprofile")
+    stats_path = Path(result["stats_path"])
+    summary_path = Path(result["summary_path"])
+    assert stats_path.parent == summary_path.parent == tmp_path
+    pstats.Stats(str(stats_path))
+    summary = summary_path.read_text("utf-8")
+    assert "Yun Mao functions by cumulative time" in summary
+    assert "Event loop functions by internal time" in summary
@@ -0,0 +1,14 @@
+"""Tests for loading the protocol package without Home Assistant."""
+
+from __future__ import annotations
+
+import sys
+
+from custom_components.yunmao.protocol import YunMaoError, YunMaoGatewayClient
+from custom_components.yunmao.protocol.errors import YunMaoError as ErrorsYunMaoError
+
+
+def test_protocol_package_loads_under_one_name() -> None:
+    assert "protocol" not in sys.modules
+    assert YunMaoError is ErrorsYunMaoError
+    assert YunMaoGatewayClient.__module__ == "custom_components.yunmao.protocol.client"
@@ -0,0 +1,46 @@
+"""Tests for the raw push frame pre-filter."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.yunmao.protocol.push_filter import (
+    FRAME_IGNORED_OTHER,
+    FRAME_IGNORED_UPDATE,
+    FRAME_RELEVANT,
+    FRAME_UNKNOWN,
+    YunMaoPushFilter,
+)
+
+KNOWN_MAC = "FFFF301B977B24F4"
+
+
+@pytest.mark.parametrize(
+    ("line", "verdict"),
+    [
+        (b'{"requestType":"update","id":"FFFF301B977B24F4","attributes":{"SWI":"1"}}', FRAME_RELEVANT),
+        (b'{"requestType":"update","id":"00158D0000000001","attributes":{"TEM":"21"}}', FRAME_IGNORED_UPDATE),
+        (b'{"requestType":"heartbeat","id":"FFFF301B977B24F4"}', FRAME_IGNORED_OTHER),
+        (b'{"attributes":{"SWI":"1"},"requestType":"update","id":"FFFF301B977B24F4"}', FRAME_UNKNOWN),
+        (b'{"requestType": "update", "id": "FFFF301B977B24F4"}', FRAME_UNKNOWN),
+        (b'{"requestType":"update","attributes":{}}', FRAME_UNKNOWN),
+        (b"not json", FRAME_UNKNOWN),
+        (b'{"requestType":"update","id":"\\u0046FFF301B977B24F4","attributes":{}}', FRAME_UNKNOWN),
+        (b'{"requestType":"upd\\u0061te","id":"FFFF301B977B24F4","attributes":{}}', FRAME_UNKNOWN),
+        (b'{"requestType":"update","id":"00158D\\"0000000001","attributes":{}}', FRAME_UNKNOWN),
+    ],
+    ids=[
+        "known",
+        "unknown-mac",
+        "other-type",
+        "nested-first",
+        "whitespace",
+        "no-id",
+        "not-json",
+        "escaped-id",
+        "escaped-type",
+        "escaped-quote",
+    ],
+)
+def test_classify(line: bytes, verdict: int) -> None:
+    assert YunMaoPushFilter([KNOWN_MAC]).classify(line) == verdict
@@ -0,0 +1,147 @@
+"""Tests for push link tracking and the polling fallback."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.yunmao import coordinator as coordinator_module  # noqa: E402
+from custom_components.yunmao.const import PUSH_FALLBACK_IDLE_SECONDS  # noqa: E402
+from custom_components.yunmao.coordinator import (  # noqa: E402
+    YunMaoCoordinator,
+    YunMaoPushServer,
+)
+from custom_components.yunmao.protocol.metrics import YunMaoMetrics  # noqa: E402
+from custom_components.yunmao.protocol.push import (  # noqa: E402
+    KEEPALIVE_IDLE_SECONDS,
+    enable_keepalive,
+)
+
+from common import async_coordinator  # noqa: E402
+
+
+def _count_fetches(coordinator: YunMaoCoordinator) -> list[None]:
+    fetches: list[None] = []
+    fetch_state = coordinator.client.async_fetch_state
+
+    async def async_fetch_state() -> dict[str, Any]:
+        fetches.append(None)
+        return await fetch_state()
+
+    coordinator.client.async_fetch_state = async_fetch_state
+    return fetches
+
+
+def test_push_activity_holds_off_polling(tmp_path: Path) -> None:
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            fetches = _count_fetches(coordinator)
+
+            await coordinator.async_refresh()
+            assert len(fetches) == 0
+
+            coordinator._last_gateway_event_monotonic -= PUSH_FALLBACK_IDLE_SECONDS
+            await coordinator.async_refresh()
+            assert len(fetches) == 1
+
+            # A frame ruled out by the pre-filter still proves the link works.
+            coordinator._last_gateway_event_monotonic -= PUSH_FALLBACK_IDLE_SECONDS
+            coordinator.handle_push_activity(False)
+            await coordinator.async_refresh()
+            assert len(fetches) == 1
+
+    asyncio.run(run())
+
+
+def test_lost_and_restored_link_resync(tmp_path: Path) -> None:
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            fetches = _count_fetches(coordinator)
+            hass = coordinator.hass
+
+            # The first report of a link is not a change.
+            coordinator.handle_push_connection(True)
+            await hass.async_block_till_done()
+            assert len(fetches) == 0
+
+            coordinator.handle_push_connection(False)
+            await hass.async_block_till_done()
+            assert len(fetches) == 1
+
+            # Polling continues while the link is down.
+            await coordinator.async_refresh()
+            assert len(fetches) == 2
+
+            coordinator.handle_push_connection(True)
+            await hass.async_block_till_done()
+            assert len(fetches) == 3
+
+            # Back on pushes once the link is up and resynced.
+            await coordinator.async_refresh()
+            assert len(fetches) == 3
+
+    asyncio.run(run())
+
+
+def test_dead_push_link_is_detected_and_resyncs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    keepalive: list[tuple[int, int | None]] = []
+
+    def record_keepalive(sock: socket.socket | None) -> None:
+        enable_keepalive(sock)
+        assert sock is not None
+        keepalive.append(
+            (
+                sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE),
+                sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)
+                if hasattr(socket, "TCP_KEEPIDLE")
+                else None,
+            )
+        )
+
+    monkeypatch.setattr(coordinator_module, "enable_keepalive", record_keepalive)
+    # Stands in for keepalive giving up on a link that went silent.
+    monkeypatch.setattr(coordinator_module, "_PUSH_IDLE_TIMEOUT_SECONDS", 0.2)
+
+    async def run() -> None:
+        async with async_coordinator(tmp_path) as (coordinator, _):
+            fetches = _count_fetches(coordinator)
+            hass = coordinator.hass
+            server = YunMaoPushServer(hass, YunMaoMetrics(), port=0)
+            links: list[bool] = []
+
+            def connection_listener(connected: bool) -> None:
+                links.append(connected)
+                coordinator.handle_push_connection(connected)
+
+            await server.async_add_listener(
+                coordinator.handle_push_payload,
+                host="127.0.0.1",
+                connection_listener=connection_listener,
+            )
+            _, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            try:
+                for _ in range(50):
+                    if len(links) == 2:
+                        break
+                    await asyncio.sleep(0.05)
+                await hass.async_block_till_done()
+            finally:
+                writer.close()
+                await server.async_shutdown()
+
+            assert keepalive[0][0] == 1
+            assert keepalive[0][1] in (KEEPALIVE_IDLE_SECONDS, None)
+            assert len(keepalive) == 1
+            assert links == [True, False]
+            assert len(fetches) == 1
+            assert coordinator._should_query_gateway()
+
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+"""Tests for the shared push server."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.yunmao.coordinator import YunMaoPushServer  # noqa: E402
+from custom_components.yunmao.protocol.metrics import YunMaoMetrics  # noqa: E402
+
+
+def test_removing_the_last_listener_closes_open_connections(tmp_path: Path) -> None:
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        server = YunMaoPushServer(hass, YunMaoMetrics(), port=0)
+        payloads: list[dict[str, Any]] = []
+
+        await server.async_add_listener(payloads.append)
+        connections = [
+            await asyncio.open_connection("127.0.0.1", server.port) for _ in range(2)
+        ]
+        for _ in range(50):
+            if server.diagnostics_data()["connections"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert server.diagnostics_data()["connections"] == 2
+
+        # Unload awaits this, so it must not wait for the gateway to hang up.
+        await asyncio.wait_for(server.async_remove_listener(payloads.append), 2)
+
+        for reader, writer in connections:
+            assert await asyncio.wait_for(reader.read(), 2) == b""
+            writer.close()
+        assert server.diagnostics_data() == {
+            "listening": False,
+            "listeners": 0,
+            "connections": 0,
+            "links_up": 0,
+        }
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,126 @@
+"""Tests for the per-gateway request scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.yunmao.protocol.scheduler import (
+    PRIORITY_QUERY,
+    YunMaoRequestScheduler,
+    get_scheduler,
+    release_scheduler,
+)
+
+
+async def _async_blocked(scheduler: YunMaoRequestScheduler) -> tuple[asyncio.Event, asyncio.Task]:
+    """Occupy a command slot until the returned event is set."""
+
+    gate = asyncio.Event()
+
+    async def blocker() -> str:
+        await gate.wait()
+        return "blocker"
+
+    task = asyncio.ensure_future(scheduler.async_run(blocker))
+    await asyncio.sleep(0)
+    return gate, task
+
+
+def test_queued_requests_with_the_same_key_share_one_run() -> None:
+    async def run() -> tuple[list[str], list[str], int]:
+        scheduler = YunMaoRequestScheduler(max_in_flight=1, reserved_command_slots=0)
+        gate, blocked = await _async_blocked(scheduler)
+        calls: list[str] = []
+
+        async def query(name: str) -> str:
+            calls.append(name)
+            return name
+
+        first = asyncio.ensure_future(
+            scheduler.async_run(lambda: query("first"), priority=PRIORITY_QUERY, key="query")
+        )
+        second = asyncio.ensure_future(
+            scheduler.async_run(lambda: query("second"), priority=PRIORITY_QUERY, key="query")
+        )
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(blocked, first, second)
+        return results, calls, scheduler.diagnostics_data()["superseded"]
+
+    results, calls, superseded = asyncio.run(run())
+
+    assert results == ["blocker", "second", "second"]
+    assert calls == ["second"]
+    assert superseded == 1
+
+
+def test_commands_run_before_queued_queries() -> None:
+    async def run() -> list[str]:
+        scheduler = YunMaoRequestScheduler(max_in_flight=1, reserved_command_slots=0)
+        gate, blocked = await _async_blocked(scheduler)
+        order: list[str] = []
+
+        async def request(name: str) -> None:
+            order.append(name)
+
+        queued = [
+            asyncio.ensure_future(
+                scheduler.async_run(lambda: request("query"), priority=PRIORITY_QUERY)
+            ),
+            asyncio.ensure_future(scheduler.async_run(lambda: request("command"))),
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(blocked, *queued)
+        return order
+
+    assert asyncio.run(run()) == ["command", "query"]
+
+
+def test_reserved_slot_lets_commands_pass_a_slow_query() -> None:
+    async def run() -> tuple[bool, bool]:
+        scheduler = YunMaoRequestScheduler(max_in_flight=2, reserved_command_slots=1)
+        gate = asyncio.Event()
+
+        async def slow_query() -> None:
+            await gate.wait()
+
+        async def fast() -> None:
+            return None
+
+        query = asyncio.ensure_future(scheduler.async_run(slow_query, priority=PRIORITY_QUERY))
+        second_query = asyncio.ensure_future(scheduler.async_run(fast, priority=PRIORITY_QUERY))
+        await asyncio.wait_for(scheduler.async_run(fast), 1)
+        second_query_started = second_query.done()
+        command_passed = not query.done()
+        gate.set()
+        await asyncio.gather(query, second_query)
+        return command_passed, second_query_started
+
+    command_passed, second_query_started = asyncio.run(run())
+
+    assert command_passed
+    assert not second_query_started
+
+
+def test_shared_scheduler_is_cancelled_after_the_last_release() -> None:
+    async def run() -> None:
+        host = "192.0.2.10"
+        scheduler = get_scheduler(host)
+        assert get_scheduler(host) is scheduler
+
+        gate, blocked = await _async_blocked(scheduler)
+        release_scheduler(host)
+        assert get_scheduler(host) is scheduler
+        release_scheduler(host)
+        release_scheduler(host)
+
+        with pytest.raises(asyncio.CancelledError):
+            await blocked
+        assert get_scheduler(host) is not scheduler
+        release_scheduler(host)
+        gate.set()
+
+    asyncio.run(run())
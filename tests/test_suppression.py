@@ -0,0 +1,89 @@
+"""Tests for skipping commands the gateway already confirmed."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from common import (  # noqa: E402
+    COVER,
+    COVER_MAC,
+    LIGHT,
+    SWITCH_MAC,
+    RecordingSimulator,
+    async_coordinator,
+    push,
+)
+
+
+async def _async_applied(simulator: RecordingSimulator, expected: int) -> int:
+    """Return the commands the gateway applied once the expected ones arrived."""
+
+    # Commands return once written, before the gateway applied them.
+    for _ in range(20):
+        if len(simulator.applied) >= expected:
+            break
+        await asyncio.sleep(0.05)
+    return len(simulator.applied)
+
+
+def test_command_is_skipped_while_the_confirmation_is_fresh(tmp_path: Path) -> None:
+    async def run() -> tuple[int, float]:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            coordinator.suppress_window = 60
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+            push(coordinator, COVER_MAC, {"LEV": "40"})
+
+            await coordinator.async_set_light_state(LIGHT, True)
+            await coordinator.async_set_cover_position(COVER, 40)
+            return (
+                await _async_applied(simulator, 1),
+                coordinator.client.metrics.value("coordinator_commands_suppressed_total"),
+            )
+
+    assert asyncio.run(run()) == (0, 2)
+
+
+def test_command_is_sent_once_the_confirmation_is_stale(tmp_path: Path) -> None:
+    async def run() -> int:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            coordinator.suppress_window = 0.05
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+            await asyncio.sleep(0.1)
+
+            await coordinator.async_set_light_state(LIGHT, True)
+            return await _async_applied(simulator, 1)
+
+    assert asyncio.run(run()) == 1
+
+
+def test_command_is_sent_when_the_cached_state_differs(tmp_path: Path) -> None:
+    async def run() -> tuple[list[bool | None], int]:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            coordinator.suppress_window = 60
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+
+            # Not confirmed by a push, so the cache no longer matches the report.
+            await coordinator.async_set_light_state(LIGHT, False)
+            states = [coordinator.is_light_on(LIGHT)]
+            await coordinator.async_set_light_state(LIGHT, True)
+            states.append(coordinator.is_light_on(LIGHT))
+            return states, await _async_applied(simulator, 2)
+
+    assert asyncio.run(run()) == ([False, True], 2)
+
+
+def test_forced_command_is_always_sent(tmp_path: Path) -> None:
+    async def run() -> int:
+        async with async_coordinator(tmp_path) as (coordinator, simulator):
+            coordinator.suppress_window = 60
+            push(coordinator, SWITCH_MAC, {"SWI": "1"})
+
+            await coordinator.async_set_light_state(LIGHT, True, force=True)
+            return await _async_applied(simulator, 1)
+
+    assert asyncio.run(run()) == 1